@@ -1,15 +1,334 @@
+from multiprocessing import cpu_count
+
 import numpy as np
 
 from ._extensions._pywt import (DiscreteContinuousWavelet, ContinuousWavelet,
                                 Wavelet, _check_dtype)
+from ._extensions._cwt import cwt_filter, cwt_convolve, cwt_convolve_at
+from ._dwt import downcoef, dwt_max_level
 from ._functions import integrate_wavelet, scale2frequency
 
-__all__ = ["cwt"]
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+__all__ = ["cwt", "cwt_iter", "CWTPlan", "StreamingCWT", "cross_wavelet",
+           "wavelet_coherence", "cwt2"]
+
+# precision of the integrated wavelet used by the convolution kernel
+_PRECISION = 10
+
+# number of scales transformed at once by the FFT method
+_FFT_BLOCK = 16
+
+# wavelet whose approximation filter low-passes the signal between octaves
+# of the decimated transform, and the smallest scale left after decimation
+_DECIMATE_WAVELET = 'dmey'
+_DECIMATE_SCALE = 8
+
+# families extended radially (rather than along a direction) by cwt2
+_ISOTROPIC_2D = ('mexh', )
+
+
+def _get_workers(workers):
+    """Convert the `workers` argument to a positive number of threads."""
+    workers = int(workers)
+    if workers < 0:
+        workers += cpu_count() + 1
+    if workers < 1:
+        raise ValueError("workers must be a nonzero integer no smaller than "
+                         "-cpu_count()")
+    return workers
+
 
+def _map_scales(func, n_scales, workers):
+    """Call ``func(i)`` for every scale index, possibly on a thread pool.
 
-def cwt(data, scales, wavelet, sampling_period=1.):
+    The kernels called for each scale release the GIL, so independent
+    scales run concurrently.
     """
-    cwt(data, scales, wavelet)
+    workers = min(_get_workers(workers), n_scales)
+    if workers > 1 and ThreadPoolExecutor is not None:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            # consume the iterator so that exceptions are raised here
+            list(ex.map(func, range(n_scales)))
+    else:
+        for i in range(n_scales):
+            func(i)
+
+
+def _next_fast_len(target):
+    """Return the smallest 5-smooth integer no smaller than `target`."""
+    best = 1
+    while best < target:
+        best *= 2
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            # smallest power of two such that p35 * p2 >= target
+            p2 = 1
+            while p35 * p2 < target:
+                p2 *= 2
+            best = min(best, p35 * p2)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _cwt_dtypes(dtype, wavelet):
+    """Return the real and output dtypes of a CWT in precision `dtype`."""
+    dt_real = np.dtype(dtype)
+    if dt_real.kind == 'c':
+        dt_real = np.empty(0, dtype=dt_real).real.dtype
+    elif dt_real not in (np.float32, np.float64):
+        raise ValueError("dtype must be a floating point or complex "
+                         "dtype, not {}".format(dt_real))
+    if wavelet.complex_cwt:
+        dt_out = np.result_type(dt_real, np.complex64)
+    else:
+        dt_out = dt_real
+    return dt_real, dt_out
+
+
+class CWTPlan(object):
+    """
+    CWTPlan(n, scales, wavelet, sampling_period=1., method='conv',
+            dtype=None)
+
+    Precomputed continuous wavelet transform of signals of a fixed length.
+
+    The wavelet is integrated and resampled at every scale once, when the
+    plan is created.  Calling the plan on a signal then only performs the
+    per-scale convolutions, which pays off when the same configuration is
+    applied to many signals.
+
+    Parameters
+    ----------
+    n : int
+        Length of the signals to transform.
+    scales : array_like
+        scales to use
+    wavelet : Wavelet object or name
+        Wavelet to use
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    method : {'conv', 'fft'}, optional
+        ``'conv'`` (default) stores the resampled integrated wavelet of every
+        scale and convolves it directly with the signal.  ``'fft'`` stores
+        the spectra of the scaled wavelets at a common padded length,
+        evaluated in closed form by ``ContinuousWavelet.fourier``, and
+        multiplies them with the spectrum of the signal.  This is faster for
+        large scales, at the cost of ``len(scales)`` spectra of the padded
+        length, and free of the resampling error of ``'conv'``, which is
+        largest at small scales.
+    dtype : dtype, optional
+        Precision of the computation and of the coefficients (see `cwt`).
+        Defaults to the precision of the wavelet.
+
+    Attributes
+    ----------
+    n : int
+        Length of the signals to transform.
+    scales : ndarray
+        The scales of the transform.
+    frequencies : ndarray
+        Frequencies corresponding to `scales`.
+    dtype : dtype
+        dtype of the coefficients.
+    nbytes : int
+        Memory used by the cached filters or spectra, in bytes.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> plan = pywt.CWTPlan(256, np.arange(1, 33), 'morl')
+    >>> windows = np.random.randn(10, 256)
+    >>> coefs = [plan(x) for x in windows]
+    >>> coefs[0].shape
+    (32, 256)
+    """
+    def __init__(self, n, scales, wavelet, sampling_period=1., method='conv',
+                 dtype=None):
+        self.n = int(n)
+        if self.n < 1:
+            raise ValueError("n must be a positive integer")
+        if not isinstance(wavelet, (ContinuousWavelet, Wavelet)):
+            wavelet = DiscreteContinuousWavelet(wavelet)
+        self.wavelet = wavelet
+        self.scales = np.atleast_1d(scales)
+        if self.scales.ndim != 1:
+            raise ValueError("scales must be a scalar or a 1D array")
+        if method not in ('conv', 'fft'):
+            raise ValueError("method must be 'conv' or 'fft', not "
+                             "{!r}".format(method))
+        self.method = method
+        if dtype is None:
+            dtype = getattr(wavelet, 'dt', np.float64)
+        self._dt_real, self.dtype = _cwt_dtypes(dtype, wavelet)
+        self.frequencies = np.atleast_1d(
+            scale2frequency(wavelet, self.scales, _PRECISION)) / sampling_period
+
+        if method == 'conv':
+            self._init_filters()
+        else:
+            self._init_spectra()
+
+    def _init_filters(self):
+        """Resample the integrated wavelet at every scale."""
+        int_psi, x = integrate_wavelet(self.wavelet, precision=_PRECISION)
+        step = float(x[1] - x[0])
+        width = float(x[-1] - x[0])
+        if self.wavelet.complex_cwt:
+            parts = [np.ascontiguousarray(int_psi.real, dtype=self._dt_real),
+                     np.ascontiguousarray(int_psi.imag, dtype=self._dt_real)]
+        else:
+            parts = [np.ascontiguousarray(int_psi, dtype=self._dt_real)]
+        # _filters[i] holds the resampled real (and imaginary) parts of scale i
+        self._filters = [[cwt_filter(part, step, width, float(scale))
+                          for part in parts] for scale in self.scales]
+
+    def _init_spectra(self):
+        """Evaluate the scaled wavelet spectra at a common padded length.
+
+        The Fourier transform of the wavelet is known in closed form, so the
+        spectrum of scale ``s`` is ``sqrt(s) * psi_hat(-s * f)``.  It is
+        delayed by half a sample to match the alignment of the ``'conv'``
+        method, and the signal is zero padded by the longest wavelet support
+        to avoid circular wrap-around.
+        """
+        width = self.wavelet.upper_bound - self.wavelet.lower_bound
+        support = int(np.ceil(np.max(np.abs(self.scales)) * width)) + 1
+        self._fft_len = L = _next_fast_len(self.n + support)
+        if self.wavelet.complex_cwt:
+            f = np.fft.fftfreq(L)
+        else:
+            f = np.fft.rfftfreq(L)
+        scales = self.scales.astype(np.float64)[:, np.newaxis]
+        self._spectra = self.wavelet.fourier(-scales * f)
+        self._spectra *= np.sqrt(scales) * np.exp(-1j * np.pi * f)
+        self._spectra = self._spectra.astype(
+            np.result_type(self._dt_real, np.complex64), copy=False)
+
+    @property
+    def nbytes(self):
+        if self.method == 'conv':
+            return sum(part.nbytes for filt in self._filters for part in filt)
+        return self._spectra.nbytes
+
+    def __call__(self, data, out=None, workers=1, positions=None):
+        """
+        Compute the CWT of `data`.
+
+        Parameters
+        ----------
+        data : array_like
+            Input signal of length `n`.
+        out : ndarray, optional
+            Array of shape ``(len(scales), n)`` (or ``(len(scales),
+            len(positions))``) and dtype `dtype` into which the coefficients
+            are written.
+        workers : int, optional
+            Number of threads used to compute the scales in parallel (see
+            `cwt`).
+        positions : array_like of int, optional
+            Sample indices at which to evaluate the transform (see `cwt`).
+
+        Returns
+        -------
+        coefs : ndarray
+            Coefficients of shape ``(len(scales), n)``, or ``(len(scales),
+            len(positions))`` if `positions` is given (`out`, if given).
+        """
+        data = np.ascontiguousarray(data, dtype=self._dt_real)
+        if data.shape != (self.n, ):
+            raise ValueError("data must have shape {}, not {}".format(
+                (self.n, ), data.shape))
+        if positions is None:
+            shape = (self.scales.size, self.n)
+        else:
+            positions = _check_positions(positions, self.n)
+            shape = (self.scales.size, positions.size)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError("out must have shape {}, not {}".format(
+                shape, out.shape))
+        elif out.dtype != self.dtype:
+            raise ValueError("out must have dtype {}, not {}".format(
+                self.dtype, out.dtype))
+
+        if positions is not None:
+            if self.method == 'conv':
+                self._convolve_at(data, positions, out, workers)
+            else:
+                self._multiply(data, out, workers, positions)
+        elif self.method == 'conv':
+            self._convolve(data, out, workers)
+        else:
+            self._multiply(data, out, workers)
+        return out
+
+    def _convolve(self, data, out, workers):
+        if self.wavelet.complex_cwt:
+            out_parts = [out.real, out.imag]
+        else:
+            out_parts = [out]
+        weights = -np.sqrt(self.scales.astype(np.float64))
+
+        def _cwt_scale(i):
+            for filt, out_part in zip(self._filters[i], out_parts):
+                cwt_convolve(data, filt, weights[i], out_part[i])
+
+        _map_scales(_cwt_scale, self.scales.size, workers)
+
+    def _convolve_at(self, data, positions, out, workers):
+        if self.wavelet.complex_cwt:
+            out_parts = [out.real, out.imag]
+        else:
+            out_parts = [out]
+        weights = -np.sqrt(self.scales.astype(np.float64))
+
+        def _cwt_scale(i):
+            for filt, out_part in zip(self._filters[i], out_parts):
+                cwt_convolve_at(data, filt, weights[i], positions,
+                                out_part[i])
+
+        _map_scales(_cwt_scale, self.scales.size, workers)
+
+    def _multiply(self, data, out, workers, positions=None):
+        L = self._fft_len
+        if self.wavelet.complex_cwt:
+            data_spectrum = np.fft.fft(data, L)
+        else:
+            data_spectrum = np.fft.rfft(data, L)
+
+        def _cwt_block(b):
+            block = slice(b * _FFT_BLOCK, (b + 1) * _FFT_BLOCK)
+            product = self._spectra[block] * data_spectrum
+            if self.wavelet.complex_cwt:
+                coefs = np.fft.ifft(product, axis=-1)
+            else:
+                coefs = np.fft.irfft(product, L, axis=-1)
+            # the spectra only give the complete transform, of which the
+            # requested positions are selected
+            if positions is None:
+                out[block] = coefs[:, :self.n]
+            else:
+                out[block] = coefs[:, positions]
+
+        n_blocks = -(-self.scales.size // _FFT_BLOCK)
+        _map_scales(_cwt_block, n_blocks, workers)
+
+
+def cwt(data, scales, wavelet, sampling_period=1., workers=1, dtype=None,
+        out=None, method='conv', decimate=False, positions=None):
+    """
+    cwt(data, scales, wavelet, sampling_period=1., workers=1, dtype=None,
+        out=None, method='conv', decimate=False, positions=None)
 
     One dimensional Continuous Wavelet Transform.
 
@@ -23,12 +342,48 @@ def cwt(data, scales, wavelet, sampling_period=1.):
         Wavelet to use
     sampling_period : float
         Sampling period for frequencies output (optional)
+    workers : int, optional
+        Number of threads used to compute the scales in parallel. Negative
+        values are counted back from the number of CPUs (``-1`` uses all of
+        them). Default is 1.
+    dtype : dtype, optional
+        Precision of the computation and of `coefs`.  ``np.float32`` (or
+        ``np.complex64``) gives single precision and ``np.float64`` (or
+        ``np.complex128``) double precision; the output is complex only for
+        complex wavelets.  By default, single precision is used when both
+        `data` and the wavelet (see ``ContinuousWavelet(name, dtype)``) are
+        single precision and double precision otherwise.
+    out : ndarray, optional
+        Array of shape ``(len(scales), len(data))`` into which the
+        coefficients are written, e.g. a ``np.memmap`` for scalograms that do
+        not fit in memory.  If `dtype` is None, the precision of `out` is
+        used.  Its dtype must be complex for complex wavelets and real
+        otherwise.
+    method : {'conv', 'fft'}, optional
+        Convolve directly (default) or multiply in the frequency domain,
+        which is faster for large scales.  See `CWTPlan`.
+    decimate : bool, optional
+        If True, the scales are computed on a signal that is low-pass
+        filtered and decimated by two (with the approximation filter of the
+        discrete Meyer wavelet, see `downcoef`) once per octave above scale
+        16, and interpolated back to the full rate.  Large scales then run on
+        short signals, at the cost of a small interpolation error.  See
+        `cwt_iter` for output at the decimated rates.  Default is False.
+    positions : array_like of int, optional
+        Sample indices at which to evaluate the transform, e.g. the times of
+        detected events.  With ``method='conv'``, every coefficient is then
+        computed as a dot product of the data with the resampled wavelet, so
+        the cost is proportional to ``len(positions)`` rather than
+        ``len(data)``.  ``method='fft'`` computes the complete transform and
+        selects the columns.  Cannot be combined with `decimate`.
 
     Returns
     -------
     coefs : array_like
         Continous wavelet transform of the input signal for the given scales
-        and wavelet
+        and wavelet (`out`, if given).  Its shape is ``(len(scales),
+        len(data))``, or ``(len(scales), len(positions))`` if `positions` is
+        given.
     frequencies : array_like
         if the unit of sampling period are seconds and given, than frequencies
         are in hertz. Otherwise Sampling period of 1 is assumed.
@@ -38,6 +393,14 @@ def cwt(data, scales, wavelet, sampling_period=1.):
     Size of coefficients arrays depends on the length of the input array and
     the length of given scales.
 
+    The transform is computed by a `CWTPlan`, which caches a filter (the
+    integrated wavelet resampled at the scale) or a spectrum per scale.  With
+    ``method='conv'`` each row of `coefs` is then computed by a C kernel
+    (``cwt_convolve``) that convolves the filter with the data and
+    differentiates the result in place; with ``method='fft'`` each row is the
+    inverse FFT of the product of the cached spectrum and the spectrum of the
+    data.
+
     Examples
     --------
     >>> import pywt
@@ -60,36 +423,839 @@ def cwt(data, scales, wavelet, sampling_period=1.):
     ...            vmax=abs(cwtmatr).max(), vmin=-abs(cwtmatr).max())  # doctest: +SKIP
     >>> plt.show() # doctest: +SKIP
     """
-
     # accept array_like input; make a copy to ensure a contiguous array
     dt = _check_dtype(data)
     data = np.array(data, dtype=dt)
     if not isinstance(wavelet, (ContinuousWavelet, Wavelet)):
         wavelet = DiscreteContinuousWavelet(wavelet)
-    if np.isscalar(scales):
-        scales = np.array([scales])
-    if data.ndim == 1:
+    if data.ndim != 1:
+        raise ValueError("Only dim == 1 supportet")
+    if dtype is None:
+        dtype = _default_dtype(data, wavelet, out)
+    if not decimate:
+        plan = CWTPlan(data.size, scales, wavelet, sampling_period, method,
+                       dtype)
+        return (plan(data, out=out, workers=workers, positions=positions),
+                plan.frequencies)
+    if positions is not None:
+        raise ValueError("positions cannot be combined with decimate")
+
+    scales = np.atleast_1d(scales)
+    dt_real, dt_out = _cwt_dtypes(dtype, wavelet)
+    shape = (scales.size, data.size)
+    if out is None:
+        out = np.empty(shape, dtype=dt_out)
+    elif out.shape != shape or out.dtype != dt_out:
+        raise ValueError("out must have shape {} and dtype {}, not {} and "
+                         "{}".format(shape, dt_out, out.shape, out.dtype))
+    frequencies = np.empty(scales.size)
+    for index, coefs, freqs, offset, factor in _octave_blocks(
+            data.astype(dt_real), scales, wavelet, sampling_period, method,
+            dtype, workers):
+        if factor > 1:
+            coefs = _resample(coefs, offset, factor, factor, data.size)
+        out[index] = coefs
+        frequencies[index] = freqs
+    return out, frequencies
+
+
+def cwt_iter(data, scales, wavelet, sampling_period=1., chunk_size=16,
+             workers=1, dtype=None, method='conv', decimate=False):
+    """
+    cwt_iter(data, scales, wavelet, sampling_period=1., chunk_size=16,
+             workers=1, dtype=None, method='conv', decimate=False)
+
+    One dimensional Continuous Wavelet Transform computed in blocks of scales.
+
+    Yields the same coefficients as `cwt`, but only ever holds `chunk_size`
+    rows of the scalogram, so reductions over long signals (ridge detection,
+    band energies, ...) run in bounded memory.
+
+    Parameters
+    ----------
+    data : array_like
+        Input signal
+    scales : array_like
+        scales to use
+    wavelet : Wavelet object or name
+        Wavelet to use
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    chunk_size : int, optional
+        Number of scales per block. Default is 16.
+    workers : int, optional
+        Number of threads used to compute the scales of a block in parallel.
+        See `cwt`.
+    dtype : dtype, optional
+        Precision of the computation and of the coefficients. See `cwt`.
+    method : {'conv', 'fft'}, optional
+        Convolution method. See `cwt`.
+    decimate : bool, optional
+        If True, compute the transform on a signal decimated once per octave
+        (see `cwt`) and yield every block at its native rate: the blocks
+        then hold scales of a single octave, in increasing order of
+        decimation, and column ``k`` of a block decimated by ``factor``
+        corresponds to sample ``factor * k`` of `data`.  Default is False.
+
+    Yields
+    ------
+    scale_block : ndarray
+        Scales of the current block.
+    coef_block : ndarray
+        Coefficients of shape ``(len(scale_block), len(data))``, or
+        ``(len(scale_block), ceil(len(data) / factor))`` if `decimate` is
+        True.
+    freqs : ndarray
+        Frequencies corresponding to `scale_block`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> x = np.sin(2 * np.pi * np.arange(4096) / 32)
+    >>> energy = np.concatenate([
+    ...     np.sum(coefs**2, axis=1)
+    ...     for scales, coefs, freqs in pywt.cwt_iter(x, np.arange(1, 65),
+    ...                                               'mexh')])
+    >>> energy.shape
+    (64,)
+    """
+    chunk_size = int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    dt = _check_dtype(data)
+    data = np.array(data, dtype=dt)
+    if not isinstance(wavelet, (ContinuousWavelet, Wavelet)):
+        wavelet = DiscreteContinuousWavelet(wavelet)
+    if data.ndim != 1:
+        raise ValueError("Only dim == 1 supportet")
+    if dtype is None:
+        dtype = _default_dtype(data, wavelet)
+    scales = np.atleast_1d(scales)
+    if decimate:
+        dt_real, dt_out = _cwt_dtypes(dtype, wavelet)
+        for index, coefs, freqs, offset, factor in _octave_blocks(
+                data.astype(dt_real), scales, wavelet, sampling_period,
+                method, dtype, workers, chunk_size):
+            if factor > 1:
+                coefs = _resample(coefs, offset, factor, 1,
+                                  -(-data.size // factor)).astype(dt_out)
+            yield scales[index], coefs, freqs
+        return
+    for start in range(0, scales.size, chunk_size):
+        # only the filters of the current block are held in memory
+        plan = CWTPlan(data.size, scales[start:start + chunk_size], wavelet,
+                       sampling_period, method, dtype)
+        yield plan.scales, plan(data, workers=workers), plan.frequencies
+
+
+class StreamingCWT(object):
+    """
+    StreamingCWT(scales, wavelet, sampling_period=1., method='conv',
+                 dtype=None, block_size=None)
+
+    Continuous wavelet transform of a signal that arrives in chunks.
+
+    Samples are fed with `push`, which returns the columns of the scalogram
+    that no longer depend on future samples.  The samples still needed by
+    the wavelets are kept between calls (overlap-save), so with
+    ``method='conv'`` the columns are the same as those of `cwt` on the
+    concatenated signal, including the zero padding at its start.  With
+    ``method='fft'`` they match ``cwt(..., method='fft')`` at the scales
+    where the wavelet is resolved below the Nyquist frequency; at smaller
+    scales its sampled spectrum aliases differently for the FFT length of
+    the blocks than for that of the whole signal.  `flush` ends the signal
+    and returns the remaining columns.
+
+    Parameters
+    ----------
+    scales : array_like
+        scales to use
+    wavelet : Wavelet object or name
+        Wavelet to use
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    method : {'conv', 'fft'}, optional
+        Convolve directly (default), evaluating only the newly finalized
+        columns, or multiply in the frequency domain in blocks of
+        `block_size` columns.  See `CWTPlan`.
+    dtype : dtype, optional
+        Precision of the computation and of the coefficients (see `cwt`).
+        Defaults to the precision of the wavelet.
+    block_size : int, optional
+        Maximum number of columns computed at once.  With ``method='fft'``,
+        columns are only returned in complete blocks, which adds up to
+        ``block_size - 1`` samples of latency.  Defaults to 1024 for
+        ``'conv'``, and to 1024 or the length of the longest wavelet if that
+        is larger for ``'fft'``.
+
+    Attributes
+    ----------
+    scales : ndarray
+        The scales of the transform.
+    frequencies : ndarray
+        Frequencies corresponding to `scales`.
+    dtype : dtype
+        dtype of the coefficients.
+    latency : ndarray
+        Number of samples that must follow a sample before its coefficient
+        at each scale is final, i.e. about half the length of the wavelet.
+    delay : int
+        Largest latency.  After ``n`` samples have been pushed, columns
+        ``0`` to ``n - delay - 1`` have been returned (rounded down to whole
+        blocks for ``method='fft'``).
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> x = np.sin(2 * np.pi * np.arange(4096) / 32)
+    >>> stream = pywt.StreamingCWT(np.arange(1, 33), 'mexh')
+    >>> blocks = [stream.push(chunk) for chunk in np.split(x, 16)]
+    >>> blocks.append(stream.flush())
+    >>> np.allclose(np.concatenate(blocks, axis=1),
+    ...             pywt.cwt(x, np.arange(1, 33), 'mexh')[0])
+    True
+    """
+    def __init__(self, scales, wavelet, sampling_period=1., method='conv',
+                 dtype=None, block_size=None):
+        if not isinstance(wavelet, (ContinuousWavelet, Wavelet)):
+            wavelet = DiscreteContinuousWavelet(wavelet)
+        scales = np.atleast_1d(scales)
+        if scales.ndim != 1:
+            raise ValueError("scales must be a scalar or a 1D array")
+        if method == 'conv':
+            int_psi, x = integrate_wavelet(wavelet, precision=_PRECISION)
+            int_psi = np.ascontiguousarray(int_psi.real)
+            lengths = [cwt_filter(int_psi, float(x[1] - x[0]),
+                                  float(x[-1] - x[0]), float(scale)).size
+                       for scale in scales]
+        else:
+            width = wavelet.upper_bound - wavelet.lower_bound
+            lengths = np.ceil(np.abs(scales) * width + 1)
+        lengths = np.asarray(lengths, dtype=np.intp)
+        # coefficient i of a filter of length F depends on samples
+        # i - (F - 1 - centre) to i + centre + 1 (see the C kernel)
+        centre = np.maximum(lengths - 2, 0) // 2
+        self.latency = centre + 1
+        self.delay = int(self.latency.max())
+        self._lookback = int(np.max(lengths - 1 - centre))
+        if block_size is None:
+            block_size = 1024
+            if method == 'fft':
+                block_size = max(block_size, self._lookback + self.delay)
+        self.block_size = int(block_size)
+        if self.block_size < 1:
+            raise ValueError("block_size must be a positive integer")
+
+        self._plan = CWTPlan(self._lookback + self.block_size + self.delay,
+                             scales, wavelet, sampling_period, method, dtype)
+        self.scales = self._plan.scales
+        self.frequencies = self._plan.frequencies
+        self.dtype = self._plan.dtype
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        """Discard the samples pushed so far and start a new signal."""
+        # _buffer[0] is sample _start of the signal; the samples before the
+        # signal are zeros
+        self._buffer = np.zeros(self._lookback, dtype=self._plan._dt_real)
+        self._start = -self._lookback
+        self._received = 0
+        self._emitted = 0
+
+    def push(self, chunk):
+        """
+        Append samples to the signal.
+
+        Parameters
+        ----------
+        chunk : array_like
+            1D array of new samples.
+
+        Returns
+        -------
+        coefs : ndarray
+            The columns finalized by `chunk`, of shape ``(len(scales), k)``
+            where ``k`` may be zero.  They follow the columns returned by
+            the previous calls.
+        """
+        chunk = np.asarray(chunk, dtype=self._plan._dt_real)
+        if chunk.ndim != 1:
+            raise ValueError("chunk must be a 1D array")
+        self._buffer = np.concatenate((self._buffer, chunk))
+        self._received += chunk.size
+        return self._emit(self._received - self.delay, final=False)
+
+    def flush(self):
+        """
+        End the signal and return its remaining columns.
+
+        The signal is zero padded beyond its last sample, as by `cwt`.  The
+        object is then reset for a new signal.
+
+        Returns
+        -------
+        coefs : ndarray
+            The last columns, of shape ``(len(scales), k)``.
+        """
+        coefs = self._emit(self._received, final=True)
+        self.reset()
+        return coefs
+
+    def _emit(self, stop, final):
+        """Return the columns from the next one to be emitted up to `stop`."""
+        B = self.block_size
+        n_seg = self._plan.n
+        blocks = []
+        while self._emitted < stop:
+            count = min(B, stop - self._emitted)
+            if count < B and self.method == 'fft' and not final:
+                break
+            first = self._emitted - self._lookback - self._start
+            segment = self._buffer[first:first + n_seg]
+            if segment.size < n_seg:
+                segment = np.concatenate((segment, np.zeros(
+                    n_seg - segment.size, dtype=segment.dtype)))
+            columns = np.arange(self._lookback, self._lookback + count)
+            blocks.append(self._plan(segment, positions=columns))
+            self._emitted += count
+
+        # keep the samples still needed by the next columns
+        first = self._emitted - self._lookback - self._start
+        if first > 0:
+            self._buffer = self._buffer[first:]
+            self._start += first
+        if not blocks:
+            return np.empty((self.scales.size, 0), dtype=self.dtype)
+        if len(blocks) == 1:
+            return blocks[0]
+        return np.concatenate(blocks, axis=1)
+
+
+def cross_wavelet(data, scales, wavelet, pairs=None, sampling_period=1.,
+                  chunk_size=16, workers=1, dtype=None, method='conv',
+                  out=None):
+    """
+    cross_wavelet(data, scales, wavelet, pairs=None, sampling_period=1.,
+                  chunk_size=16, workers=1, dtype=None, method='conv',
+                  out=None)
+
+    Cross wavelet transforms of pairs of channels.
+
+    The cross wavelet transform of channels ``x`` and ``y`` is
+    ``W_x * conj(W_y)``, where ``W_x`` and ``W_y`` are their continuous
+    wavelet transforms.  Every channel is transformed only once per block of
+    `chunk_size` scales, with a `CWTPlan` shared by all channels, so the
+    working memory is that of ``len(data) * chunk_size`` rows of a
+    scalogram.
+
+    Parameters
+    ----------
+    data : array_like
+        Channels of shape ``(n_channels, n)``.
+    scales : array_like
+        scales to use
+    wavelet : Wavelet object or name
+        Wavelet to use
+    pairs : array_like of int, optional
+        Pairs of channel indices of shape ``(n_pairs, 2)``.  By default, all
+        pairs ``(i, j)`` with ``i < j`` in lexicographic order.
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    chunk_size : int, optional
+        Number of scales transformed at once. Default is 16.
+    workers : int, optional
+        Number of threads used to compute the scales in parallel. See `cwt`.
+    dtype : dtype, optional
+        Precision of the computation and of the coefficients. See `cwt`.
+    method : {'conv', 'fft'}, optional
+        Convolution method. See `cwt`.
+    out : ndarray, optional
+        Array of shape ``(n_pairs, len(scales), n)`` into which the spectra
+        are written, e.g. a ``np.memmap``.
+
+    Returns
+    -------
+    xwt : ndarray
+        Cross wavelet transforms of shape ``(n_pairs, len(scales), n)``
+        (`out`, if given).
+    frequencies : ndarray
+        Frequencies corresponding to `scales`.
+
+    See Also
+    --------
+    wavelet_coherence
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> t = np.arange(1024)
+    >>> x = np.stack([np.sin(2 * np.pi * t / 32),
+    ...               np.cos(2 * np.pi * t / 32)])
+    >>> xwt, freqs = pywt.cross_wavelet(x, np.arange(1, 65), 'cmor')
+    >>> xwt.shape
+    (1, 64, 1024)
+    """
+    data, scales, wavelet, pairs, dtype = _check_channels(
+        data, scales, wavelet, pairs, dtype)
+    dt_out = _cwt_dtypes(dtype, wavelet)[1]
+    out = _check_pair_out(out, (pairs.shape[0], scales.size, data.shape[1]),
+                          dt_out)
+    frequencies = np.empty(scales.size)
+    for core, _, coefs, freqs in _channel_blocks(
+            data, scales, wavelet, np.unique(pairs), sampling_period,
+            chunk_size, 0, workers, dtype, method):
+        for p, (i, j) in enumerate(pairs):
+            out[p, core] = coefs[i] * np.conj(coefs[j])
+        frequencies[core] = freqs
+    return out, frequencies
+
+
+def wavelet_coherence(data, scales, wavelet, pairs=None, sampling_period=1.,
+                      time_window=1., scale_window=3, chunk_size=16,
+                      workers=1, dtype=None, method='conv', out=None):
+    """
+    wavelet_coherence(data, scales, wavelet, pairs=None, sampling_period=1.,
+                      time_window=1., scale_window=3, chunk_size=16,
+                      workers=1, dtype=None, method='conv', out=None)
+
+    Wavelet coherence of pairs of channels.
+
+    The squared wavelet coherence of channels ``x`` and ``y`` is::
+
+        R2 = |S(W_x * conj(W_y) / s)|**2 / (S(|W_x|**2 / s) * S(|W_y|**2 / s))
+
+    where ``S`` smooths along time and scale [1]_.  It lies between 0 and 1.
+    As for `cross_wavelet`, every channel is transformed only once per block
+    of `chunk_size` scales (plus the neighbouring scales needed by the
+    smoothing), and the pairwise products are formed block by block.
+
+    Parameters
+    ----------
+    data : array_like
+        Channels of shape ``(n_channels, n)``.
+    scales : array_like
+        scales to use
+    wavelet : Wavelet object or name
+        Wavelet to use
+    pairs : array_like of int, optional
+        Pairs of channel indices of shape ``(n_pairs, 2)``.  By default, all
+        pairs ``(i, j)`` with ``i < j`` in lexicographic order.
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    time_window : float, optional
+        Standard deviation of the Gaussian window smoothing along time, in
+        multiples of the scale (in samples). Default is 1.
+    scale_window : int, optional
+        Number of adjacent scales averaged by the boxcar window smoothing
+        along scales.  Must be odd.  Default is 3.
+    chunk_size : int, optional
+        Number of scales computed at once. Default is 16.
+    workers : int, optional
+        Number of threads used to compute the scales in parallel. See `cwt`.
+    dtype : dtype, optional
+        Precision of the computation and of the coherence. See `cwt`.
+    method : {'conv', 'fft'}, optional
+        Convolution method. See `cwt`.
+    out : ndarray, optional
+        Real array of shape ``(n_pairs, len(scales), n)`` into which the
+        coherence is written, e.g. a ``np.memmap``.
+
+    Returns
+    -------
+    coherence : ndarray
+        Squared wavelet coherence of shape ``(n_pairs, len(scales), n)``
+        (`out`, if given).
+    frequencies : ndarray
+        Frequencies corresponding to `scales`.
+
+    See Also
+    --------
+    cross_wavelet
+
+    References
+    ----------
+    .. [1] C. Torrence and P. J. Webster. Interdecadal Changes in the
+       ENSO-Monsoon System. Journal of Climate, 12:2679-2690, 1999.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> t = np.arange(1024)
+    >>> x = np.stack([np.sin(2 * np.pi * t / 32),
+    ...               np.cos(2 * np.pi * t / 32)])
+    >>> coh, freqs = pywt.wavelet_coherence(x, np.arange(1, 65), 'cmor')
+    >>> coh.shape
+    (1, 64, 1024)
+    """
+    scale_window = int(scale_window)
+    if scale_window < 1 or scale_window % 2 == 0:
+        raise ValueError("scale_window must be a positive odd integer")
+    if time_window < 0:
+        raise ValueError("time_window must be non-negative")
+    data, scales, wavelet, pairs, dtype = _check_channels(
+        data, scales, wavelet, pairs, dtype)
+    dt_real = _cwt_dtypes(dtype, wavelet)[0]
+    out = _check_pair_out(out, (pairs.shape[0], scales.size, data.shape[1]),
+                          dt_real)
+    frequencies = np.empty(scales.size)
+    halo = scale_window // 2
+    max_sigma = time_window * np.abs(scales).max()
+    channels = np.unique(pairs)
+    for core, extended, coefs, freqs in _channel_blocks(
+            data, scales, wavelet, channels, sampling_period, chunk_size,
+            halo, workers, dtype, method):
+        # coefs holds the scales of the block and up to `halo` neighbours on
+        # each side, which the scale smoothing needs
+        block_scales = np.abs(scales[extended]).astype(dt_real)
+        block_scales = block_scales[:, np.newaxis]
+        rows = slice(core.start - extended.start, core.stop - extended.start)
+        power = {}
+        for c in channels:
+            power[c] = _smooth(np.abs(coefs[c])**2 / block_scales,
+                               time_window * block_scales[:, 0],
+                               scale_window, max_sigma)[rows]
+        for p, (i, j) in enumerate(pairs):
+            cross = _smooth(coefs[i] * np.conj(coefs[j]) / block_scales,
+                            time_window * block_scales[:, 0],
+                            scale_window, max_sigma)[rows]
+            out[p, core] = np.abs(cross)**2 / (power[i] * power[j])
+        frequencies[core] = freqs
+    return out, frequencies
+
+
+def cwt2(data, scales, wavelet, angles=None, sampling_period=1., workers=1,
+         dtype=None, out=None):
+    """
+    cwt2(data, scales, wavelet, angles=None, sampling_period=1., workers=1,
+         dtype=None, out=None)
+
+    Two dimensional Continuous Wavelet Transform.
+
+    The image is transformed once with the FFT and multiplied by the
+    spectrum of the wavelet at every scale and angle, evaluated in closed
+    form by ``ContinuousWavelet.fourier``.
+
+    Parameters
+    ----------
+    data : array_like
+        Input image (2D).
+    scales : array_like
+        scales to use
+    wavelet : ContinuousWavelet object or name
+        Wavelet to use.  The Mexican hat (``'mexh'``) is extended to an
+        isotropic wavelet, whose spectrum is that of the 1D wavelet at the
+        radial frequency.  The other families are extended to directional
+        wavelets: the 1D wavelet along the direction given by the angle
+        times a Gaussian ``exp(-x**2 / 2)`` across it, which for ``'morl'``
+        and ``'cmor'`` gives the usual 2D Morlet wavelets.
+    angles : array_like, optional
+        Directions of the wavelet in radians, measured from the last axis
+        towards the first axis.  Default is ``(0, )``.  Isotropic wavelets
+        give the same coefficients at all angles.
+    sampling_period : float
+        Sampling period for frequencies output (optional)
+    workers : int, optional
+        Number of threads used to compute the scales and angles in parallel.
+        See `cwt`.
+    dtype : dtype, optional
+        Precision of the coefficients. See `cwt`.
+    out : ndarray, optional
+        Array of shape ``(len(scales), len(angles)) + data.shape`` into which
+        the coefficients are written, e.g. a ``np.memmap``.  Its dtype must
+        be complex for complex wavelets and real otherwise.
+
+    Returns
+    -------
+    coefs : ndarray
+        Coefficients of shape ``(len(scales), len(angles)) + data.shape``
+        (`out`, if given).
+    frequencies : ndarray
+        Frequencies corresponding to `scales`, along the direction of the
+        wavelet.
+
+    Notes
+    -----
+    The image is zero padded by the support of the largest wavelet, so each
+    forward and inverse FFT covers ``data.shape`` plus that support along
+    both axes.  As for `cwt`, coefficient ``b`` at scale ``s`` is the sum
+    of ``data[u] * psi((u - b) / s) / s`` over the pixels ``u``, where
+    ``psi`` is the 2D wavelet of unit norm.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> y, x = np.mgrid[:128, :128]
+    >>> image = np.sin(2 * np.pi * (x + y) / 16)
+    >>> coefs, freqs = pywt.cwt2(image, [2, 4, 8], 'cmor',
+    ...                          angles=np.arange(4) * np.pi / 4)
+    >>> coefs.shape
+    (3, 4, 128, 128)
+    """
+    dt = _check_dtype(data)
+    data = np.asarray(data, dtype=dt)
+    if data.ndim != 2:
+        raise ValueError("data must be a 2D array")
+    if not isinstance(wavelet, ContinuousWavelet):
+        wavelet = DiscreteContinuousWavelet(wavelet)
+        if not isinstance(wavelet, ContinuousWavelet):
+            raise ValueError("cwt2 requires a continuous wavelet")
+    scales = np.atleast_1d(scales)
+    if scales.ndim != 1:
+        raise ValueError("scales must be a scalar or a 1D array")
+    angles = np.atleast_1d(0. if angles is None else angles)
+    if angles.ndim != 1:
+        raise ValueError("angles must be a scalar or a 1D array")
+    angles = angles.astype(np.float64)
+    if dtype is None:
+        dtype = _default_dtype(data, wavelet, out)
+    dt_real, dt_out = _cwt_dtypes(dtype, wavelet)
+    shape = (scales.size, angles.size) + data.shape
+    if out is None:
+        out = np.empty(shape, dtype=dt_out)
+    elif out.shape != shape or out.dtype != dt_out:
+        raise ValueError("out must have shape {} and dtype {}, not {} and "
+                         "{}".format(shape, dt_out, out.shape, out.dtype))
+
+    width = wavelet.upper_bound - wavelet.lower_bound
+    support = int(np.ceil(np.max(np.abs(scales)) * width)) + 1
+    padded = tuple(_next_fast_len(n + support) for n in data.shape)
+    f0 = np.fft.fftfreq(padded[0])[:, np.newaxis]
+    if wavelet.complex_cwt:
+        f1 = np.fft.fftfreq(padded[1])[np.newaxis, :]
+        data_spectrum = np.fft.fft2(data, padded)
+    else:
+        f1 = np.fft.rfftfreq(padded[1])[np.newaxis, :]
+        data_spectrum = np.fft.rfft2(data, padded)
+    isotropic = wavelet.short_family_name in _ISOTROPIC_2D
+    if isotropic:
+        # normalize the radial extension to unit energy in 2D
+        rho = np.linspace(0, 16, 16001)
+        norm = np.sqrt(2 * np.pi * np.trapz(
+            np.abs(wavelet.fourier(rho))**2 * rho, rho))
+        n_angles = 1
+    else:
+        n_angles = angles.size
+
+    def _cwt2_filter(k):
+        i, j = divmod(k, n_angles)
+        scale = float(scales[i])
+        if isotropic:
+            spectrum = wavelet.fourier(scale * np.hypot(f0, f1)) / norm
+        else:
+            c, s = np.cos(angles[j]), np.sin(angles[j])
+            along = f1 * c + f0 * s
+            across = f0 * c - f1 * s
+            # unit norm Gaussian across the direction of the wavelet
+            spectrum = wavelet.fourier(-scale * along) * (
+                np.sqrt(2 * np.pi) / np.pi**0.25 *
+                np.exp(-2 * (np.pi * scale * across)**2))
+        spectrum *= scale * data_spectrum
         if wavelet.complex_cwt:
-            out = np.zeros((np.size(scales), data.size), dtype=complex)
+            coefs = np.fft.ifft2(spectrum)
         else:
-            out = np.zeros((np.size(scales), data.size))
-        for i in np.arange(np.size(scales)):
-            precision = 10
-            int_psi, x = integrate_wavelet(wavelet, precision=precision)
-            step = x[1] - x[0]
-            j = np.floor(
-                np.arange(scales[i] * (x[-1] - x[0]) + 1) / (scales[i] * step))
-            if np.max(j) >= np.size(int_psi):
-                j = np.delete(j, np.where((j >= np.size(int_psi)))[0])
-            coef = - np.sqrt(scales[i]) * np.diff(
-                np.convolve(data, int_psi[j.astype(np.int)][::-1]))
-            d = (coef.size - data.size) / 2.
-            out[i, :] = coef[int(np.floor(d)):int(-np.ceil(d))]
-        frequencies = scale2frequency(wavelet, scales, precision)
-        if np.isscalar(frequencies):
-            frequencies = np.array([frequencies])
-        for i in np.arange(len(frequencies)):
-            frequencies[i] /= sampling_period
-        return out, frequencies
+            coefs = np.fft.irfft2(spectrum, padded)
+        out[i, j] = coefs[:data.shape[0], :data.shape[1]]
+
+    _map_scales(_cwt2_filter, scales.size * n_angles, workers)
+    if isotropic:
+        out[:, 1:] = out[:, :1]
+    frequencies = np.atleast_1d(
+        scale2frequency(wavelet, scales, _PRECISION)) / sampling_period
+    return out, frequencies
+
+
+def _check_channels(data, scales, wavelet, pairs, dtype):
+    """Validate the arguments of `cross_wavelet` and `wavelet_coherence`."""
+    dt = _check_dtype(data)
+    data = np.asarray(data, dtype=dt)
+    if data.ndim != 2:
+        raise ValueError("data must be a 2D array of shape (n_channels, n)")
+    scales = np.atleast_1d(scales)
+    if scales.ndim != 1:
+        raise ValueError("scales must be a scalar or a 1D array")
+    if not isinstance(wavelet, (ContinuousWavelet, Wavelet)):
+        wavelet = DiscreteContinuousWavelet(wavelet)
+    n_channels = data.shape[0]
+    if pairs is None:
+        pairs = [(i, j) for i in range(n_channels)
+                 for j in range(i + 1, n_channels)]
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    if pairs.size and (pairs.min() < 0 or pairs.max() >= n_channels):
+        raise IndexError("pairs out of bounds for {} channels".format(
+            n_channels))
+    if dtype is None:
+        dtype = _default_dtype(data, wavelet)
+    return data, scales, wavelet, pairs, dtype
+
+
+def _check_pair_out(out, shape, dtype):
+    """Allocate or validate the output of the pairwise spectra."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError("out must have shape {} and dtype {}, not {} and "
+                         "{}".format(shape, dtype, out.shape, out.dtype))
+    return out
+
+
+def _channel_blocks(data, scales, wavelet, channels, sampling_period,
+                    chunk_size, halo, workers, dtype, method):
+    """Compute the CWT of `channels` of `data` in blocks of scales.
+
+    Yields ``(core, extended, coefs, freqs)`` per block of scales
+    ``scales[core]``, where ``coefs`` maps each channel to its coefficients
+    at ``scales[extended]``, the block extended by up to `halo` scales on
+    either side, and ``freqs`` are the frequencies of ``scales[core]``.
+    """
+    chunk_size = int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    n = data.shape[1]
+    for start in range(0, scales.size, chunk_size):
+        core = slice(start, min(start + chunk_size, scales.size))
+        lo = max(start - halo, 0)
+        hi = min(core.stop + halo, scales.size)
+        # the filters (or spectra) are shared by all channels
+        plan = CWTPlan(n, scales[lo:hi], wavelet, sampling_period, method,
+                       dtype)
+        coefs = dict((c, plan(data[c], workers=workers)) for c in channels)
+        yield (core, slice(lo, hi), coefs,
+               plan.frequencies[start - lo:core.stop - lo])
+
+
+def _smooth(coefs, sigmas, scale_window, max_sigma):
+    """Smooth rows of `coefs` along time and across rows.
+
+    Row ``i`` is convolved with a Gaussian of standard deviation
+    ``sigmas[i]`` samples (with zero padding), and then averaged over
+    `scale_window` adjacent rows (fewer at the first and last rows).
+
+    The FFT length is set by `max_sigma`, the largest standard deviation
+    over all blocks of rows, as the sampled spectra of narrow Gaussians give
+    slightly different smoothing for different lengths.
+    """
+    n = coefs.shape[-1]
+    # the Gaussians are negligible beyond 6 standard deviations
+    L = _next_fast_len(n + int(np.ceil(6 * max_sigma)) + 1)
+    if np.iscomplexobj(coefs):
+        f = np.fft.fftfreq(L)
+        spectrum = np.fft.fft(coefs, L, axis=-1)
     else:
-        raise ValueError("Only dim == 1 supportet")
+        f = np.fft.rfftfreq(L)
+        spectrum = np.fft.rfft(coefs, L, axis=-1)
+    spectrum *= np.exp(-2 * (np.pi * sigmas[:, np.newaxis] * f)**2)
+    if np.iscomplexobj(coefs):
+        smoothed = np.fft.ifft(spectrum, axis=-1)[:, :n]
+    else:
+        smoothed = np.fft.irfft(spectrum, L, axis=-1)[:, :n]
+    smoothed = smoothed.astype(coefs.dtype, copy=False)
+
+    if scale_window > 1:
+        half = scale_window // 2
+        rows = np.arange(coefs.shape[0])
+        first = np.maximum(rows - half, 0)
+        stop = np.minimum(rows + half + 1, coefs.shape[0])
+        cumsum = np.zeros((coefs.shape[0] + 1, n), dtype=smoothed.dtype)
+        np.cumsum(smoothed, axis=0, out=cumsum[1:])
+        smoothed = cumsum[stop] - cumsum[first]
+        smoothed /= (stop - first)[:, np.newaxis]
+    return smoothed
+
+
+def _default_dtype(data, wavelet, out=None):
+    """Return the precision of a CWT of `data` for which none was given.
+
+    The precision of `out` is used if given.  Otherwise, single precision is
+    used only when both the data and the wavelet are single precision.
+    """
+    if out is not None:
+        return out.dtype
+    return np.result_type(data.dtype, getattr(wavelet, 'dt', np.float64))
+
+
+def _check_positions(positions, n):
+    """Return `positions` as contiguous, non-negative indices into length n.
+
+    Negative positions count back from the end, as in numpy indexing.
+    """
+    positions = np.atleast_1d(positions)
+    if positions.ndim != 1:
+        raise ValueError("positions must be a scalar or a 1D array")
+    if positions.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if positions.dtype.kind not in 'iu':
+        raise IndexError("positions must be integers")
+    if positions.min() < -n or positions.max() >= n:
+        raise IndexError("positions out of bounds for data of length "
+                         "{}".format(n))
+    positions = positions.astype(np.intp)
+    return np.where(positions < 0, positions + n, positions)
+
+
+def _octave_blocks(data, scales, wavelet, sampling_period, method, dtype,
+                   workers=1, chunk_size=None):
+    """Compute the CWT of every octave of `scales` on decimated data.
+
+    Yields ``(index, coefs, freqs, offset, factor)`` per block of scales
+    ``scales[index]``, where ``coefs[:, k]`` is located at sample
+    ``factor * k + offset`` of `data`.
+    """
+    lowpass = Wavelet(_DECIMATE_WAVELET)
+    h = np.asarray(lowpass.dec_lo)
+    # approximation coefficient k is centred on sample 2 * k + shift of the
+    # previous level (the filter is symmetric)
+    shift = np.sum(np.arange(h.size) * h**2) / np.sum(h**2) - (h.size - 1)
+    max_level = dwt_max_level(data.size, h.size)
+    octaves = np.log2(np.maximum(np.abs(scales), _DECIMATE_SCALE) /
+                      _DECIMATE_SCALE)
+    octaves = np.minimum(np.floor(octaves), max_level).astype(int)
+
+    approx = data
+    position = 0.
+    for level in range(octaves.max() + 1):
+        factor = 2**level
+        if level > 0:
+            # the orthonormal filter gains sqrt(2) per level, which is exactly
+            # compensated by the coarser sampling of the wavelet
+            approx = downcoef('a', approx, lowpass, 'symmetric', 1)
+            position += shift * factor / 2
+        index = np.flatnonzero(octaves == level)
+        step = chunk_size or max(index.size, 1)
+        for start in range(0, index.size, step):
+            block = index[start:start + step]
+            plan = CWTPlan(approx.size, scales[block] / factor, wavelet,
+                           sampling_period * factor, method, dtype)
+            # both methods delay the coefficients by half a sample of the
+            # rate they run at
+            yield (block, plan(approx, workers=workers), plan.frequencies,
+                   position - (factor - 1) / 2., factor)
+
+
+def _resample(coefs, offset, factor, upsample, n_out):
+    """Band-limited interpolation of rows sampled at ``factor * k + offset``.
+
+    Returns the first `n_out` samples of the rows at ``factor / upsample``
+    times the sample index.
+    """
+    M = coefs.shape[-1]
+    L = M * upsample
+    delay = -offset / factor
+    if np.iscomplexobj(coefs):
+        spectrum = np.fft.fft(coefs, axis=-1)
+        spectrum *= np.exp(2j * np.pi * np.fft.fftfreq(M) * delay)
+        padded = np.zeros((coefs.shape[0], L), dtype=spectrum.dtype)
+        half = (M + 1) // 2
+        padded[:, :half] = spectrum[:, :half]
+        padded[:, L - (M - half):] = spectrum[:, half:]
+        resampled = np.fft.ifft(padded, axis=-1)
+    else:
+        spectrum = np.fft.rfft(coefs, axis=-1)
+        spectrum *= np.exp(2j * np.pi * np.fft.rfftfreq(M) * delay)
+        resampled = np.fft.irfft(spectrum, L, axis=-1)
+    return upsample * resampled[:, :n_out]
@@ -3,4 +3,4 @@ cimport numpy as np
 import numpy as np
 
 cpdef cwt_psi_single(data_t[::1] data, ContinuousWavelet wavelet, size_t output_len)
-
+cpdef cwt_psi_fourier(data_t[::1] data, ContinuousWavelet wavelet)
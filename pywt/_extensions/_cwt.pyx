@@ -122,3 +122,152 @@ cpdef cwt_psi_single(data_t[::1] data, ContinuousWavelet wavelet, size_t output_
                 c_wt.float_cmor(&data[0], <float *>psi_r.data, <float *>psi_i.data, data_size, bandwidth_frequency, center_frequency)
             return (psi_r, psi_i)
 
+
+
+cpdef cwt_psi_fourier(data_t[::1] data, ContinuousWavelet wavelet):
+    """Evaluate the Fourier transform of the wavelet at the frequencies `data`.
+
+    Returns the real and imaginary parts.
+    """
+    cdef np.ndarray psi_r, psi_i
+    cdef data_t[::1] out_r, out_i
+    cdef size_t data_size = data.size
+    cdef int family_number = 0
+    cdef double bandwidth_frequency = wavelet.w.bandwidth_frequency
+    cdef double center_frequency = wavelet.w.center_frequency
+    cdef int fbsp_order = wavelet.w.fbsp_order
+    cdef int family
+
+    if wavelet.number is not None:
+        family_number = wavelet.number
+    if data_t is np.float64_t:
+        psi_r = np.zeros(data_size, np.float64)
+        psi_i = np.zeros(data_size, np.float64)
+    elif data_t is np.float32_t:
+        psi_r = np.zeros(data_size, np.float32)
+        psi_i = np.zeros(data_size, np.float32)
+    if data_size < 1:
+        return (psi_r, psi_i)
+    out_r = psi_r
+    out_i = psi_i
+
+    families = ["gaus", "mexh", "morl", "cgau", "shan", "fbsp", "cmor"]
+    if wavelet.short_family_name not in families:
+        raise ValueError("No Fourier transform available for wavelet "
+                         "{}.".format(wavelet.name))
+    family = families.index(wavelet.short_family_name)
+    if data_t is np.float64_t:
+        with nogil:
+            if family == 0:  # gaus
+                c_wt.double_gaus_fourier(&data[0], &out_r[0], &out_i[0], data_size, family_number)
+            elif family == 1:  # mexh
+                c_wt.double_mexh_fourier(&data[0], &out_r[0], &out_i[0], data_size)
+            elif family == 2:  # morl
+                c_wt.double_morl_fourier(&data[0], &out_r[0], &out_i[0], data_size)
+            elif family == 3:  # cgau
+                c_wt.double_cgau_fourier(&data[0], &out_r[0], &out_i[0], data_size, family_number)
+            elif family == 4:  # shan
+                c_wt.double_shan_fourier(&data[0], &out_r[0], &out_i[0], data_size, bandwidth_frequency, center_frequency)
+            elif family == 5:  # fbsp
+                c_wt.double_fbsp_fourier(&data[0], &out_r[0], &out_i[0], data_size, fbsp_order, bandwidth_frequency, center_frequency)
+            elif family == 6:  # cmor
+                c_wt.double_cmor_fourier(&data[0], &out_r[0], &out_i[0], data_size, bandwidth_frequency, center_frequency)
+    elif data_t is np.float32_t:
+        with nogil:
+            if family == 0:  # gaus
+                c_wt.float_gaus_fourier(&data[0], &out_r[0], &out_i[0], data_size, family_number)
+            elif family == 1:  # mexh
+                c_wt.float_mexh_fourier(&data[0], &out_r[0], &out_i[0], data_size)
+            elif family == 2:  # morl
+                c_wt.float_morl_fourier(&data[0], &out_r[0], &out_i[0], data_size)
+            elif family == 3:  # cgau
+                c_wt.float_cgau_fourier(&data[0], &out_r[0], &out_i[0], data_size, family_number)
+            elif family == 4:  # shan
+                c_wt.float_shan_fourier(&data[0], &out_r[0], &out_i[0], data_size, bandwidth_frequency, center_frequency)
+            elif family == 5:  # fbsp
+                c_wt.float_fbsp_fourier(&data[0], &out_r[0], &out_i[0], data_size, fbsp_order, bandwidth_frequency, center_frequency)
+            elif family == 6:  # cmor
+                c_wt.float_cmor_fourier(&data[0], &out_r[0], &out_i[0], data_size, bandwidth_frequency, center_frequency)
+    return (psi_r, psi_i)
+
+
+cpdef cwt_filter(data_t[::1] int_psi, double step, double width, double scale):
+    """Return the integrated wavelet resampled at `scale`, in natural order."""
+    cdef size_t psi_size = int_psi.size
+    cdef size_t filter_size
+    cdef np.ndarray filt
+    if psi_size < 1:
+        raise ValueError("int_psi must not be empty.")
+
+    if data_t is np.float64_t:
+        filter_size = c_wt.double_cwt_filter_length(psi_size, step, width, scale)
+        if filter_size < 1:
+            raise ValueError("Scale too small for the wavelet sampling.")
+        filt = np.empty(filter_size, np.float64)
+        with nogil:
+            c_wt.double_cwt_filter(&int_psi[0], step, scale,
+                                   <double *>filt.data, filter_size)
+    elif data_t is np.float32_t:
+        filter_size = c_wt.float_cwt_filter_length(psi_size, step, width, scale)
+        if filter_size < 1:
+            raise ValueError("Scale too small for the wavelet sampling.")
+        filt = np.empty(filter_size, np.float32)
+        with nogil:
+            c_wt.float_cwt_filter(&int_psi[0], step, scale,
+                                  <float *>filt.data, filter_size)
+    return filt
+
+
+cpdef cwt_convolve(data_t[::1] data, data_t[::1] filt, double weight,
+                   data_t[:] output):
+    """Convolve with a filter from `cwt_filter`, differentiate and crop."""
+    cdef size_t data_size = data.size
+    cdef size_t filter_size = filt.size
+    cdef size_t out_stride
+    if data_size < 1 or filter_size < 1:
+        raise ValueError("data and filt must not be empty.")
+    if output.shape[0] != data.shape[0]:
+        raise ValueError("output must have the same length as data.")
+    out_stride = output.strides[0] // sizeof(data_t)
+
+    if data_t is np.float64_t:
+        with nogil:
+            c_wt.double_cwt_convolve(&data[0], data_size, &filt[0], filter_size,
+                                     weight, &output[0], out_stride)
+    elif data_t is np.float32_t:
+        with nogil:
+            c_wt.float_cwt_convolve(&data[0], data_size, &filt[0], filter_size,
+                                    <float>weight, &output[0], out_stride)
+
+
+cpdef cwt_convolve_at(data_t[::1] data, data_t[::1] filt, double weight,
+                      pywt_index_t[::1] positions, data_t[:] output):
+    """Evaluate `cwt_convolve` only at the given output positions."""
+    cdef size_t data_size = data.size
+    cdef size_t filter_size = filt.size
+    cdef size_t n_pos = positions.size
+    cdef size_t out_stride
+    cdef pywt_index_t i
+    if data_size < 1 or filter_size < 1:
+        raise ValueError("data and filt must not be empty.")
+    if output.shape[0] != positions.shape[0]:
+        raise ValueError("output must have the same length as positions.")
+    for i in range(positions.shape[0]):
+        if positions[i] < 0 or positions[i] >= data.shape[0]:
+            raise IndexError("positions out of bounds for data of length "
+                             "{}.".format(data_size))
+    if n_pos == 0:
+        return
+    out_stride = output.strides[0] // sizeof(data_t)
+
+    if data_t is np.float64_t:
+        with nogil:
+            c_wt.double_cwt_convolve_at(&data[0], data_size, &filt[0],
+                                        filter_size, weight, &positions[0],
+                                        n_pos, &output[0], out_stride)
+    elif data_t is np.float32_t:
+        with nogil:
+            c_wt.float_cwt_convolve_at(&data[0], data_size, &filt[0],
+                                       filter_size, <float>weight,
+                                       &positions[0], n_pos, &output[0],
+                                       out_stride)
@@ -54,13 +54,16 @@ cpdef dwt_single(data_t[::1] data, Wavelet wavelet, MODE mode):
     return (cA, cD)
 
 
-cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0):
+cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0,
+               np.ndarray cA=None, np.ndarray cD=None):
     # memory-views do not support n-dimensional arrays, use np.ndarray instead
-    cdef common.ArrayInfo data_info, output_info
-    cdef np.ndarray cD, cA
+    # cA and cD are optional output arrays, which may be strided views
+    cdef common.ArrayInfo data_info, output_info, output_d_info
+    cdef np.ndarray out
     # Explicit input_shape necessary to prevent memory leak
     cdef size_t[::1] input_shape, output_shape
     cdef int retval
+    cdef int i
 
     data = data.astype(_check_dtype(data), copy=False)
 
@@ -68,8 +71,21 @@ cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0)
     output_shape = input_shape.copy()
     output_shape[axis] = common.dwt_buffer_length(data.shape[axis], wavelet.dec_len, mode)
 
-    cA = np.empty(output_shape, data.dtype)
-    cD = np.empty(output_shape, data.dtype)
+    if cA is None:
+        cA = np.empty(output_shape, data.dtype)
+    if cD is None:
+        cD = np.empty(output_shape, data.dtype)
+    for out in (cA, cD):
+        if out.dtype != data.dtype:
+            raise ValueError("Output array must have dtype {}, not {}"
+                             .format(data.dtype, out.dtype))
+        if out.ndim != data.ndim:
+            raise ValueError("Output array has the wrong number of dimensions")
+        for i in range(data.ndim):
+            if <size_t> out.shape[i] != output_shape[i]:
+                raise ValueError("Output array has the wrong shape")
+        if not np.PyArray_ISWRITEABLE(out):
+            raise ValueError("Output array is read-only")
 
     data_info.ndim = data.ndim
     data_info.strides = <pywt_index_t *> data.strides
@@ -79,6 +95,10 @@ cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0)
     output_info.strides = <pywt_index_t *> cA.strides
     output_info.shape = <size_t *> cA.shape
 
+    output_d_info.ndim = cD.ndim
+    output_d_info.strides = <pywt_index_t *> cD.strides
+    output_d_info.shape = <size_t *> cD.shape
+
     if data.dtype == np.float64:
         with nogil:
             retval = c_wt.double_downcoef_axis(<double *> data.data, data_info,
@@ -89,7 +109,7 @@ cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0)
             raise RuntimeError("C wavelet transform failed")
         with nogil:
             retval = c_wt.double_downcoef_axis(<double *> data.data, data_info,
-                                     <double *> cD.data, output_info,
+                                     <double *> cD.data, output_d_info,
                                      wavelet.w, axis, common.COEF_DETAIL, mode,
                                      0, common.DWT_TRANSFORM)
         if retval:
@@ -104,7 +124,7 @@ cpdef dwt_axis(np.ndarray data, Wavelet wavelet, MODE mode, unsigned int axis=0)
             raise RuntimeError("C wavelet transform failed")
         with nogil:
             retval = c_wt.float_downcoef_axis(<float *> data.data, data_info,
-                                    <float *> cD.data, output_info,
+                                    <float *> cD.data, output_d_info,
                                     wavelet.w, axis, common.COEF_DETAIL, mode,
                                     0, common.DWT_TRANSFORM)
         if retval:
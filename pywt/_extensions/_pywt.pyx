@@ -8,11 +8,13 @@ __all__ = ['MODES', 'Modes', 'DiscreteContinuousWavelet', 'Wavelet', 'Continuous
 
 
 import warnings
+from collections import OrderedDict
+from threading import Lock
 
 cimport c_wt
 cimport common
 from ._dwt cimport upcoef
-from ._cwt cimport cwt_psi_single
+from ._cwt cimport cwt_psi_single, cwt_psi_fourier
 
 from libc.math cimport pow, sqrt
 
@@ -33,6 +35,43 @@ _attr_deprecation_msg = ('{old} has been renamed to {new} and will '
                          'of pywt.')
 
 
+class _LRUCache(object):
+    """Thread-safe mapping keeping the `maxsize` most recently used items."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        """Return the value of `key` (None if missing) and mark it as used."""
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return None
+            self._items[key] = value
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# approximations computed by Wavelet.wavefun and ContinuousWavelet.wavefun
+_wavefun_cache = _LRUCache(maxsize=32)
+
+
 # raises exception if the wavelet name is undefined
 cdef int is_discrete_wav(WAVELET_NAME name):
     cdef int is_discrete
@@ -564,7 +603,26 @@ cdef public class Wavelet [type WaveletType, object WaveletObject]:
         >>> wavelet = pywt.Wavelet('bior3.5')
         >>> phi_d, psi_d, phi_r, psi_r, x = wavelet.wavefun(level=5)
 
+        Notes
+        -----
+        The approximations of recently used wavelets and levels are cached, so
+        repeated calls only copy them.
+
         """
+        key = (self._cache_key(), level)
+        approximations = _wavefun_cache.get(key)
+        if approximations is None:
+            approximations = self._wavefun(level)
+            _wavefun_cache.put(key, approximations)
+        return [np.array(a) for a in approximations]
+
+    def _cache_key(self):
+        """Hashable description of everything `wavefun` depends on."""
+        return (self.w.base.orthogonal, self.w.base.biorthogonal,
+                self.w.vanishing_moments_psi,
+                tuple(tuple(f) for f in self.filter_bank))
+
+    def _wavefun(self, int level):
         cdef pywt_index_t filter_length "filter_length"
         cdef pywt_index_t right_extent_length "right_extent_length"
         cdef pywt_index_t output_length "output_length"
@@ -852,7 +910,26 @@ cdef public class ContinuousWavelet [type ContinuousWaveletType, object Continuo
         <matplotlib.text.Text object at ...>
         >>> plt.show() # doctest: +SKIP
 
+        The approximations of recently used wavelets, lengths and dtypes are
+        cached, so repeated calls only copy them.
+
         """
+        if length is None:
+            length = <pywt_index_t>pow(2., <double>level)
+        key = (self._cache_key(), int(length))
+        approximations = _wavefun_cache.get(key)
+        if approximations is None:
+            approximations = self._wavefun(level, length)
+            _wavefun_cache.put(key, approximations)
+        return [np.array(a) for a in approximations]
+
+    def _cache_key(self):
+        """Hashable description of everything `wavefun` depends on."""
+        return (self.name, self.w.lower_bound, self.w.upper_bound,
+                self.w.center_frequency, self.w.bandwidth_frequency,
+                self.w.fbsp_order, self.w.complex_cwt, np.dtype(self.dt))
+
+    def _wavefun(self, int level, length):
         cdef pywt_index_t output_length "output_length"
         cdef psi_i, psi_r, psi
         cdef np.float64_t[::1] x64, psi64
@@ -889,6 +966,53 @@ cdef public class ContinuousWavelet [type ContinuousWaveletType, object Continuo
                     return [np.asarray(psi, dtype=self.dt),
                             np.asarray(x32, dtype=self.dt)]
 
+    def fourier(self, freqs):
+        """
+        fourier(self, freqs)
+
+        Evaluates the Fourier transform of the wavelet function (`psi`) at the
+        given frequencies.
+
+        Parameters
+        ----------
+        freqs : array_like
+            Frequencies, in cycles per unit of the `wavefun` grid.
+
+        Returns
+        -------
+        psi_hat : ndarray
+            Complex Fourier transform of `psi`, of the same shape as `freqs`.
+
+        Notes
+        -----
+        The transform is defined as
+        ``psi_hat(f) = integral of psi(t) * exp(-2j * pi * f * t) dt`` and is
+        evaluated in closed form for the gaus, mexh, morl, cgau, shan, fbsp
+        and cmor families, so it does not depend on `lower_bound` and
+        `upper_bound`.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import pywt
+        >>> wavelet = pywt.ContinuousWavelet("cmor")
+        >>> psi_hat = wavelet.fourier(np.linspace(-2, 2, 101))
+        >>> psi_hat.shape
+        (101,)
+        """
+        cdef np.float64_t[::1] f64
+        cdef np.float32_t[::1] f32
+
+        freqs = np.asarray(freqs)
+        shape = freqs.shape
+        if (self.dt == np.float64):
+            f64 = np.ascontiguousarray(freqs.ravel(), dtype=np.float64)
+            psi_r, psi_i = cwt_psi_fourier(f64, self)
+        else:
+            f32 = np.ascontiguousarray(freqs.ravel(), dtype=np.float32)
+            psi_r, psi_i = cwt_psi_fourier(f32, self)
+        return (psi_r + 1j * psi_i).reshape(shape)
+
     def __str__(self):
         s = []
         for x in [
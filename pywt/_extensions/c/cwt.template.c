@@ -223,5 +223,279 @@ const TYPE  FB, const TYPE  FC)
 }
 
 
+/* Fourier transforms of the wavelet functions above,
+ *
+ *     psi_hat(f) = integral of psi(t) * exp(-2 pi i f t) dt,
+ *
+ * evaluated in closed form at the frequencies in `input` (cycles per unit of
+ * t). The bounds of the effective support are not used. */
+
+void CAT(TYPE, _gaus_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const size_t number)
+{
+    /* psi is +-(d/dt)^number exp(-t^2), normalised; the signs are such that
+     * the transform is real for even and imaginary for odd orders */
+    static const double norm[8] = {1, 3, 15, 105, 945, 10395, 135135, 2027025};
+    const TYPE c = CAT(TYPE, _sqrt)(CAT(TYPE, _pi)()) /
+        CAT(TYPE, _sqrt)((TYPE)norm[number - 1] *
+                         CAT(TYPE, _sqrt)(CAT(TYPE, _pi)() / 2));
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        const TYPE w = 2 * CAT(TYPE, _pi)() * input[i];
+        const TYPE v = c * CAT(TYPE, _pow)(w, (TYPE)number) *
+            CAT(TYPE, _exp)(-w * w / 4);
+        output_r[i] = (number % 2) ? 0 : v;
+        output_i[i] = (number % 2) ? v : 0;
+    }
+}
+
+void CAT(TYPE, _mexh_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N)
+{
+    const TYPE c = 2 * CAT(TYPE, _sqrt)(2 * CAT(TYPE, _pi)()) /
+        (CAT(TYPE, _sqrt)(3) * CAT(TYPE, _sqrt)(CAT(TYPE, _sqrt)(CAT(TYPE, _pi)())));
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        const TYPE w = 2 * CAT(TYPE, _pi)() * input[i];
+        output_r[i] = c * w * w * CAT(TYPE, _exp)(-w * w / 2);
+        output_i[i] = 0;
+    }
+}
+
+void CAT(TYPE, _morl_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N)
+{
+    const TYPE c = CAT(TYPE, _sqrt)(2 * CAT(TYPE, _pi)()) / 2;
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        const TYPE w = 2 * CAT(TYPE, _pi)() * input[i];
+        output_r[i] = c * (CAT(TYPE, _exp)(-(w - 5) * (w - 5) / 2) +
+                           CAT(TYPE, _exp)(-(w + 5) * (w + 5) / 2));
+        output_i[i] = 0;
+    }
+}
+
+void CAT(TYPE, _cgau_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const size_t number)
+{
+    /* psi is (d/dt)^number exp(-i t - t^2), normalised */
+    static const double norm[8] = {2, 10, 76, 764, 9496, 140152, 2390480,
+                                   46206736};
+    const TYPE c = CAT(TYPE, _sqrt)(CAT(TYPE, _pi)()) /
+        CAT(TYPE, _sqrt)((TYPE)norm[number - 1] *
+                         CAT(TYPE, _sqrt)(CAT(TYPE, _pi)() / 2));
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        const TYPE w = 2 * CAT(TYPE, _pi)() * input[i];
+        const TYPE v = c * CAT(TYPE, _pow)(w, (TYPE)number) *
+            CAT(TYPE, _exp)(-(w + 1) * (w + 1) / 4);
+        /* multiply by i^number */
+        switch (number % 4) {
+            case 0:
+                output_r[i] = v;
+                output_i[i] = 0;
+                break;
+            case 1:
+                output_r[i] = 0;
+                output_i[i] = v;
+                break;
+            case 2:
+                output_r[i] = -v;
+                output_i[i] = 0;
+                break;
+            case 3:
+                output_r[i] = 0;
+                output_i[i] = -v;
+                break;
+        }
+    }
+}
+
+void CAT(TYPE, _shan_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const TYPE FB, const TYPE FC)
+{
+    const TYPE c = 1 / CAT(TYPE, _sqrt)(FB);
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        const TYPE d = (input[i] > FC) ? input[i] - FC : FC - input[i];
+        if (d < FB / 2)
+            output_r[i] = c;
+        else if (d == FB / 2)
+            output_r[i] = c / 2;
+        else
+            output_r[i] = 0;
+        output_i[i] = 0;
+    }
+}
+
+/* centered cardinal B-spline of degree M - 1 (M-fold convolution of the
+ * unit box) */
+static TYPE CAT(TYPE, _bspline)(const TYPE x, const unsigned int M)
+{
+    const TYPE a = (x < 0) ? -x : x;
+    TYPE binom = 1, factorial = 1, sum = 0, y;
+    unsigned int k;
+    if (a > (TYPE)M / 2)
+        return 0;
+    if (M == 1)
+        return (a < (TYPE)0.5) ? 1 : (TYPE)0.5;
+    for (k = 1; k < M; k++)
+        factorial *= k;
+    for (k = 0; k <= M; k++)
+    {
+        y = a + (TYPE)M / 2 - k;
+        if (y > 0)
+            sum += ((k % 2) ? -binom : binom) * CAT(TYPE, _pow)(y, (TYPE)(M - 1));
+        binom = binom * (M - k) / (k + 1);
+    }
+    return sum / factorial;
+}
+
+void CAT(TYPE, _fbsp_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const unsigned int M, const TYPE FB, const TYPE FC)
+{
+    const TYPE c = (TYPE)M / CAT(TYPE, _sqrt)(FB);
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        output_r[i] = c * CAT(TYPE, _bspline)(M * (input[i] - FC) / FB, M);
+        output_i[i] = 0;
+    }
+}
+
+void CAT(TYPE, _cmor_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const TYPE FB, const TYPE FC)
+{
+    const TYPE c = CAT(TYPE, _pi)() * CAT(TYPE, _pi)() * FB;
+    size_t i;
+    for (i = 0; i < N; i++)
+    {
+        output_r[i] = CAT(TYPE, _exp)(-c * (input[i] - FC) * (input[i] - FC));
+        output_i[i] = 0;
+    }
+}
+
+
+/* Continuous wavelet transform by direct convolution.
+ *
+ * The integrated wavelet `int_psi` (sampled with spacing `step` over a support
+ * of length `width`) is resampled for the given `scale` and convolved with the
+ * input. The first difference of the convolution, weighted by -sqrt(scale)
+ * and cropped to the central N samples, forms one row of the CWT.
+ */
+
+size_t CAT(TYPE, _cwt_filter_length)(const size_t psi_len, const double step,
+                                     const double width, const double scale)
+{
+    const double n_taps = ceil(scale * width + 1);
+    const double scaled_step = scale * step;
+    size_t k = 0;
+    while (k < n_taps && floor(k / scaled_step) < psi_len)
+        ++k;
+    return k;
+}
+
+/* The filter is stored in natural (not reversed) order, so the convolution
+ * below is evaluated as a forward dot product. */
+void CAT(TYPE, _cwt_filter)(const TYPE * const restrict int_psi,
+                            const double step, const double scale,
+                            TYPE * const restrict filter, const size_t F)
+{
+    const double scaled_step = scale * step;
+    size_t k;
+    for (k = 0; k < F; ++k)
+        filter[k] = int_psi[(size_t)floor(k / scaled_step)];
+}
+
+static TYPE CAT(TYPE, _cwt_dot)(const TYPE * const restrict a,
+                                const TYPE * const restrict b, const size_t n)
+{
+    /* independent partial sums allow the loop to be pipelined */
+    TYPE s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+    size_t i = 0;
+    for (; i + 4 <= n; i += 4){
+        s0 += a[i] * b[i];
+        s1 += a[i + 1] * b[i + 1];
+        s2 += a[i + 2] * b[i + 2];
+        s3 += a[i + 3] * b[i + 3];
+    }
+    for (; i < n; ++i)
+        s0 += a[i] * b[i];
+    return (s0 + s1) + (s2 + s3);
+}
+
+/* k-th sample of the full convolution of input (N) and reversed filter (F) */
+static TYPE CAT(TYPE, _cwt_conv_at)(const TYPE * const restrict input,
+                                    const size_t N,
+                                    const TYPE * const restrict filter,
+                                    const size_t F, const size_t k)
+{
+    /* filter[m] multiplies input[k - F + 1 + m] */
+    const size_t m_start = (k + 1 < F) ? F - 1 - k : 0;
+    const size_t m_stop = (k + 1 > N) ? ((N + F - 1 > k) ? N + F - 1 - k : 0) : F;
+    if (m_stop <= m_start)
+        return 0;
+    return CAT(TYPE, _cwt_dot)(filter + m_start,
+                               input + (k + 1 + m_start - F), m_stop - m_start);
+}
+
+void CAT(TYPE, _cwt_convolve)(const TYPE * const restrict input, const size_t N,
+                              const TYPE * const restrict filter, const size_t F,
+                              const TYPE weight, TYPE * const restrict output,
+                              const size_t out_stride)
+{
+    /* full convolution has N + F - 1 samples and its difference N + F - 2;
+     * keep the central N samples of the difference */
+    const size_t start = (F >= 2) ? (F - 2) / 2 : 0;
+    size_t i;
+    TYPE prev, cur;
+
+    prev = CAT(TYPE, _cwt_conv_at)(input, N, filter, F, start);
+    for (i = 0; i < N; ++i){
+        cur = CAT(TYPE, _cwt_conv_at)(input, N, filter, F, start + i + 1);
+        output[i * out_stride] = weight * (cur - prev);
+        prev = cur;
+    }
+}
+
+/* Same as _cwt_convolve, but only at the n_pos output samples in positions,
+ * which must lie in [0, N). */
+void CAT(TYPE, _cwt_convolve_at)(const TYPE * const restrict input,
+                                 const size_t N,
+                                 const TYPE * const restrict filter,
+                                 const size_t F, const TYPE weight,
+                                 const pywt_index_t * const restrict positions,
+                                 const size_t n_pos,
+                                 TYPE * const restrict output,
+                                 const size_t out_stride)
+{
+    const size_t start = (F >= 2) ? (F - 2) / 2 : 0;
+    size_t i, k;
+
+    for (i = 0; i < n_pos; ++i){
+        k = start + (size_t)positions[i];
+        output[i * out_stride] = weight * (
+            CAT(TYPE, _cwt_conv_at)(input, N, filter, F, k + 1) -
+            CAT(TYPE, _cwt_conv_at)(input, N, filter, F, k));
+    }
+}
+
 #endif /* TYPE */
 #undef restrict
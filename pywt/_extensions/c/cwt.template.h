@@ -39,5 +39,60 @@ void CAT(TYPE, _fbsp)(const TYPE * const restrict input, TYPE * const restrict o
 
 void CAT(TYPE, _cmor)(const TYPE * const restrict input, TYPE * const restrict output_r, TYPE * const restrict output_i, const size_t N,
                               const TYPE  FB, const TYPE  FC);
+
+void CAT(TYPE, _gaus_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const size_t number);
+
+void CAT(TYPE, _mexh_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N);
+
+void CAT(TYPE, _morl_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N);
+
+void CAT(TYPE, _cgau_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const size_t number);
+
+void CAT(TYPE, _shan_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const TYPE FB, const TYPE FC);
+
+void CAT(TYPE, _fbsp_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const unsigned int M, const TYPE FB, const TYPE FC);
+
+void CAT(TYPE, _cmor_fourier)(const TYPE * const restrict input,
+                              TYPE * const restrict output_r,
+                              TYPE * const restrict output_i, const size_t N,
+                              const TYPE FB, const TYPE FC);
+
+size_t CAT(TYPE, _cwt_filter_length)(const size_t psi_len, const double step,
+                                     const double width, const double scale);
+
+void CAT(TYPE, _cwt_filter)(const TYPE * const restrict int_psi,
+                            const double step, const double scale,
+                            TYPE * const restrict filter, const size_t F);
+
+void CAT(TYPE, _cwt_convolve)(const TYPE * const restrict input, const size_t N,
+                              const TYPE * const restrict filter, const size_t F,
+                              const TYPE weight, TYPE * const restrict output,
+                              const size_t out_stride);
+
+void CAT(TYPE, _cwt_convolve_at)(const TYPE * const restrict input,
+                                 const size_t N,
+                                 const TYPE * const restrict filter,
+                                 const size_t F, const TYPE weight,
+                                 const pywt_index_t * const restrict positions,
+                                 const size_t n_pos,
+                                 TYPE * const restrict output,
+                                 const size_t out_stride);
+
 #endif /* TYPE */
 #undef restrict
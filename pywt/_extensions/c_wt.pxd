@@ -107,6 +107,35 @@ cdef extern from "c/cwt.h":
     cdef void double_cmor(const double * const input, double * const output_r, double * const output_i, const size_t N,
                                   double FB, double FC) nogil
 
+    cdef void double_gaus_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N, const size_t number) nogil
+    cdef void double_mexh_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N) nogil
+    cdef void double_morl_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N) nogil
+    cdef void double_cgau_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N, const size_t number) nogil
+    cdef void double_shan_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N, double FB, double FC) nogil
+    cdef void double_fbsp_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N, int M, double FB, double FC) nogil
+    cdef void double_cmor_fourier(const double * const input, double * const output_r, double * const output_i,
+                                  const size_t N, double FB, double FC) nogil
+
+    cdef size_t double_cwt_filter_length(const size_t psi_len, const double step,
+                                        const double width, const double scale) nogil
+    cdef void double_cwt_filter(const double * const int_psi, const double step,
+                            const double scale, double * const filter, const size_t F) nogil
+    cdef void double_cwt_convolve(const double * const input, const size_t N,
+                              const double * const filter, const size_t F,
+                              const double weight, double * const output,
+                              const size_t out_stride) nogil
+    cdef void double_cwt_convolve_at(const double * const input, const size_t N,
+                                     const double * const filter, const size_t F,
+                                     const double weight, const pywt_index_t * const positions,
+                                     const size_t n_pos, double * const output,
+                                     const size_t out_stride) nogil
+
 
     cdef void float_gaus(const float * const input, float * const output, const size_t N,
                                   const size_t number) nogil
@@ -127,3 +156,32 @@ cdef extern from "c/cwt.h":
     cdef void float_cmor(const float * const input, float * const output_r, float * const output_i, const size_t N,
                         float FB, float FC) nogil
 
+    cdef void float_gaus_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N, const size_t number) nogil
+    cdef void float_mexh_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N) nogil
+    cdef void float_morl_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N) nogil
+    cdef void float_cgau_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N, const size_t number) nogil
+    cdef void float_shan_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N, float FB, float FC) nogil
+    cdef void float_fbsp_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N, int M, float FB, float FC) nogil
+    cdef void float_cmor_fourier(const float * const input, float * const output_r, float * const output_i,
+                                 const size_t N, float FB, float FC) nogil
+
+    cdef size_t float_cwt_filter_length(const size_t psi_len, const double step,
+                                        const double width, const double scale) nogil
+    cdef void float_cwt_filter(const float * const int_psi, const double step,
+                            const double scale, float * const filter, const size_t F) nogil
+    cdef void float_cwt_convolve(const float * const input, const size_t N,
+                              const float * const filter, const size_t F,
+                              const float weight, float * const output,
+                              const size_t out_stride) nogil
+    cdef void float_cwt_convolve_at(const float * const input, const size_t N,
+                                    const float * const filter, const size_t F,
+                                    const float weight, const pywt_index_t * const positions,
+                                    const size_t n_pos, float * const output,
+                                    const size_t out_stride) nogil
+
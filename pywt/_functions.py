@@ -14,7 +14,8 @@ import warnings
 import numpy as np
 from numpy.fft import fft
 
-from ._extensions._pywt import DiscreteContinuousWavelet, Wavelet, ContinuousWavelet
+from ._extensions._pywt import (DiscreteContinuousWavelet, Wavelet,
+                                ContinuousWavelet, _LRUCache)
 
 
 __all__ = ["integrate_wavelet", "central_frequency", "scale2frequency", "qmf",
@@ -25,6 +26,9 @@ __all__ = ["integrate_wavelet", "central_frequency", "scale2frequency", "qmf",
 _DEPRECATION_MSG = ("`{old}` has been renamed to `{new}` and will "
                     "be removed in a future version of pywt.")
 
+# central frequencies of recently used wavelets and precisions
+_central_frequency_cache = _LRUCache(maxsize=128)
+
 
 def _integrate(arr, step):
     integral = np.cumsum(arr)
@@ -141,6 +145,15 @@ def central_frequency(wavelet, precision=8):
     if not isinstance(wavelet, (Wavelet, ContinuousWavelet)):
         wavelet = DiscreteContinuousWavelet(wavelet)
 
+    key = (type(wavelet), wavelet._cache_key(), precision)
+    freq = _central_frequency_cache.get(key)
+    if freq is None:
+        freq = _central_frequency(wavelet, precision)
+        _central_frequency_cache.put(key, freq)
+    return freq
+
+
+def _central_frequency(wavelet, precision):
     functions_approximations = wavelet.wavefun(precision)
 
     if len(functions_approximations) == 2:
@@ -167,17 +180,21 @@ def scale2frequency(wavelet, scale, precision=8):
     ----------
     wavelet : Wavelet instance or str
         Wavelet to integrate.  If a string, should be the name of a wavelet.
-    scale : scalar
+    scale : scalar or array_like
     precision : int, optional
         Precision that will be used for wavelet function approximation computed
         with ``wavelet.wavefun(level=precision)``.  Default is 8.
 
     Returns
     -------
-    freq : scalar
+    freq : scalar or ndarray
+        Frequency corresponding to each scale.
 
     """
-    return central_frequency(wavelet, precision=precision) / scale
+    freq = central_frequency(wavelet, precision=precision)
+    if np.isscalar(scale):
+        return freq / scale
+    return freq / np.asarray(scale, dtype=np.float64)
 
 
 def qmf(filt):
@@ -191,6 +191,38 @@ def dwtn(data, wavelet, mode='symmetric', axes=None):
     return dict(coeffs)
 
 
+def _dwtn_into(data, wavelet, mode, axes, out):
+    """`dwtn` writing the coefficients into the arrays of the dict `out`.
+
+    The transform along the last of the `axes` writes every subband directly
+    into ``out[key]``, which may be a strided view (e.g. of a packed
+    coefficient array), so only the intermediate subbands are allocated.
+    """
+    data = np.asarray(data)
+    if np.iscomplexobj(data):
+        _dwtn_into(data.real, wavelet, mode, axes,
+                   dict((k, v.real) for k, v in out.items()))
+        _dwtn_into(data.imag, wavelet, mode, axes,
+                   dict((k, v.imag) for k, v in out.items()))
+        return
+
+    axes = [a + data.ndim if a < 0 else a for a in axes]
+    modes = _modes_per_axis(mode, axes)
+    wavelets = _wavelets_per_axis(wavelet, axes)
+
+    coeffs = [('', data)]
+    for axis, wav, mode in zip(axes[:-1], wavelets[:-1], modes[:-1]):
+        new_coeffs = []
+        for subband, x in coeffs:
+            cA, cD = dwt_axis(x, wav, mode, axis)
+            new_coeffs.extend([(subband + 'a', cA),
+                               (subband + 'd', cD)])
+        coeffs = new_coeffs
+    for subband, x in coeffs:
+        dwt_axis(x, wavelets[-1], modes[-1], axes[-1], out[subband + 'a'],
+                 out[subband + 'd'])
+
+
 def _fix_coeffs(coeffs):
     missing_keys = [k for k, v in coeffs.items() if
                     v is None]
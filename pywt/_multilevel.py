@@ -12,13 +12,14 @@ from __future__ import division, print_function, absolute_import
 
 import warnings
 from copy import copy
+from itertools import product
 import numpy as np
 
-from ._extensions._pywt import Wavelet
+from ._extensions._pywt import Wavelet, _check_dtype
 from ._extensions._dwt import dwt_max_level
-from ._dwt import dwt, idwt
-from ._multidim import dwt2, idwt2, dwtn, idwtn, _fix_coeffs
-from ._utils import _wavelets_per_axis
+from ._dwt import dwt, idwt, dwt_coeff_len
+from ._multidim import dwt2, idwt2, dwtn, idwtn, _fix_coeffs, _dwtn_into
+from ._utils import _wavelets_per_axis, _modes_per_axis
 
 __all__ = ['wavedec', 'waverec', 'wavedec2', 'waverec2', 'wavedecn',
            'waverecn', 'coeffs_to_array', 'array_to_coeffs']
@@ -42,7 +43,91 @@ def _check_level(size, dec_len, level):
     return level
 
 
-def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1):
+def _check_output(output):
+    if output not in ('list', 'array'):
+        raise ValueError("output must be 'list' or 'array', not {}"
+                         .format(output))
+
+
+def _wavedecn_array(data, wavelet, mode, level, axes):
+    """Multilevel nD DWT computed directly into a packed coefficient array.
+
+    Returns the ``(coeff_arr, coeff_slices)`` pair of `coeffs_to_array`
+    (with zero padding).  The subbands of every level are written by the
+    last axis transform into their slices of the preallocated array, so the
+    coefficients are not stored twice.
+    """
+    axes = [a + data.ndim if a < 0 else a for a in axes]
+    if level == 0:
+        return data, [[slice(None)] * data.ndim]
+    wavelets = _wavelets_per_axis(wavelet, axes)
+    modes = _modes_per_axis(mode, axes)
+    ndim_transform = len(axes)
+
+    # shapes of the approximation coefficients of every level
+    shapes = [data.shape]
+    for i in range(level):
+        shape = list(shapes[-1])
+        for ax, wav, m in zip(axes, wavelets, modes):
+            shape[ax] = dwt_coeff_len(shape[ax], wav.dec_len, m)
+        shapes.append(tuple(shape))
+
+    # slices of the subbands, arranged as by coeffs_to_array
+    a_shape = list(shapes[-1])
+    coeff_slices = [[slice(s) for s in a_shape]]
+    d_keys = [''.join(key) for key in product('ad', repeat=ndim_transform)
+              if 'd' in key]
+    for d_shape in shapes[:0:-1]:
+        coeff_slices.append({})
+        for key in d_keys:
+            slice_array = [slice(None), ] * data.ndim
+            for ax_i, let in zip(axes, key):
+                if let == 'a':
+                    slice_array[ax_i] = slice(d_shape[ax_i])
+                else:
+                    slice_array[ax_i] = slice(a_shape[ax_i],
+                                              a_shape[ax_i] + d_shape[ax_i])
+            coeff_slices[-1][key] = slice_array
+        for ax in axes:
+            a_shape[ax] += d_shape[ax]
+
+    dtype = _check_dtype(data.real)
+    if np.iscomplexobj(data):
+        dtype = np.result_type(dtype, np.complex64)
+    coeff_arr = np.zeros(a_shape, dtype=dtype)
+
+    a = data
+    for i in range(1, level + 1):
+        out = dict((key, coeff_arr[tuple(slice_array)]) for key, slice_array
+                   in coeff_slices[level + 1 - i].items())
+        if i == level:
+            out['a' * ndim_transform] = coeff_arr[tuple(coeff_slices[0])]
+        else:
+            out['a' * ndim_transform] = np.empty(shapes[i], dtype=dtype)
+        _dwtn_into(a, wavelets, modes, axes, out)
+        a = out['a' * ndim_transform]
+    return coeff_arr, coeff_slices
+
+
+def _is_coeff_array(coeffs):
+    """Whether `coeffs` is a ``(coeff_arr, coeff_slices)`` pair.
+
+    Only the structure of `coeff_slices` (the slices of the approximation
+    followed by dicts of detail slices) tells the pair apart from a list of
+    coefficients such as ``(cA, [cH, cV, cD])``.
+    """
+    if not (isinstance(coeffs, tuple) and len(coeffs) == 2 and
+            isinstance(coeffs[0], np.ndarray) and
+            isinstance(coeffs[1], list) and len(coeffs[1]) > 0):
+        return False
+    a_slices = coeffs[1][0]
+    return (isinstance(a_slices, (tuple, list)) and
+            all(isinstance(s, slice) for s in a_slices) and
+            all(isinstance(d, dict) for d in coeffs[1][1:]))
+
+
+def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1,
+            output='list'):
     """
     Multilevel 1D Discrete Wavelet Transform of data.
 
@@ -60,6 +145,10 @@ def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1):
     axis: int, optional
         Axis over which to compute the DWT. If not given, the
         last axis is used.
+    output : {'list', 'array'}, optional
+        If 'array', the coefficients are computed directly into a single
+        array and ``(coeff_arr, coeff_slices)`` is returned as by
+        ``coeffs_to_array``, without storing the coefficients twice.
 
     Returns
     -------
@@ -68,6 +157,7 @@ def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1):
         where `n` denotes the level of decomposition. The first element
         (`cA_n`) of the result is approximation coefficients array and the
         following elements (`cD_n` - `cD_1`) are details coefficients arrays.
+        For ``output='array'``, the ``(coeff_arr, coeff_slices)`` pair.
 
     Examples
     --------
@@ -82,6 +172,7 @@ def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1):
     array([  5.,  13.])
 
     """
+    _check_output(output)
     data = np.asarray(data)
 
     if not isinstance(wavelet, Wavelet):
@@ -93,6 +184,9 @@ def wavedec(data, wavelet, mode='symmetric', level=None, axis=-1):
         raise ValueError("Axis greater than data dimensions")
     level = _check_level(axes_shape, wavelet.dec_len, level)
 
+    if output == 'array':
+        return _wavedecn_array(data, wavelet, mode, level, (axis, ))
+
     coeffs_list = []
 
     a = data
@@ -113,7 +207,9 @@ def waverec(coeffs, wavelet, mode='symmetric', axis=-1):
     Parameters
     ----------
     coeffs : array_like
-        Coefficients list [cAn, cDn, cDn-1, ..., cD2, cD1]
+        Coefficients list [cAn, cDn, cDn-1, ..., cD2, cD1], or the
+        ``(coeff_arr, coeff_slices)`` pair returned by
+        ``wavedec(..., output='array')``.
     wavelet : Wavelet object or name string
         Wavelet to use
     mode : str, optional
@@ -130,6 +226,9 @@ def waverec(coeffs, wavelet, mode='symmetric', axis=-1):
     array([ 1.,  2.,  3.,  4.,  5.,  6.,  7.,  8.])
     """
 
+    if _is_coeff_array(coeffs):
+        coeffs = array_to_coeffs(*coeffs, output_format='wavedec')
+
     if not isinstance(coeffs, (list, tuple)):
         raise ValueError("Expected sequence of coefficient arrays.")
 
@@ -156,7 +255,8 @@ def waverec(coeffs, wavelet, mode='symmetric', axis=-1):
     return a
 
 
-def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1)):
+def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1),
+             output='list'):
     """
     Multilevel 2D Discrete Wavelet Transform.
 
@@ -175,6 +275,10 @@ def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1)):
         will be calculated using the ``dwt_max_level`` function.
     axes : 2-tuple of ints, optional
         Axes over which to compute the DWT. Repeated elements are not allowed.
+    output : {'list', 'array'}, optional
+        If 'array', the coefficients are computed directly into a single
+        array and ``(coeff_arr, coeff_slices)`` is returned as by
+        ``coeffs_to_array``, without storing the coefficients twice.
 
     Returns
     -------
@@ -185,6 +289,7 @@ def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1)):
         nth level of decomposition.  Remaining elements are tuples of detail
         coefficients in descending order of decomposition level.
         (i.e. cH1 are the horizontal detail coefficients at the first level)
+        For ``output='array'``, the ``(coeff_arr, coeff_slices)`` pair.
 
     Examples
     --------
@@ -200,6 +305,7 @@ def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1)):
            [ 1.,  1.,  1.,  1.],
            [ 1.,  1.,  1.,  1.]])
     """
+    _check_output(output)
     data = np.asarray(data)
     if data.ndim < 2:
         raise ValueError("Expected input data to have at least 2 dimensions.")
@@ -219,6 +325,9 @@ def wavedec2(data, wavelet, mode='symmetric', level=None, axes=(-2, -1)):
 
     level = _check_level(min(axes_sizes), max(dec_lengths), level)
 
+    if output == 'array':
+        return _wavedecn_array(data, wavelet, mode, level, axes)
+
     coeffs_list = []
 
     a = data
@@ -237,7 +346,9 @@ def waverec2(coeffs, wavelet, mode='symmetric', axes=(-2, -1)):
     Multilevel 2D Inverse Discrete Wavelet Transform.
 
     coeffs : list or tuple
-        Coefficients list [cAn, (cHn, cVn, cDn), ... (cH1, cV1, cD1)]
+        Coefficients list [cAn, (cHn, cVn, cDn), ... (cH1, cV1, cD1)], or the
+        ``(coeff_arr, coeff_slices)`` pair returned by
+        ``wavedec2(..., output='array')``.
     wavelet : Wavelet object or name string, or 2-tuple of wavelets
         Wavelet to use.  This can also be a tuple containing a wavelet to
         apply along each axis in ``axes``.
@@ -266,6 +377,9 @@ def waverec2(coeffs, wavelet, mode='symmetric', axes=(-2, -1)):
            [ 1.,  1.,  1.,  1.]])
     """
 
+    if _is_coeff_array(coeffs):
+        coeffs = array_to_coeffs(*coeffs, output_format='wavedec2')
+
     if not isinstance(coeffs, (list, tuple)):
         raise ValueError("Expected sequence of coefficient arrays.")
 
@@ -300,7 +414,8 @@ def waverec2(coeffs, wavelet, mode='symmetric', axes=(-2, -1)):
     return a
 
 
-def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None):
+def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None,
+             output='list'):
     """
     Multilevel nD Discrete Wavelet Transform.
 
@@ -321,6 +436,12 @@ def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None):
         Axes over which to compute the DWT. Axes may not be repeated. The
         default is ``None``, which means transform all axes
         (``axes = range(data.ndim)``).
+    output : {'list', 'array'}, optional
+        If 'array', the coefficients of every level are computed directly
+        into their slices of a single preallocated array and
+        ``(coeff_arr, coeff_slices)`` is returned as by ``coeffs_to_array``.
+        This avoids storing the coefficients twice.  The pair can be passed
+        to ``waverecn``.
 
     Returns
     -------
@@ -337,6 +458,10 @@ def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None):
         where the order of the characters in each key map to the specified
         ``axes``.
 
+        For ``output='array'``, the ``(coeff_arr, coeff_slices)`` pair (see
+        ``coeffs_to_array``), with zero padding where the coefficients
+        cannot be tightly packed.
+
     Examples
     --------
     >>> import numpy as np
@@ -364,6 +489,7 @@ def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None):
             [ 1.,  1.,  1.,  1.]]])
 
     """
+    _check_output(output)
     data = np.asarray(data)
 
     if len(data.shape) < 1:
@@ -388,6 +514,9 @@ def wavedecn(data, wavelet, mode='symmetric', level=None, axes=None):
 
     level = _check_level(min(axes_shapes), max(dec_lengths), level)
 
+    if output == 'array':
+        return _wavedecn_array(data, wavelet, mode, level, axes)
+
     coeffs_list = []
 
     a = data
@@ -422,7 +551,9 @@ def waverecn(coeffs, wavelet, mode='symmetric', axes=None):
     Multilevel nD Inverse Discrete Wavelet Transform.
 
     coeffs : array_like
-        Coefficients list [cAn, {details_level_n}, ... {details_level_1}]
+        Coefficients list [cAn, {details_level_n}, ... {details_level_1}], or
+        the ``(coeff_arr, coeff_slices)`` pair returned by ``coeffs_to_array``
+        or ``wavedecn(..., output='array')``.
     wavelet : Wavelet object or name string, or tuple of wavelets
         Wavelet to use.  This can also be a tuple containing a wavelet to
         apply along each axis in ``axes``.
@@ -463,6 +594,9 @@ def waverecn(coeffs, wavelet, mode='symmetric', axes=None):
             [ 1.,  1.,  1.,  1.]]])
 
     """
+    if _is_coeff_array(coeffs):
+        coeffs = array_to_coeffs(*coeffs, output_format='wavedecn')
+
     if len(coeffs) < 1:
         raise ValueError(
             "Coefficient list too short (minimum 1 array required).")
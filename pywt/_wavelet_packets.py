@@ -7,13 +7,88 @@
 
 from __future__ import division, print_function, absolute_import
 
-__all__ = ["BaseNode", "Node", "WaveletPacket", "Node2D", "WaveletPacket2D"]
+__all__ = ["BaseNode", "Node", "WaveletPacket", "Node2D", "WaveletPacket2D",
+           "NodeND", "WaveletPacketND", "wp_features"]
+
+import tempfile
+from itertools import product
 
 import numpy as np
 
-from ._extensions._pywt import Wavelet
+from ._extensions._pywt import Wavelet, _check_dtype
 from ._dwt import dwt, idwt, dwt_max_level
-from ._multidim import dwt2, idwt2
+from ._multidim import dwt2, dwtn, idwtn
+
+
+def _shannon_cost(data, **kwargs):
+    energy = np.abs(data)**2
+    return -np.sum(np.where(energy > 0, energy * np.log(energy), 0), axis=1)
+
+
+def _log_energy_cost(data, **kwargs):
+    energy = np.abs(data)**2
+    return np.sum(np.where(energy > 0, np.log(energy), 0), axis=1)
+
+
+def _threshold_cost(data, threshold, **kwargs):
+    return np.sum(np.abs(data) > threshold, axis=1)
+
+
+def _norm_cost(data, p, **kwargs):
+    return np.sum(np.abs(data)**p, axis=1)
+
+
+_COSTS = {'shannon': _shannon_cost,
+          'log_energy': _log_energy_cost,
+          'threshold': _threshold_cost,
+          'norm': _norm_cost}
+
+
+def _energy_feature(data):
+    return np.sum(np.abs(data)**2, axis=-1)
+
+
+def _entropy_feature(data):
+    # -sum(p * log(p)) with p = energy / total, without dividing every
+    # coefficient by the total
+    energy = np.abs(data)**2
+    total = np.sum(energy, axis=-1)
+    weighted = np.sum(energy * np.log(np.where(energy > 0, energy, 1)),
+                      axis=-1)
+    positive = np.where(total > 0, total, 1)
+    return np.where(total > 0, np.log(positive) - weighted / positive, 0)
+
+
+def _mean_abs_feature(data):
+    return np.mean(np.abs(data), axis=-1)
+
+
+def _variance_feature(data):
+    return np.var(data, axis=-1)
+
+
+_FEATURES = {'energy': _energy_feature,
+             'entropy': _entropy_feature,
+             'mean_abs': _mean_abs_feature,
+             'variance': _variance_feature}
+
+
+# bytes of node data transformed per DWT call when the levels are stored in
+# memory-mapped files
+_MMAP_BLOCK_SIZE = 2**25
+
+
+def _as_packet_data(data, dtype=None):
+    """Convert node data to an array of `dtype`, or by default of the
+    floating point (or complex) type the transforms compute in."""
+    if dtype is not None:
+        return np.asarray(data, dtype=dtype)
+    data = np.asarray(data)
+    if np.iscomplexobj(data):
+        if data.dtype not in (np.complex64, np.complex128):
+            return data.astype(np.complex128)
+        return data
+    return np.asarray(data, dtype=_check_dtype(data))
 
 
 def get_graycode_order(level, x='a', y='d'):
@@ -24,6 +99,729 @@ def get_graycode_order(level, x='a', y='d'):
     return graycode_order
 
 
+class _Level(object):
+    """Storage of one level of a wavelet packet tree.
+
+    ``data`` holds the coefficients of all nodes of the level in a single
+    ``(n_parts**level, ...)`` array (or is None before the level is first
+    decomposed).  ``exists`` marks the nodes present in the tree and
+    ``valid`` the ones whose data is the corresponding row of ``data``.
+    ``rec`` caches the reconstructions of the nodes of the level from their
+    subtrees, ``clean`` marks the ones that are up to date.
+
+    ``derived`` marks the rows that can be recomputed by decomposing their
+    parent nodes.  ``data`` is set to None when the level is evicted, in
+    which case ``shape`` and ``dtype`` describe the rows of the array.
+    ``retired`` marks the rows of removed or replaced nodes, whose data may
+    still be referenced and must not be overwritten.  ``used`` records when
+    the level was last accessed.
+    """
+    __slots__ = ('data', 'valid', 'exists', 'rec', 'clean', 'derived',
+                 'retired', 'shape', 'dtype', 'used')
+
+    def __init__(self, size):
+        self.data = None
+        self.valid = np.zeros(size, dtype=bool)
+        self.exists = np.zeros(size, dtype=bool)
+        self.rec = None
+        self.clean = np.zeros(size, dtype=bool)
+        self.derived = np.zeros(size, dtype=bool)
+        self.retired = np.zeros(size, dtype=bool)
+        self.shape = None
+        self.dtype = None
+        self.used = 0
+
+
+class _PacketTree(object):
+    """Array backed storage shared by all nodes of a wavelet packet tree.
+
+    Nodes are indexed within a level by their path read as a base
+    ``len(PARTS)`` number.  Node objects are only created when they are
+    accessed; until then a node is just a row of its level array.  A node
+    that exists but whose data is not stored in the level array (because it
+    was set by the user or because the tree is built from its leaves) is
+    always kept in ``nodes``, unless it is an empty node created by
+    `set_array`.
+
+    If ``memory_limit`` is set, the least recently used levels whose nodes
+    all have subnodes are evicted when the level arrays grow larger than
+    ``memory_limit`` bytes, and recomputed from their nearest stored
+    ancestors when they are accessed again.
+
+    If ``mmap_dir`` is set, the level arrays are memory-mapped temporary
+    files in that directory and the nodes are transformed in blocks of
+    about ``_MMAP_BLOCK_SIZE`` bytes, so that a level is read and the next
+    one written sequentially without holding them in memory.
+    """
+
+    def __init__(self, root, parts, part_len, axes=None):
+        self.root = root
+        self.parts = parts
+        self.part_len = part_len
+        self.n_parts = len(parts)
+        # axes of the node data that are transformed (None for all)
+        self.axes = axes
+        self._part_index = dict((part, i) for i, part in enumerate(parts))
+        # single character paths are read as base n_parts numbers
+        self._digits = None
+        if self.part_len == 1 and self.n_parts <= 10:
+            self._digits = dict((part, str(i)) for i, part in
+                                enumerate(parts))
+        self.node_cls = next(cls for cls in type(root).__mro__
+                             if '_create_subnode' in vars(cls))
+        self.wavelet = None
+        self.mode = None
+        self.maxlevel = None
+        self.memory_limit = None
+        # dtype the data of the nodes is converted to (None to keep it)
+        self.dtype = None
+        # directory of the memory-mapped level arrays (None to keep them in
+        # memory)
+        self.mmap_dir = None
+        self._clock = 0
+        # cached orderings of the node indices of a level
+        self.orders = {}
+        self.levels = []
+        self.level(0).exists[0] = True
+        self.nodes = {'': root}
+
+    def level(self, level):
+        while len(self.levels) <= level:
+            self.levels.append(_Level(self.n_parts ** len(self.levels)))
+        return self.levels[level]
+
+    def index(self, path):
+        if self._digits is not None:
+            return int('0' + ''.join(map(self._digits.get, path)),
+                       self.n_parts)
+        idx = 0
+        for i in range(0, len(path), self.part_len):
+            idx = idx * self.n_parts + self._part_index[
+                path[i:i + self.part_len]]
+        return idx
+
+    def path(self, level, idx):
+        parts = []
+        for _ in range(level):
+            idx, part = divmod(idx, self.n_parts)
+            parts.append(self.parts[part])
+        return ''.join(reversed(parts))
+
+    def paths(self, level, indices):
+        """Paths of the nodes `indices` of `level`."""
+        powers = self.n_parts ** np.arange(level - 1, -1, -1)
+        digits = np.asarray(indices)[:, np.newaxis] // powers % self.n_parts
+        parts = np.asarray(self.parts, dtype=object)[digits]
+        return [''.join(row) for row in parts.tolist()]
+
+    def subtree(self, level, idx, sublevel):
+        """Range of the indices below node `idx` at level `sublevel`."""
+        size = self.n_parts ** (sublevel - level)
+        return idx * size, (idx + 1) * size
+
+    def node(self, path):
+        """Node at `path`, created from its level array on first access."""
+        node = self.nodes.get(path)
+        if node is None:
+            level = len(path) // self.part_len
+            if level >= len(self.levels):
+                return None
+            lvl = self.levels[level]
+            idx = self.index(path)
+            if not lvl.exists[idx]:
+                return None
+            node = self.node_cls.__new__(self.node_cls)
+            node._tree = self
+            node.path = path
+            node._data = self.array(level)[idx] if lvl.valid[idx] else None
+            self.nodes[path] = node
+        return node
+
+    def find(self, path):
+        """Node at `path`, or None if it does not exist or `path` is not a
+        valid path."""
+        node = self.nodes.get(path)
+        if node is None and len(path) % self.part_len == 0 and all(
+                path[i:i + self.part_len] in self._part_index
+                for i in range(0, len(path), self.part_len)):
+            node = self.node(path)
+        return node
+
+    def nodes_at(self, level, start, stop):
+        if level >= len(self.levels):
+            return []
+        indices = start + np.nonzero(self.levels[level].exists[start:stop])[0]
+        return [self.node(path) for path in self.paths(level, indices)]
+
+    def nodes_in(self, level, indices):
+        """Existing nodes among the nodes `indices` of `level`."""
+        if level >= len(self.levels):
+            return []
+        indices = indices[self.levels[level].exists[indices]]
+        return [self.node(path) for path in self.paths(level, indices)]
+
+    def graycode_order(self, level):
+        """Indices of the nodes of `level` of a binary tree in graycode
+        order (see `get_graycode_order`)."""
+        key = ('graycode', level)
+        if key not in self.orders:
+            indices = np.arange(2 ** level)
+            self.orders[key] = indices ^ (indices >> 1)
+        return self.orders[key]
+
+    def ordered_nodes(self, selection, depth):
+        """Nodes of `selection`, a list of ``(level, indices)`` pairs of non
+        overlapping subtrees, in depth-first order."""
+        keyed = []
+        for level, indices in selection:
+            scale = self.n_parts ** (depth - level)
+            keyed.extend(zip([int(i) * scale for i in indices],
+                             self.paths(level, indices)))
+        keyed.sort()
+        return [self.node(path) for _, path in keyed]
+
+    def costs(self, level, start, stop, cost):
+        """Apply `cost` to the nodes ``start:stop`` of `level`.
+
+        `cost` maps a ``(n_nodes, n_coeffs)`` array to ``n_nodes`` values.
+        Missing nodes get an infinite cost and empty nodes a zero cost.
+        """
+        result = np.full(stop - start, np.inf)
+        if level >= len(self.levels):
+            return result
+        lvl = self.levels[level]
+        valid = lvl.valid[start:stop]
+        if valid.all():
+            data = self.array(level)
+            result[:] = cost(data[start:stop].reshape(stop - start, -1))
+        elif valid.any():
+            rows = start + np.nonzero(valid)[0]
+            data = self.array(level)
+            result[valid] = cost(data[rows].reshape(len(rows), -1))
+        for i in np.nonzero(lvl.exists[start:stop] & ~valid)[0]:
+            data = self.node(self.path(level, start + i)).data
+            result[i] = 0 if data is None else \
+                cost(np.asarray(data).reshape(1, -1))[0]
+        return result
+
+    def leaves(self, level, idx):
+        """Leaf nodes below node `idx` of `level` as a list of
+        ``(level, indices)`` pairs."""
+        n = self.n_parts
+        selection = []
+        for sublevel in range(level, len(self.levels)):
+            start, stop = self.subtree(level, idx, sublevel)
+            indices = start + np.nonzero(
+                self.levels[sublevel].exists[start:stop])[0]
+            if sublevel + 1 < len(self.levels):
+                children = self.levels[sublevel + 1].exists[
+                    start * n:stop * n].reshape(-1, n).any(axis=1)
+                indices = indices[~children[indices - start]]
+            selection.append((sublevel, indices))
+        return selection
+
+    def gather(self, level, indices):
+        """Data of the nodes `indices` of `level`.
+
+        Returns a list of ``(indices, data)`` blocks, where `data` stacks the
+        data of the nodes along its first axis, and the indices of the empty
+        nodes.
+        """
+        lvl = self.levels[level]
+        valid = lvl.valid[indices]
+        blocks = []
+        if valid.any():
+            rows = indices[valid]
+            data = self.array(level)
+            if rows[-1] - rows[0] == len(rows) - 1:
+                # contiguous rows are a view of the level array
+                blocks.append((rows, data[rows[0]:rows[-1] + 1]))
+            else:
+                blocks.append((rows, data[rows]))
+        empty = []
+        for idx in indices[~valid]:
+            data = self.node(self.path(level, idx)).data
+            if data is None:
+                empty.append(idx)
+            else:
+                blocks.append((np.array([idx]),
+                               np.asarray(data)[np.newaxis]))
+        return blocks, empty
+
+    def reconstruct(self, node, leaves=None, use_cache=False):
+        """Reconstruct the data of `node` from leaf nodes below it.
+
+        The tree is reconstructed bottom-up one level at a time: the data
+        of all sibling nodes of a level are stacked and transformed by a
+        single inverse DWT call.  `leaves` defaults to the leaf nodes of
+        the tree.  With `use_cache` (and the default `leaves`) the
+        reconstructions of the nodes are cached and only the subtrees
+        changed since the last reconstruction are recomputed.
+        """
+        n = self.n_parts
+        level0 = node.level
+        blocks = {}
+        empty = {}
+        cache = use_cache and leaves is None
+        if leaves is None:
+            idx = self.index(node.path)
+            if cache and self.levels[level0].clean[idx]:
+                return self.levels[level0].rec[idx].copy()
+            selection = self.changed_leaves(level0, idx, blocks, cache)
+        else:
+            selected = {}
+            for leaf in leaves:
+                if not isinstance(leaf, BaseNode):
+                    path = leaf
+                    leaf = self.node(path)
+                    if leaf is None:
+                        raise ValueError("Node '%s' does not exist." % path)
+                if not leaf.path.startswith(node.path):
+                    raise ValueError("'%s' is not a subnode of '%s'." %
+                                     (leaf.path, node.path))
+                idx = self.index(leaf.path)
+                if leaf._attached:
+                    selected.setdefault(leaf.level, []).append(idx)
+                elif leaf.data is None:
+                    empty.setdefault(leaf.level, []).append(idx)
+                else:
+                    blocks.setdefault(leaf.level, []).append(
+                        (np.array([idx]), np.asarray(leaf.data)[np.newaxis]))
+            selection = [(level, np.asarray(indices, dtype=np.intp))
+                         for level, indices in selected.items()]
+        for level, indices in selection:
+            level_blocks, level_empty = self.gather(level, indices)
+            blocks.setdefault(level, []).extend(level_blocks)
+            empty.setdefault(level, []).extend(level_empty)
+
+        for level in range(max([level0] + list(blocks) + list(empty)),
+                           level0, -1):
+            # stack the nodes of equal shape
+            groups = {}
+            for indices, data in blocks.pop(level, []):
+                groups.setdefault(data.shape[1:], []).append((indices, data))
+            produced = []
+            for group in groups.values():
+                indices = np.concatenate([indices for indices, _ in group])
+                data = group[0][1] if len(group) == 1 else \
+                    np.concatenate([data for _, data in group])
+                if np.any(np.diff(indices) < 0):
+                    order = np.argsort(indices)
+                    indices, data = indices[order], data[order]
+                parents, pos = np.unique(indices // n, return_inverse=True)
+                if len(indices) == n * len(parents):
+                    # all siblings are present
+                    data = data.reshape((len(parents), n) + data.shape[1:])
+                    coeffs = dict((part, data[:, i])
+                                  for i, part in enumerate(self.parts))
+                else:
+                    coeffs = {}
+                    for i, part in enumerate(self.parts):
+                        coeffs[part] = np.zeros(
+                            (len(parents), ) + data.shape[1:], data.dtype)
+                        coeffs[part][pos[indices % n == i]] = \
+                            data[indices % n == i]
+                rec = self.root._reconstruct_batch(coeffs)
+                shape = self.levels[level - 1].shape
+                if shape is not None and rec.shape[1:] != shape:
+                    # inverse transforms may give one extra coefficient
+                    rec = rec[(slice(None), ) + tuple(
+                        slice(size) for size in shape)]
+                produced.append((parents, rec))
+                if cache:
+                    self._cache(level - 1, parents, rec)
+            parents = np.concatenate([indices for indices, _ in produced] +
+                                     [np.zeros(0, dtype=np.intp)])
+            if len(produced) > 1:
+                unique, counts = np.unique(parents, return_counts=True)
+                if (counts > 1).any():
+                    raise ValueError(
+                        "Subnodes of `%s` node have different shapes. "
+                        "Cannot reconstruct node." %
+                        self.path(level - 1, unique[counts > 1][0]))
+            for idx in set(np.asarray(empty.pop(level, []), dtype=np.intp)
+                           // n) - set(parents):
+                raise ValueError(
+                    "Tree is missing data - all subnodes of `%s` node "
+                    "are None. Cannot reconstruct node." %
+                    self.path(level - 1, idx))
+            blocks.setdefault(level - 1, []).extend(produced)
+            indices = np.concatenate(
+                [indices for indices, _ in blocks[level - 1]] +
+                [np.asarray(empty.get(level - 1, []), dtype=np.intp)])
+            if len(np.unique(indices)) != len(indices):
+                raise ValueError("The leaf nodes must not overlap.")
+        if not blocks.get(level0):
+            raise ValueError(
+                "Tree is missing data - all subnodes of `%s` node "
+                "are None. Cannot reconstruct node." % node.path)
+        rec = blocks[level0][0][1][0]
+        return rec.copy() if cache else rec
+
+    def changed_leaves(self, level, idx, blocks, use_cache=True):
+        """Leaf nodes below node `idx` of `level` that are needed to update
+        its reconstruction.
+
+        Returns the leaves as a list of ``(level, indices)`` pairs; with
+        `use_cache` the up to date reconstructions of internal nodes are
+        added to `blocks` instead of their leaves.
+        """
+        n = self.n_parts
+        selection = []
+        changed = np.array([idx], dtype=np.intp)
+        for sublevel in range(level + 1, len(self.levels)):
+            if not len(changed):
+                break
+            lvl = self.levels[sublevel]
+            children = (changed[:, np.newaxis] * n + np.arange(n)).ravel()
+            children = children[lvl.exists[children]]
+            if sublevel + 1 < len(self.levels):
+                internal = self.levels[sublevel + 1].exists.reshape(
+                    -1, n)[children].any(axis=1)
+            else:
+                internal = np.zeros(len(children), dtype=bool)
+            selection.append((sublevel, children[~internal]))
+            cached = internal & lvl.clean[children] if use_cache else \
+                np.zeros(len(children), dtype=bool)
+            if cached.any():
+                blocks.setdefault(sublevel, []).append(
+                    (children[cached], lvl.rec[children[cached]]))
+            changed = children[internal & ~cached]
+        return selection
+
+    def _cache(self, level, indices, rec):
+        lvl = self.levels[level]
+        if (lvl.rec is None or lvl.rec.shape[1:] != rec.shape[1:] or
+                lvl.rec.dtype != rec.dtype):
+            lvl.rec = self.empty((len(lvl.clean), ) + rec.shape[1:],
+                                 rec.dtype)
+            lvl.clean[:] = False
+        lvl.rec[indices] = rec
+        lvl.clean[indices] = True
+        self._use(level)
+        self.evict(level)
+
+    def non_empty(self, level, indices):
+        lvl = self.levels[level]
+        result = lvl.valid[indices] & lvl.exists[indices]
+        for i in np.nonzero(lvl.exists[indices] & ~result)[0]:
+            result[i] = self.node(self.path(level, indices[i]))._data \
+                is not None
+        return result
+
+    def add(self, node):
+        level = node.level
+        idx = self.index(node.path)
+        self.remove(level, [idx])
+        lvl = self.level(level)
+        lvl.exists[idx] = True
+        lvl.valid[idx] = False
+        self.nodes[node.path] = node
+        self.touch(level, [idx])
+
+    def remove(self, level, indices):
+        """Remove the nodes `indices` of `level` and their subtrees.
+
+        Removed nodes that were already created keep a copy of their data.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        if level >= len(self.levels) or \
+                not self.levels[level].exists[indices].any():
+            return
+        mask = np.zeros(self.n_parts ** level, dtype=bool)
+        mask[indices] = True
+        prefix = level * self.part_len
+        removed = [path for path in self.nodes if len(path) >= prefix and
+                   mask[self.index(path[:prefix])]]
+        limit, self.memory_limit = self.memory_limit, None
+        for path in removed:
+            node = self.nodes[path]
+            idx = self.index(path)
+            if self.levels[node.level].valid[idx]:
+                node._data = self.array(node.level)[idx].copy()
+        for path in removed:
+            del self.nodes[path]
+        self.memory_limit = limit
+        for lvl in self.levels[level:]:
+            lvl.exists[mask] = False
+            lvl.retired |= mask & lvl.valid
+            lvl.valid[mask] = False
+            lvl.clean[mask] = False
+            lvl.derived[mask] = False
+            mask = np.repeat(mask, self.n_parts)
+        self.touch(level, indices)
+
+    def invalidate(self, path):
+        level = len(path) // self.part_len
+        if level < len(self.levels):
+            idx = self.index(path)
+            if level + 1 < len(self.levels):
+                # the subnodes no longer derive from the node data
+                children = slice(*self.subtree(level, idx, level + 1))
+                if self.levels[level + 1].valid[children].any():
+                    self.array(level + 1)
+                self.levels[level + 1].derived[children] = False
+            lvl = self.levels[level]
+            lvl.retired[idx] |= lvl.valid[idx]
+            lvl.valid[idx] = False
+            self.touch(level, [idx])
+
+    def touch(self, level, indices):
+        """Mark the cached reconstructions of the ancestors of the nodes
+        `indices` of `level` as out of date."""
+        indices = np.asarray(indices, dtype=np.intp)
+        for lvl in self.levels[level - 1::-1] if level else []:
+            indices = indices // self.n_parts
+            lvl.clean[indices] = False
+
+    def clear_cache(self):
+        """Drop the cached reconstructions before the wavelet or the mode
+        change.
+
+        The evicted levels are recomputed first, as they cannot be derived
+        from their parents with a different transform.
+        """
+        limit, self.memory_limit = self.memory_limit, None
+        for level in range(len(self.levels)):
+            if self.levels[level].valid.any():
+                self.array(level)
+        self.memory_limit = limit
+        for lvl in self.levels:
+            lvl.clean[:] = False
+            lvl.derived[:] = False
+
+    def _use(self, level):
+        self._clock += 1
+        self.levels[level].used = self._clock
+
+    def array(self, level):
+        """Array of `level`, recomputed if the level was evicted."""
+        lvl = self.levels[level]
+        if lvl.data is None and lvl.valid.any():
+            self._restore(level)
+        self._use(level)
+        return lvl.data
+
+    def _restore(self, level):
+        """Recompute the rows of the evicted `level` by decomposing the
+        nodes of the level above."""
+        lvl = self.levels[level]
+        n = self.n_parts
+        data = self.empty((len(lvl.valid), ) + lvl.shape, lvl.dtype)
+        parents = np.unique(np.nonzero(lvl.valid)[0] // n)
+        blocks, _ = self.gather(level - 1, parents)
+        for indices, block in blocks:
+            for block_indices, block_data in self.split(indices, block):
+                coeffs = self.root._decompose_batch(np.asarray(block_data))
+                for i, part in enumerate(self.parts):
+                    rows = block_indices * n + i
+                    keep = lvl.valid[rows]
+                    data[rows[keep]] = coeffs[part][keep]
+        lvl.data = data
+        lvl.retired[:] = False
+        self._attach(level)
+        self._use(level)
+        self.evict(level)
+
+    def _attach(self, level):
+        """Make the created nodes stored in `level` views of its array."""
+        lvl = self.levels[level]
+        prefix = level * self.part_len
+        for path, node in self.nodes.items():
+            if len(path) == prefix and lvl.valid[self.index(path)]:
+                node._data = lvl.data[self.index(path)]
+
+    def _reallocate(self, level):
+        """Move the stored nodes of `level` to a new array, so that the rows
+        of removed nodes, which may still be referenced, are not
+        overwritten."""
+        lvl = self.levels[level]
+        data = self.empty(lvl.data.shape, lvl.data.dtype)
+        data[lvl.valid] = lvl.data[lvl.valid]
+        lvl.data = data
+        lvl.retired[:] = False
+        self._attach(level)
+
+    def evictable(self, level):
+        """Whether the array of `level` can be evicted: all the nodes stored
+        in it derive from their parents and have subnodes."""
+        lvl = self.levels[level]
+        if lvl.data is None or not level or level + 1 >= len(self.levels):
+            return False
+        if (lvl.valid & ~lvl.derived).any():
+            return False
+        children = self.levels[level + 1].exists.reshape(-1, self.n_parts)
+        return children[lvl.valid].any(axis=1).all()
+
+    def evict(self, keep=None):
+        """Evict least recently used levels (except `keep`) until the level
+        arrays fit in ``memory_limit``.
+
+        Cached reconstructions are dropped first; level arrays are only
+        evicted if they can be recomputed (see `evictable`).
+        """
+        if self.memory_limit is None:
+            return
+        used = sum(array.nbytes for lvl in self.levels
+                   for array in (lvl.data, lvl.rec) if array is not None)
+        for level in sorted(range(len(self.levels)),
+                            key=lambda level: self.levels[level].used):
+            if used <= self.memory_limit:
+                break
+            if level == keep:
+                continue
+            lvl = self.levels[level]
+            if lvl.rec is not None:
+                used -= lvl.rec.nbytes
+                lvl.rec = None
+                lvl.clean[:] = False
+            if self.evictable(level):
+                used -= lvl.data.nbytes
+                lvl.data = None
+                prefix = level * self.part_len
+                for path, node in self.nodes.items():
+                    if len(path) == prefix and lvl.valid[self.index(path)]:
+                        node._data = None
+
+    def load(self, node):
+        """Data of `node`, recomputed if its level was evicted."""
+        level = node.level
+        if (level and level < len(self.levels) and
+                self.nodes.get(node.path) is node and
+                self.levels[level].valid[self.index(node.path)]):
+            self.array(level)
+        return node._data
+
+    def _release(self, level):
+        """Move the data of `level` out of its level array."""
+        lvl = self.levels[level]
+        for idx in np.nonzero(lvl.valid)[0]:
+            node = self.node(self.path(level, idx))
+            node._data = node._data.copy()
+        lvl.valid[:] = False
+        lvl.data = None
+
+    def decompose(self, level, indices):
+        """Decompose the nodes `indices` of `level` with batched DWTs.
+
+        Existing subnodes of the nodes are replaced.  The coefficients are
+        stored in the array of the next level.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        n = self.n_parts
+        self.remove(level + 1, (indices[:, np.newaxis] * n +
+                                np.arange(n)).ravel())
+        lvl = self.levels[level]
+        groups = {}
+        valid = lvl.valid[indices]
+        if valid.any():
+            rows = indices[valid]
+            data = self.array(level)
+            if rows[-1] - rows[0] == len(rows) - 1:
+                # contiguous rows are a view of the level array
+                groups[None] = (rows, data[rows[0]:rows[-1] + 1])
+            else:
+                groups[None] = (rows, data[rows])
+        for idx in indices[~valid]:
+            data = np.asarray(self.node(self.path(level, idx)).data)
+            groups.setdefault((data.shape, data.dtype), ([], []))
+            groups[data.shape, data.dtype][0].append(idx)
+            groups[data.shape, data.dtype][1].append(data)
+        for rows, data in groups.values():
+            rows = np.asarray(rows, dtype=np.intp)
+            for parents, block in self.split(rows, data):
+                coeffs = self.root._decompose_batch(np.asarray(block))
+                self._set_rows(level + 1, parents, coeffs)
+
+    def split(self, rows, data):
+        """Split the stacked data of the nodes `rows` into blocks that are
+        transformed at once.
+
+        Without ``mmap_dir`` the data is a single block.
+        """
+        if self.mmap_dir is None or len(rows) <= 1:
+            return [(rows, data)]
+        size = max(1, np.asarray(data[0]).nbytes)
+        step = max(1, _MMAP_BLOCK_SIZE // size)
+        return [(rows[start:start + step], data[start:start + step])
+                for start in range(0, len(rows), step)]
+
+    def empty(self, shape, dtype):
+        """Uninitialized level array, memory-mapped to a temporary file in
+        ``mmap_dir`` if it is set."""
+        if self.mmap_dir is None or not np.prod(shape):
+            return np.empty(shape, dtype=dtype)
+        # the file is deleted once the array is no longer used
+        with tempfile.TemporaryFile(dir=self.mmap_dir) as fid:
+            return np.memmap(fid, dtype=dtype, mode='w+', shape=shape)
+
+    def _set_rows(self, level, parents, coeffs):
+        lvl = self.level(level)
+        first = coeffs[self.parts[0]]
+        if lvl.valid.any():
+            self.array(level)
+        if (lvl.data is None or lvl.data.shape[1:] != first.shape[1:] or
+                lvl.data.dtype != first.dtype):
+            self._release(level)
+            lvl.data = self.empty((len(lvl.valid), ) + first.shape[1:],
+                                  first.dtype)
+            lvl.retired[:] = False
+            lvl.shape, lvl.dtype = first.shape[1:], first.dtype
+        elif lvl.retired[(parents[:, np.newaxis] * self.n_parts +
+                          np.arange(self.n_parts)).ravel()].any():
+            self._reallocate(level)
+        for i, part in enumerate(self.parts):
+            rows = parents * self.n_parts + i
+            lvl.data[rows] = coeffs[part]
+            lvl.exists[rows] = True
+            lvl.valid[rows] = True
+            lvl.derived[rows] = True
+        self.touch(level, parents * self.n_parts)
+        self._use(level)
+        self.evict(level)
+
+    def set_array(self, level, data):
+        """Replace the subtree of the root by the nodes of `level`, whose
+        data are the rows of `data`.
+
+        `data` becomes the array of `level` without being copied, unless
+        the levels are stored in memory-mapped files.  The nodes of the
+        levels above are created empty.
+        """
+        if self.mmap_dir is not None:
+            data, source = self.empty(data.shape, data.dtype), data
+            for rows, block in self.split(np.arange(len(data)), source):
+                data[rows[0]:rows[-1] + 1] = block
+        self.remove(1, np.arange(self.n_parts))
+        for sublevel in range(1, level):
+            self.level(sublevel).exists[:] = True
+        lvl = self.level(level)
+        lvl.data = data
+        lvl.retired[:] = False
+        lvl.shape, lvl.dtype = data.shape[1:], data.dtype
+        lvl.exists[:] = True
+        lvl.valid[:] = True
+        self.touch(level, np.arange(len(lvl.valid)))
+        self._use(level)
+        self.evict(level)
+
+    def evaluate_maxlevel(self):
+        """Maximum level evaluated from the shallowest node with data."""
+        for level, lvl in enumerate(self.levels):
+            shapes = [np.shape(node._data) for path, node in
+                      self.nodes.items()
+                      if len(path) == level * self.part_len and
+                      node._data is not None]
+            if lvl.valid.any():
+                shapes.append(lvl.shape)
+            if shapes:
+                shape = shapes[0]
+                if self.axes is not None:
+                    shape = [shape[axis] for axis in self.axes]
+                return level + dwt_max_level(min(shape), self.wavelet)
+        return None
+
+
 class BaseNode(object):
     """
     BaseNode for wavelet packet 1D and 2D tree nodes.
@@ -45,6 +843,14 @@ class BaseNode(object):
         A name identifying the coefficients type.
         See `Node.node_name` and `Node2D.node_name`
         for information on the accepted subnodes names.
+
+    Notes
+    -----
+    The coefficients of all nodes of a decomposition level are stored in a
+    single contiguous array shared by the whole tree and the data of a node
+    is a view of its row.  Node objects are lightweight views created on
+    first access, so decomposing deep trees does not create a Python object
+    per node.
     """
 
     # PART_LEN and PARTS attributes that define path tokens for node[] lookup
@@ -52,28 +858,88 @@ class BaseNode(object):
     PART_LEN = None
     PARTS = None
 
+    __slots__ = ('_tree', 'path', '_data')
+
     def __init__(self, parent, data, node_name):
-        self.parent = parent
         if parent is not None:
-            self.wavelet = parent.wavelet
-            self.mode = parent.mode
-            self.level = parent.level + 1
-            self._maxlevel = parent.maxlevel
+            self._tree = parent._tree
             self.path = parent.path + node_name
         else:
-            self.wavelet = None
-            self.mode = None
             self.path = ""
-            self.level = 0
+            self._tree = self._new_tree(data)
 
         # data - signal on level 0, coeffs on higher levels
-        self.data = data
+        self._data = data
 
-        self._init_subnodes()
+    def _new_tree(self, data):
+        return _PacketTree(self, self.PARTS, self.PART_LEN)
 
-    def _init_subnodes(self):
-        for part in self.PARTS:
-            self._set_node(part, None)
+    def __getattr__(self, name):
+        if not name.startswith('_') and name in self._tree.parts:
+            return self._get_node(name)
+        raise AttributeError("'%s' object has no attribute '%s'" %
+                             (type(self).__name__, name))
+
+    @property
+    def _attached(self):
+        return self._tree.nodes.get(self.path) is self
+
+    @property
+    def data(self):
+        if self._data is None:
+            return self._tree.load(self)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        if self._attached:
+            self._tree.invalidate(self.path)
+        self._data = data
+
+    @property
+    def parent(self):
+        if self.path and self._attached:
+            return self._tree.node(self.path[:-self.PART_LEN])
+        return None
+
+    @property
+    def level(self):
+        return len(self.path) // self.PART_LEN
+
+    @property
+    def wavelet(self):
+        return self._tree.wavelet
+
+    @wavelet.setter
+    def wavelet(self, wavelet):
+        self._tree.clear_cache()
+        self._tree.wavelet = wavelet
+
+    @property
+    def mode(self):
+        return self._tree.mode
+
+    @mode.setter
+    def mode(self, mode):
+        self._tree.clear_cache()
+        self._tree.mode = mode
+
+    @property
+    def memory_limit(self):
+        return self._tree.memory_limit
+
+    @memory_limit.setter
+    def memory_limit(self, memory_limit):
+        self._tree.memory_limit = memory_limit
+        self._tree.evict()
+
+    @property
+    def _maxlevel(self):
+        return self._tree.maxlevel
+
+    @_maxlevel.setter
+    def _maxlevel(self, maxlevel):
+        self._tree.maxlevel = maxlevel
 
     def _create_subnode(self, part, data=None, overwrite=True):
         raise NotImplementedError()
@@ -87,10 +953,18 @@ class BaseNode(object):
         return node
 
     def _get_node(self, part):
-        return getattr(self, part)
+        if not self._attached:
+            return None
+        return self._tree.node(self.path + part)
 
     def _set_node(self, part, node):
-        setattr(self, part, node)
+        if not self._attached:
+            return
+        if node is None:
+            self._tree.remove(self.level + 1,
+                              [self._tree.index(self.path + part)])
+        else:
+            self._tree.add(node)
 
     def _delete_node(self, part):
         self._set_node(part, None)
@@ -100,47 +974,12 @@ class BaseNode(object):
             raise ValueError("Subnode name must be in [%s], not '%s'." %
                              (', '.join("'%s'" % p for p in self.PARTS), part))
 
-    def _evaluate_maxlevel(self, evaluate_from='parent'):
-        """
-        Try to find the value of maximum decomposition level if it is not
-        specified explicitly.
-
-        Parameters
-        ----------
-        evaluate_from : {'parent', 'subnodes'}
-        """
-        assert evaluate_from in ('parent', 'subnodes')
-
-        if self._maxlevel is not None:
-            return self._maxlevel
-        elif self.data is not None:
-            return self.level + dwt_max_level(
-                min(self.data.shape), self.wavelet)
-
-        if evaluate_from == 'parent':
-            if self.parent is not None:
-                return self.parent._evaluate_maxlevel(evaluate_from)
-        elif evaluate_from == 'subnodes':
-            for node_name in self.PARTS:
-                node = getattr(self, node_name, None)
-                if node is not None:
-                    level = node._evaluate_maxlevel(evaluate_from)
-                    if level is not None:
-                        return level
-        return None
-
     @property
     def maxlevel(self):
-        if self._maxlevel is not None:
-            return self._maxlevel
-
-        # Try getting the maxlevel from parents first
-        self._maxlevel = self._evaluate_maxlevel(evaluate_from='parent')
-
-        # If not found, check whether it can be evaluated from subnodes
-        if self._maxlevel is None:
-            self._maxlevel = self._evaluate_maxlevel(evaluate_from='subnodes')
-        return self._maxlevel
+        tree = self._tree
+        if tree.maxlevel is None:
+            tree.maxlevel = tree.evaluate_maxlevel()
+        return tree.maxlevel
 
     @property
     def node_name(self):
@@ -160,6 +999,10 @@ class BaseNode(object):
 
         """
         if self.level < self.maxlevel:
+            if self._attached and not self.is_empty:
+                self._tree.decompose(self.level,
+                                     [self._tree.index(self.path)])
+                return tuple(self._get_node(part) for part in self.PARTS)
             return self._decompose()
         else:
             raise ValueError("Maximum decomposition level reached.")
@@ -167,26 +1010,93 @@ class BaseNode(object):
     def _decompose(self):
         raise NotImplementedError()
 
-    def reconstruct(self, update=False):
+    def _decompose_batch(self, data):
+        """Decompose a stack of node data arrays along its first axis.
+
+        Returns a dict mapping every subnode name to the stacked
+        coefficients of that subnode.
+        """
+        raise NotImplementedError()
+
+    def decompose_to(self, level):
+        """
+        Decompose the tree below the node down to the given `level`.
+
+        The tree is decomposed one level at a time: the data of all nodes of
+        a level that are missing subnodes are stacked and transformed by a
+        single DWT call, and the subnodes are created from the rows of the
+        result.  This gives the same nodes as decomposing every node with
+        `~BaseNode.decompose`, but is much faster for deep trees.
+
+        Parameters
+        ----------
+        level : int
+            Decomposition level down to which the tree is decomposed.
+
+        Returns
+        -------
+        nodes : list
+            The nodes at `level` below the current node, in natural order.
+        """
+        if level > self.maxlevel:
+            raise ValueError("The level cannot be greater than the maximum"
+                             " decomposition level value (%d)" % self.maxlevel)
+        if level <= self.level or not self._attached:
+            return [self] if level <= self.level else []
+        tree = self._tree
+        idx = tree.index(self.path)
+        for sublevel in range(self.level, level):
+            start, stop = tree.subtree(self.level, idx, sublevel)
+            tree.level(sublevel + 1)
+            exists = tree.levels[sublevel].exists[start:stop]
+            complete = tree.levels[sublevel + 1].exists[
+                start * tree.n_parts:stop * tree.n_parts].reshape(
+                    -1, tree.n_parts).all(axis=1)
+            indices = start + np.nonzero(exists & ~complete)[0]
+            indices = indices[tree.non_empty(sublevel, indices)]
+            if len(indices):
+                tree.decompose(sublevel, indices)
+        return tree.nodes_at(level, *tree.subtree(self.level, idx, level))
+
+    def reconstruct(self, update=False, leaves=None, use_cache=False):
         """
         Reconstruct node from subnodes.
 
+        The tree is reconstructed bottom-up one level at a time, with a
+        single inverse DWT call for all nodes of a level.
+
         Parameters
         ----------
         update : bool, optional
             If True, then reconstructed data replaces the current
             node data (default: False).
+        leaves : list of nodes or paths, optional
+            Nodes to reconstruct from, for example the nodes returned by
+            `~BaseNode.best_basis`.  They must not overlap.  Defaults to the
+            leaf nodes of the tree.
+        use_cache : bool, optional
+            If True, the reconstructions of the nodes are cached, and a
+            later reconstruction with ``use_cache=True`` only transforms the
+            subtrees containing nodes assigned or removed since (default:
+            False).  Coefficient arrays modified in place are not detected,
+            so nodes must be assigned new data instead.
 
         Returns:
             - original node data if subnodes do not exist
             - IDWT of subnodes otherwise.
         """
-        if not self.has_any_subnode:
+        if not self._attached or (leaves is None and
+                                  not self.has_any_subnode):
             return self.data
-        return self._reconstruct(update)
-
-    def _reconstruct(self):
-        raise NotImplementedError()  # override this in subclasses
+        rec = self._tree.reconstruct(self, leaves, use_cache)
+        if update:
+            self.data = rec
+        return rec
+
+    def _reconstruct_batch(self, coeffs):
+        """Inverse of `_decompose_batch`: reconstruct a stack of nodes from
+        the stacked coefficients of their subnodes."""
+        raise NotImplementedError()
 
     def get_subnode(self, part, decompose=True):
         """
@@ -231,11 +1141,14 @@ class BaseNode(object):
             if (self.maxlevel is not None
                     and len(path) > self.maxlevel * self.PART_LEN):
                 raise IndexError("Path length is out of range.")
-            if path:
-                return self.get_subnode(path[0:self.PART_LEN], True)[
-                    path[self.PART_LEN:]]
-            else:
+            if not path:
                 return self
+            if self._attached:
+                node = self._tree.find(self.path + path)
+                if node is not None:
+                    return node
+            return self.get_subnode(path[0:self.PART_LEN], True)[
+                path[self.PART_LEN:]]
         else:
             raise TypeError("Invalid path parameter type - expected string but"
                             " got %s." % type(path))
@@ -266,9 +1179,8 @@ class BaseNode(object):
                 subnode[path[self.PART_LEN:]] = data
             else:
                 if isinstance(data, BaseNode):
-                    self.data = np.asarray(data.data, dtype=np.float64)
-                else:
-                    self.data = np.asarray(data, dtype=np.float64)
+                    data = data.data
+                self.data = _as_packet_data(data, self._tree.dtype)
         else:
             raise TypeError("Invalid path parameter type - expected string but"
                             " got %s." % type(path))
@@ -283,12 +1195,8 @@ class BaseNode(object):
             String composed of node names.
         """
         node = self[path]
-        # don't clear node value and subnodes (node may still exist outside
-        # the tree)
-        # # node._init_subnodes()
-        # # node.data = None
+        # the node keeps its value (it may still be used outside the tree)
         parent = node.parent
-        node.parent = None  # TODO
         if parent and node.node_name:
             parent._delete_node(node.node_name)
 
@@ -297,12 +1205,92 @@ class BaseNode(object):
     is_empty = property(is_empty)
 
     def has_any_subnode(self):
+        tree = self._tree
+        level = self.level + 1
+        if level >= len(tree.levels) or not self._attached:
+            return False
         for part in self.PARTS:
-            if self._get_node(part) is not None:  # and not .is_empty
+            if self.path + part in tree.nodes:
                 return True
-        return False
+        start = tree.index(self.path) * tree.n_parts
+        return bool(tree.levels[level].exists[start:start + tree.n_parts]
+                    .any())
     has_any_subnode = property(has_any_subnode)
 
+    def to_level_array(self, level, decompose=True):
+        """
+        Returns the data of all nodes of a level below the node as a single
+        array.
+
+        Parameters
+        ----------
+        level : int
+            Decomposition `level` of the nodes.
+        decompose : bool, optional
+            If set then the method will try to decompose the data up
+            to the specified `level` (default: True).
+
+        Returns
+        -------
+        level_array : ndarray
+            Array whose rows are the data of the nodes of `level` below the
+            node in natural order.  If the data of these nodes is stored in
+            the level array of the tree, a view of it is returned instead of
+            a copy.
+
+        See Also
+        --------
+        WaveletPacket.from_level_array : inverse operation
+        """
+        if level < self.level:
+            raise ValueError("The level cannot be lower than the level of "
+                             "the node (%d)." % self.level)
+        if level > self.maxlevel:
+            raise ValueError("The level cannot be greater than the maximum"
+                             " decomposition level value (%d)" % self.maxlevel)
+        if decompose:
+            self.decompose_to(level)
+        tree = self._tree
+        if self._attached:
+            start, stop = tree.subtree(self.level, tree.index(self.path),
+                                       level)
+            if (level < len(tree.levels) and
+                    tree.levels[level].valid[start:stop].all()):
+                return tree.array(level)[start:stop]
+            nodes = tree.nodes_at(level, start, stop)
+        else:
+            start, stop = 0, 1
+            nodes = [self] if level == self.level else []
+        if len(nodes) != stop - start or any(node.is_empty for node in nodes):
+            raise ValueError("Tree is missing data - not all nodes of level "
+                             "%d have data." % level)
+        return np.stack([np.asarray(node.data) for node in nodes])
+
+    def _set_level_array(self, level_array, level=None):
+        """Replace the subnodes of the root node by the nodes of `level`
+        stored in the rows of `level_array`."""
+        tree = self._tree
+        level_array = np.ascontiguousarray(
+            _as_packet_data(level_array, tree.dtype))
+        if level_array.ndim < 2:
+            raise ValueError("level_array must be at least 2D.")
+        n_nodes = len(level_array)
+        if level is None:
+            level = 0
+            while tree.n_parts ** level < n_nodes:
+                level += 1
+        if level < 0 or n_nodes != tree.n_parts ** level:
+            raise ValueError("level_array must have one row per node of "
+                             "level %d (%d rows), not %d rows." %
+                             (level, tree.n_parts ** level, n_nodes))
+        if tree.maxlevel is not None and level > tree.maxlevel:
+            raise ValueError("The level cannot be greater than the maximum"
+                             " decomposition level value (%d)" % tree.maxlevel)
+        if level:
+            tree.set_array(level, level_array)
+        else:
+            self.data = level_array[0]
+
     def get_leaf_nodes(self, decompose=False):
         """
         Returns leaf nodes.
@@ -312,18 +1300,116 @@ class BaseNode(object):
         decompose : bool, optional
             (default: True)
         """
-        result = []
-
-        def collect(node):
-            if node.level == node.maxlevel and not node.is_empty:
-                result.append(node)
-                return False
-            if not decompose and not node.has_any_subnode:
-                result.append(node)
-                return False
-            return True
-        self.walk(collect, decompose=decompose)
-        return result
+        if decompose:
+            self.decompose_to(self.maxlevel)
+        if not self._attached:
+            return [self]
+        tree = self._tree
+        maxlevel = self.maxlevel
+        idx = tree.index(self.path)
+        if not decompose:
+            selection = tree.leaves(self.level, idx)
+        elif maxlevel < len(tree.levels):
+            start, stop = tree.subtree(self.level, idx, maxlevel)
+            indices = start + np.nonzero(
+                tree.levels[maxlevel].exists[start:stop])[0]
+            selection = [(maxlevel,
+                          indices[tree.non_empty(maxlevel, indices)])]
+        else:
+            selection = []
+        return tree.ordered_nodes(selection, maxlevel)
+
+    def best_basis(self, cost='shannon', level=None, threshold=None, p=1,
+                   prune=False):
+        """
+        Select the best basis of the tree below the node.
+
+        The tree is decomposed down to `level` and the Coifman-Wickerhauser
+        algorithm is applied: going up from the bottom level, a node is
+        kept when its cost does not exceed the summed cost of the best
+        bases of its subnodes.  The costs of all nodes of a level are
+        computed at once from the level coefficient array.  The cost of a
+        node covers all of its coefficients, so a batch of signals gets a
+        common basis.
+
+        Parameters
+        ----------
+        cost : {'shannon', 'log_energy', 'threshold', 'norm'} or callable
+            Additive information cost of the node coefficients ``c``:
+
+            - 'shannon': ``-sum(|c|**2 * log(|c|**2))``
+            - 'log_energy': ``sum(log(|c|**2))``
+            - 'threshold': number of coefficients with ``|c| > threshold``
+            - 'norm': ``sum(|c|**p)``
+
+            A callable is passed a ``(n_nodes, n_coeffs)`` array with the
+            coefficients of several nodes and must return the ``n_nodes``
+            costs.  Zero coefficients do not contribute to the 'shannon'
+            and 'log_energy' costs.
+        level : int, optional
+            Decomposition level of the deepest nodes considered.  Defaults to
+            `maxlevel`.
+        threshold : float, optional
+            Threshold of the 'threshold' cost.
+        p : float, optional
+            Exponent of the 'norm' cost (default: 1).
+        prune : bool, optional
+            If True, the subnodes of the selected nodes are removed from the
+            tree so that the selected nodes are its leaf nodes (default:
+            False).
+
+        Returns
+        -------
+        nodes : list
+            The nodes of the best basis in depth-first order.
+        """
+        if callable(cost):
+            cost_func = cost
+        elif cost in _COSTS:
+            if cost == 'threshold' and threshold is None:
+                raise ValueError("threshold must be specified for the "
+                                 "'threshold' cost.")
+
+            def cost_func(data):
+                return _COSTS[cost](data, threshold=threshold, p=p)
+        else:
+            raise ValueError("Unknown cost '%s', must be one of %s or a "
+                             "callable." % (cost, sorted(_COSTS)))
+        if level is None:
+            level = self.maxlevel
+        self.decompose_to(level)
+        if not self._attached:
+            return [self]
+
+        tree = self._tree
+        n = tree.n_parts
+        idx = tree.index(self.path)
+        keep = []
+        best = None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for sublevel in range(level, self.level - 1, -1):
+                start, stop = tree.subtree(self.level, idx, sublevel)
+                costs = tree.costs(sublevel, start, stop, cost_func)
+                if best is None:
+                    best = costs
+                    keep.append(np.isfinite(costs))
+                else:
+                    subnodes = best.reshape(-1, n).sum(axis=1)
+                    keep.append(np.isfinite(costs) & (costs <= subnodes))
+                    best = np.where(keep[-1], costs, subnodes)
+
+        selection = []
+        covered = np.zeros(1, dtype=bool)
+        for sublevel, kept in enumerate(keep[::-1], self.level):
+            start = tree.subtree(self.level, idx, sublevel)[0]
+            selected = kept & ~covered
+            indices = start + np.nonzero(selected)[0]
+            selection.append((sublevel, indices))
+            covered = np.repeat(covered | selected, n)
+            if prune:
+                tree.remove(sublevel + 1, (indices[:, np.newaxis] * n +
+                                           np.arange(n)).ravel())
+        return tree.ordered_nodes(selection, level)
 
     def walk(self, func, args=(), kwargs=None, decompose=True):
         """
@@ -395,6 +1481,13 @@ class Node(BaseNode):
     PARTS = A, D
     PART_LEN = 1
 
+    __slots__ = ()
+
+    @property
+    def axis(self):
+        """Axis of the node data along which the transform is computed."""
+        return -1 if self._tree.axes is None else self._tree.axes[0]
+
     def _create_subnode(self, part, data=None, overwrite=True):
         return self._create_subnode_base(node_cls=Node, part=part, data=data,
                                          overwrite=overwrite)
@@ -413,28 +1506,26 @@ class Node(BaseNode):
             if self._get_node(self.D) is None:
                 self._create_subnode(self.D, data_d)
         else:
-            data_a, data_d = dwt(self.data, self.wavelet, self.mode)
+            data_a, data_d = dwt(self.data, self.wavelet, self.mode,
+                                 axis=self.axis)
             self._create_subnode(self.A, data_a)
             self._create_subnode(self.D, data_d)
         return self._get_node(self.A), self._get_node(self.D)
 
-    def _reconstruct(self, update):
-        data_a, data_d = None, None
-        node_a, node_d = self._get_node(self.A), self._get_node(self.D)
-
-        if node_a is not None:
-            data_a = node_a.reconstruct()  # TODO: (update) ???
-        if node_d is not None:
-            data_d = node_d.reconstruct()  # TODO: (update) ???
+    def _decompose_batch(self, data):
+        # the node data are stacked along a new leading axis
+        axis = self.axis
+        if axis >= 0:
+            axis += 1
+        data_a, data_d = dwt(data, self.wavelet, self.mode, axis=axis)
+        return {self.A: data_a, self.D: data_d}
 
-        if data_a is None and data_d is None:
-            raise ValueError("Node is a leaf node and cannot be reconstructed"
-                             " from subnodes.")
-        else:
-            rec = idwt(data_a, data_d, self.wavelet, self.mode)
-            if update:
-                self.data = rec
-            return rec
+    def _reconstruct_batch(self, coeffs):
+        axis = self.axis
+        if axis >= 0:
+            axis += 1
+        return idwt(coeffs[self.A], coeffs[self.D], self.wavelet, self.mode,
+                    axis=axis)
 
 
 class Node2D(BaseNode):
@@ -453,6 +1544,8 @@ class Node2D(BaseNode):
     PARTS = LL, HL, LH, HH
     PART_LEN = 1
 
+    __slots__ = ()
+
     def _create_subnode(self, part, data=None, overwrite=True):
         return self._create_subnode_base(node_cls=Node2D, part=part, data=data,
                                          overwrite=overwrite)
@@ -475,34 +1568,17 @@ class Node2D(BaseNode):
         return (self._get_node(self.LL), self._get_node(self.HL),
                 self._get_node(self.LH), self._get_node(self.HH))
 
-    def _reconstruct(self, update):
-        data_ll, data_lh, data_hl, data_hh = None, None, None, None
-
-        node_ll, node_lh, node_hl, node_hh =\
-            self._get_node(self.LL), self._get_node(self.LH),\
-            self._get_node(self.HL), self._get_node(self.HH)
+    def _decompose_batch(self, data):
+        data_ll, (data_hl, data_lh, data_hh) = dwt2(data, self.wavelet,
+                                                    self.mode, axes=(-2, -1))
+        return {self.LL: data_ll, self.HL: data_hl, self.LH: data_lh,
+                self.HH: data_hh}
 
-        if node_ll is not None:
-            data_ll = node_ll.reconstruct()
-        if node_lh is not None:
-            data_lh = node_lh.reconstruct()
-        if node_hl is not None:
-            data_hl = node_hl.reconstruct()
-        if node_hh is not None:
-            data_hh = node_hh.reconstruct()
-
-        if (data_ll is None and data_lh is None
-                and data_hl is None and data_hh is None):
-            raise ValueError(
-                "Tree is missing data - all subnodes of `%s` node "
-                "are None. Cannot reconstruct node." % self.path
-            )
-        else:
-            coeffs = data_ll, (data_hl, data_lh, data_hh)
-            rec = idwt2(coeffs, self.wavelet, self.mode)
-            if update:
-                self.data = rec
-            return rec
+    def _reconstruct_batch(self, coeffs):
+        # idwtn directly instead of going through the idwt2 tuple
+        coeffs = {'aa': coeffs[self.LL], 'da': coeffs[self.HL],
+                  'ad': coeffs[self.LH], 'dd': coeffs[self.HH]}
+        return idwtn(coeffs, self.wavelet, self.mode, axes=(-2, -1))
 
     def expand_2d_path(self, path):
         expanded_paths = {
@@ -521,8 +1597,10 @@ class WaveletPacket(Node):
 
     Parameters
     ----------
-    data : 1D ndarray
-        Original data (signal)
+    data : ndarray
+        Original data (signal).  If `data` has more than one dimension, the
+        transform is computed along `axis` and the other dimensions hold a
+        batch of signals that are decomposed together.
     wavelet : Wavelet object or name string
         Wavelet used in DWT decomposition and reconstruction
     mode : str, optional
@@ -532,9 +1610,36 @@ class WaveletPacket(Node):
         Maximum level of decomposition.
         If None, it will be calculated based on the `wavelet` and `data`
         length using `pywt.dwt_max_level`.
+    axis : int, optional
+        Axis over which to compute the transform (default: -1).
+    memory_limit : int, optional
+        Maximum number of bytes used to store the coefficients of the
+        decomposition levels.  If set, the data of the least recently used
+        levels of intermediate nodes is dropped when needed and recomputed
+        from the nearest stored ancestors when it is accessed again.  By
+        default the data of all decomposed nodes is kept.
+    dtype : dtype, optional
+        Data type of the node data.  By default float32 and complex data
+        keep their precision and other data is converted to float64.
+    mmap_dir : str, optional
+        Directory in which the coefficients of every decomposition level are
+        stored in a memory-mapped temporary file, for decompositions that do
+        not fit in memory.  The node data are then `numpy.memmap` views.  By
+        default the coefficients are kept in memory.
+
+    Notes
+    -----
+    For batches of signals the data of every node is an array of the same
+    dimensions as `data`, holding the coefficients of all signals, and every
+    transform is computed once for the whole batch.
     """
-    def __init__(self, data, wavelet, mode='symmetric', maxlevel=None):
+    def __init__(self, data, wavelet, mode='symmetric', maxlevel=None,
+                 axis=-1, memory_limit=None, dtype=None, mmap_dir=None):
+        if data is not None and dtype is not None:
+            data = np.asarray(data, dtype=dtype)
         super(WaveletPacket, self).__init__(None, data, "")
+        self._tree.dtype = dtype
+        self._tree.mmap_dir = mmap_dir
 
         if not isinstance(wavelet, Wavelet):
             wavelet = Wavelet(wavelet)
@@ -542,17 +1647,65 @@ class WaveletPacket(Node):
         self.mode = mode
 
         if data is not None:
-            data = np.asarray(data, dtype=np.float64)
-            assert data.ndim == 1
-            self.data_size = data.shape[0]
+            data = np.asarray(data)
+            if data.ndim == 0:
+                raise ValueError("data must be at least 1D.")
+            if not -data.ndim <= axis < data.ndim:
+                raise ValueError("Axis greater than data dimensions")
+            axis = axis % data.ndim
+            self.data_size = data.shape[axis]
             if maxlevel is None:
                 maxlevel = dwt_max_level(self.data_size, self.wavelet)
         else:
             self.data_size = None
 
+        self._tree.axes = (axis, )
         self._maxlevel = maxlevel
+        self.memory_limit = memory_limit
 
-    def reconstruct(self, update=True):
+    @classmethod
+    def from_level_array(cls, level_array, wavelet, mode='symmetric',
+                         level=None, maxlevel=None, axis=-1,
+                         memory_limit=None, dtype=None, mmap_dir=None):
+        """
+        Build a wavelet packet tree from the data of all nodes of a level.
+
+        The rows of `level_array` become the nodes of `level` in natural
+        order, as returned by `~BaseNode.to_level_array`.  They are stored
+        in a single level array (`level_array` itself if it is contiguous
+        and of the right dtype) instead of being assigned node by node.  The
+        nodes of the levels above are empty and are computed by
+        `reconstruct`.
+
+        Parameters
+        ----------
+        level_array : ndarray
+            Array of shape ``(2**level, ...)`` holding the data of the nodes.
+        wavelet : Wavelet object or name string
+            Wavelet used in DWT decomposition and reconstruction
+        mode : str, optional
+            Signal extension mode for the `dwt` and `idwt` decomposition and
+            reconstruction functions.
+        level : int, optional
+            Decomposition level of the nodes.  By default it is deduced from
+            the number of rows of `level_array`.
+        maxlevel, axis, memory_limit, dtype, mmap_dir
+            See `WaveletPacket`.
+
+        Returns
+        -------
+        wp : WaveletPacket
+            Tree without root node data.
+        """
+        ndim = np.ndim(level_array) - 1
+        if ndim > 0 and not -ndim <= axis < ndim:
+            raise ValueError("Axis greater than data dimensions")
+        wp = cls(None, wavelet, mode, maxlevel, axis, memory_limit, dtype,
+                 mmap_dir)
+        wp._set_level_array(level_array, level)
+        return wp
+
+    def reconstruct(self, update=True, leaves=None, use_cache=False):
         """
         Reconstruct data value using coefficients from subnodes.
 
@@ -561,11 +1714,22 @@ class WaveletPacket(Node):
         update : bool, optional
             If True (default), then data values will be replaced by
             reconstruction values, also in subnodes.
+        leaves : list of nodes or paths, optional
+            Nodes to reconstruct from, for example the nodes returned by
+            `~BaseNode.best_basis`.  Defaults to the leaf nodes of the tree.
+        use_cache : bool, optional
+            If True, intermediate reconstructions are cached and reused by
+            later calls with ``use_cache=True`` (default: False).  See
+            `BaseNode.reconstruct`.
         """
-        if self.has_any_subnode:
-            data = super(WaveletPacket, self).reconstruct(update)
-            if self.data_size is not None and len(data) > self.data_size:
-                data = data[:self.data_size]
+        if leaves is not None or self.has_any_subnode:
+            data = super(WaveletPacket, self).reconstruct(
+                update, leaves, use_cache)
+            if (self.data_size is not None and
+                    data.shape[self.axis] > self.data_size):
+                index = [slice(None)] * data.ndim
+                index[self.axis] = slice(self.data_size)
+                data = data[tuple(index)]
             if update:
                 self.data = data
             return data
@@ -598,21 +1762,14 @@ class WaveletPacket(Node):
             raise ValueError("The level cannot be greater than the maximum"
                              " decomposition level value (%d)" % self.maxlevel)
 
-        result = []
-
-        def collect(node):
-            if node.level == level:
-                result.append(node)
-                return False
-            return True
-
-        self.walk(collect, decompose=decompose)
+        if decompose:
+            result = self.decompose_to(level)
+        else:
+            result = self._tree.nodes_at(level, 0, len(self.PARTS)**level)
         if order == "natural":
             return result
         elif order == "freq":
-            result = dict((node.path, node) for node in result)
-            graycode_order = get_graycode_order(level)
-            return [result[path] for path in graycode_order if path in result]
+            return self._tree.nodes_in(level, self._tree.graycode_order(level))
         else:
             raise ValueError("Invalid order name - %s." % order)
 
@@ -634,9 +1791,28 @@ class WaveletPacket2D(Node2D):
         Maximum level of decomposition.
         If None, it will be calculated based on the `wavelet` and `data`
         length using `pywt.dwt_max_level`.
+    memory_limit : int, optional
+        Maximum number of bytes used to store the coefficients of the
+        decomposition levels.  If set, the data of the least recently used
+        levels of intermediate nodes is dropped when needed and recomputed
+        from the nearest stored ancestors when it is accessed again.  By
+        default the data of all decomposed nodes is kept.
+    dtype : dtype, optional
+        Data type of the node data.  By default float32 and complex data
+        keep their precision and other data is converted to float64.
+    mmap_dir : str, optional
+        Directory in which the coefficients of every decomposition level are
+        stored in a memory-mapped temporary file, for decompositions that do
+        not fit in memory.  The node data are then `numpy.memmap` views.  By
+        default the coefficients are kept in memory.
     """
-    def __init__(self, data, wavelet, mode='smooth', maxlevel=None):
+    def __init__(self, data, wavelet, mode='smooth', maxlevel=None,
+                 memory_limit=None, dtype=None, mmap_dir=None):
+        if data is not None and dtype is not None:
+            data = np.asarray(data, dtype=dtype)
         super(WaveletPacket2D, self).__init__(None, data, "")
+        self._tree.dtype = dtype
+        self._tree.mmap_dir = mmap_dir
 
         if not isinstance(wavelet, Wavelet):
             wavelet = Wavelet(wavelet)
@@ -644,7 +1820,7 @@ class WaveletPacket2D(Node2D):
         self.mode = mode
 
         if data is not None:
-            data = np.asarray(data, dtype=np.float64)
+            data = np.asarray(data)
             assert data.ndim == 2
             self.data_size = data.shape
             if maxlevel is None:
@@ -652,8 +1828,32 @@ class WaveletPacket2D(Node2D):
         else:
             self.data_size = None
         self._maxlevel = maxlevel
+        self.memory_limit = memory_limit
+
+    @classmethod
+    def from_level_array(cls, level_array, wavelet, mode='smooth',
+                         level=None, maxlevel=None, memory_limit=None,
+                         dtype=None, mmap_dir=None):
+        """
+        Build a 2D wavelet packet tree from the data of all nodes of a
+        level.
+
+        See `WaveletPacket.from_level_array`.  `level_array` has shape
+        ``(4**level, rows, cols)``.
 
-    def reconstruct(self, update=True):
+        Returns
+        -------
+        wp : WaveletPacket2D
+            Tree without root node data.
+        """
+        if np.ndim(level_array) != 3:
+            raise ValueError("level_array must be 3D.")
+        wp = cls(None, wavelet, mode, maxlevel, memory_limit, dtype,
+                 mmap_dir)
+        wp._set_level_array(level_array, level)
+        return wp
+
+    def reconstruct(self, update=True, leaves=None, use_cache=False):
         """
         Reconstruct data using coefficients from subnodes.
 
@@ -662,9 +1862,17 @@ class WaveletPacket2D(Node2D):
         update : bool, optional
             If True (default) then the coefficients of the current node
             and its subnodes will be replaced with values from reconstruction.
+        leaves : list of nodes or paths, optional
+            Nodes to reconstruct from, for example the nodes returned by
+            `~BaseNode.best_basis`.  Defaults to the leaf nodes of the tree.
+        use_cache : bool, optional
+            If True, intermediate reconstructions are cached and reused by
+            later calls with ``use_cache=True`` (default: False).  See
+            `BaseNode.reconstruct`.
         """
-        if self.has_any_subnode:
-            data = super(WaveletPacket2D, self).reconstruct(update)
+        if leaves is not None or self.has_any_subnode:
+            data = super(WaveletPacket2D, self).reconstruct(
+                update, leaves, use_cache)
             if self.data_size is not None and (data.shape != self.data_size):
                 data = data[:self.data_size[0], :self.data_size[1]]
             if update:
@@ -695,27 +1903,347 @@ class WaveletPacket2D(Node2D):
             raise ValueError("The level cannot be greater than the maximum"
                              " decomposition level value (%d)" % self.maxlevel)
 
-        result = []
-
-        def collect(node):
-            if node.level == level:
-                result.append(node)
-                return False
-            return True
-
-        self.walk(collect, decompose=decompose)
+        if decompose:
+            result = self.decompose_to(level)
+        else:
+            result = self._tree.nodes_at(level, 0, len(self.PARTS)**level)
 
         if order == "freq":
-            nodes = {}
-            for (row_path, col_path), node in [
-                (self.expand_2d_path(node.path), node) for node in result
-            ]:
-                nodes.setdefault(row_path, {})[col_path] = node
-            graycode_order = get_graycode_order(level, x='l', y='h')
-            nodes = [nodes[path] for path in graycode_order if path in nodes]
             result = []
-            for row in nodes:
-                result.append(
-                    [row[path] for path in graycode_order if path in row]
-                )
+            if level < len(self._tree.levels):
+                exists = self._tree.levels[level].exists
+                for row in self._freq_order(level):
+                    row = row[exists[row]]
+                    if len(row):
+                        result.append(self._tree.nodes_in(level, row))
         return result
+
+    def _freq_order(self, level):
+        """Indices of the nodes of `level` arranged by row and column
+        frequency, both in graycode order."""
+        tree = self._tree
+        key = ('freq', level)
+        if key not in tree.orders:
+            # subnode index of each (row, column) pair of 'l' and 'h' parts
+            digits = np.zeros((2, 2), dtype=np.intp)
+            for i, part in enumerate(self.PARTS):
+                row, col = self.expand_2d_path(part)
+                digits['lh'.index(row), 'lh'.index(col)] = i
+            gray = tree.graycode_order(level)
+            indices = np.zeros((len(gray), len(gray)), dtype=np.intp)
+            for shift in range(level - 1, -1, -1):
+                bits = (gray >> shift) & 1
+                indices = indices * 4 + digits[bits[:, np.newaxis], bits]
+            tree.orders[key] = indices
+        return tree.orders[key]
+
+
+class NodeND(BaseNode):
+    """
+    WaveletPacketND tree node.
+
+    Subnodes are named by strings of ``'a'`` (approximation) and ``'d'``
+    (detail) characters, one per transformed axis, like the keys of the
+    `dwtn` output.  For example, the subnodes of a 3D node are ``'aaa'``,
+    ``'aad'``, ..., ``'ddd'``.
+    """
+
+    __slots__ = ()
+
+    @property
+    def PARTS(self):
+        return self._tree.parts
+
+    @property
+    def PART_LEN(self):
+        return self._tree.part_len
+
+    @property
+    def axes(self):
+        return self._tree.axes
+
+    def _new_tree(self, data, axes=None):
+        if axes is None:
+            axes = tuple(range(np.ndim(data)))
+        parts = tuple(''.join(key) for key in product('ad', repeat=len(axes)))
+        return _PacketTree(self, parts, len(axes), axes)
+
+    def _create_subnode(self, part, data=None, overwrite=True):
+        return self._create_subnode_base(node_cls=NodeND, part=part,
+                                         data=data, overwrite=overwrite)
+
+    def _decompose(self):
+        """
+        See also
+        --------
+        dwtn : for n-dimensional Discrete Wavelet Transform output
+               coefficients.
+        """
+        if self.is_empty:
+            coeffs = dict((part, None) for part in self.PARTS)
+        else:
+            coeffs = dwtn(self.data, self.wavelet, self.mode, self.axes)
+        for part in self.PARTS:
+            self._create_subnode(part, coeffs[part])
+        return tuple(self._get_node(part) for part in self.PARTS)
+
+    def _decompose_batch(self, data):
+        # the node data are stacked along a new leading axis
+        axes = [axis + 1 if axis >= 0 else axis for axis in self.axes]
+        return dwtn(data, self.wavelet, self.mode, axes)
+
+    def _reconstruct_batch(self, coeffs):
+        axes = [axis + 1 if axis >= 0 else axis for axis in self.axes]
+        return idwtn(coeffs, self.wavelet, self.mode, axes)
+
+
+class WaveletPacketND(NodeND):
+    """
+    Data structure representing n-dimensional Wavelet Packet decomposition
+    of signal.
+
+    Every node is decomposed into ``2**len(axes)`` subnodes by `dwtn`.  The
+    nodes of a level are decomposed by a single `dwtn` call on their stacked
+    data.
+
+    Parameters
+    ----------
+    data : ndarray
+        Data associated with the node.
+    wavelet : Wavelet object or name string
+        Wavelet used in DWT decomposition and reconstruction
+    mode : str, optional
+        Signal extension mode for the `dwtn` and `idwtn` decomposition and
+        reconstruction functions.
+    maxlevel : int, optional
+        Maximum level of decomposition.
+        If None, it will be calculated based on the `wavelet` and the
+        shortest of the `axes` of `data` using `pywt.dwt_max_level`.
+    axes : sequence of ints, optional
+        Axes over which to compute the transform.  A value of None (the
+        default) selects all axes.  Must be given if `data` is None.
+    memory_limit : int, optional
+        Maximum number of bytes used to store the coefficients of the
+        decomposition levels.  If set, the data of the least recently used
+        levels of intermediate nodes is dropped when needed and recomputed
+        from the nearest stored ancestors when it is accessed again.  By
+        default the data of all decomposed nodes is kept.
+    dtype : dtype, optional
+        Data type of the node data.  By default float32 and complex data
+        keep their precision and other data is converted to float64.
+    mmap_dir : str, optional
+        Directory in which the coefficients of every decomposition level are
+        stored in a memory-mapped temporary file, for decompositions that do
+        not fit in memory.  The node data are then `numpy.memmap` views.  By
+        default the coefficients are kept in memory.
+    """
+    def __init__(self, data, wavelet, mode='symmetric', maxlevel=None,
+                 axes=None, memory_limit=None, dtype=None, mmap_dir=None):
+        if data is not None:
+            if dtype is not None:
+                data = np.asarray(data, dtype=dtype)
+            ndim = np.ndim(data)
+            if axes is None:
+                axes = range(ndim)
+            axes = tuple(axis + ndim if axis < 0 else axis for axis in axes)
+            if any(axis < 0 or axis >= ndim for axis in axes):
+                raise ValueError("Axis greater than data dimensions")
+        elif axes is None:
+            raise ValueError("axes must be specified if data is None.")
+        if len(set(axes)) != len(tuple(axes)):
+            raise ValueError("The axes passed to WaveletPacketND must be "
+                             "unique.")
+        self._axes = tuple(axes)
+        super(WaveletPacketND, self).__init__(None, data, "")
+        self._tree.dtype = dtype
+        self._tree.mmap_dir = mmap_dir
+
+        if not isinstance(wavelet, Wavelet):
+            wavelet = Wavelet(wavelet)
+        self.wavelet = wavelet
+        self.mode = mode
+
+        if data is not None:
+            self.data_size = np.shape(data)
+            if maxlevel is None:
+                maxlevel = dwt_max_level(
+                    min(self.data_size[axis] for axis in self.axes),
+                    self.wavelet)
+        else:
+            self.data_size = None
+        self._maxlevel = maxlevel
+        self.memory_limit = memory_limit
+
+    @classmethod
+    def from_level_array(cls, level_array, wavelet, mode='symmetric',
+                         level=None, maxlevel=None, axes=None,
+                         memory_limit=None, dtype=None, mmap_dir=None):
+        """
+        Build an n-dimensional wavelet packet tree from the data of all
+        nodes of a level.
+
+        See `WaveletPacket.from_level_array`.  `level_array` has shape
+        ``(2**(len(axes) * level), ...)``; `axes` refer to the dimensions
+        of the nodes and default to all of them.
+
+        Returns
+        -------
+        wp : WaveletPacketND
+            Tree without root node data.
+        """
+        if axes is None:
+            axes = range(np.ndim(level_array) - 1)
+        wp = cls(None, wavelet, mode, maxlevel, axes, memory_limit, dtype,
+                 mmap_dir)
+        wp._set_level_array(level_array, level)
+        return wp
+
+    def _new_tree(self, data):
+        return super(WaveletPacketND, self)._new_tree(data, self._axes)
+
+    def reconstruct(self, update=True, leaves=None, use_cache=False):
+        """
+        Reconstruct data using coefficients from subnodes.
+
+        Parameters
+        ----------
+        update : bool, optional
+            If True (default) then the coefficients of the current node
+            and its subnodes will be replaced with values from reconstruction.
+        leaves : list of nodes or paths, optional
+            Nodes to reconstruct from, for example the nodes returned by
+            `~BaseNode.best_basis`.  Defaults to the leaf nodes of the tree.
+        use_cache : bool, optional
+            If True, intermediate reconstructions are cached and reused by
+            later calls with ``use_cache=True`` (default: False).  See
+            `BaseNode.reconstruct`.
+        """
+        if leaves is not None or self.has_any_subnode:
+            data = super(WaveletPacketND, self).reconstruct(
+                update, leaves, use_cache)
+            if self.data_size is not None and data.shape != self.data_size:
+                data = data[tuple(slice(size) for size in self.data_size)]
+            if update:
+                self.data = data
+            return data
+        return self.data  # return original data
+
+    def get_level(self, level, decompose=True):
+        """
+        Returns all nodes from specified level in natural order.
+
+        Parameters
+        ----------
+        level : int
+            Decomposition `level` from which the nodes will be
+            collected.
+        decompose : bool, optional
+            If set then the method will try to decompose the data up
+            to the specified `level` (default: True).
+        """
+        if level > self.maxlevel:
+            raise ValueError("The level cannot be greater than the maximum"
+                             " decomposition level value (%d)" % self.maxlevel)
+        if decompose:
+            return self.decompose_to(level)
+        return self._tree.nodes_at(level, 0, len(self.PARTS)**level)
+
+
+def wp_features(data, wavelet, maxlevel=None, stats=('energy', 'entropy'),
+                mode='symmetric', axis=-1, dtype=None):
+    """
+    Statistics of the coefficients of every wavelet packet node.
+
+    The wavelet packet decomposition is computed one level at a time and
+    the coefficients of each level are reduced to the requested statistics
+    before the next level is computed, so that the coefficients of the
+    whole tree are never stored.
+
+    Parameters
+    ----------
+    data : array_like
+        Input signal.  If `data` has more than one dimension, the transform
+        is computed along `axis` and the other dimensions hold a batch of
+        signals.
+    wavelet : Wavelet object or name string
+        Wavelet used in the decomposition.
+    maxlevel : int, optional
+        Decomposition level down to which the features are computed.  If
+        None, it is calculated based on the `wavelet` and `data` length
+        using `pywt.dwt_max_level`.
+    stats : sequence of str or callables, optional
+        Statistics computed for every node:
+
+            - 'energy': sum of the squared coefficients
+            - 'entropy': Shannon entropy of the normalized coefficient
+              energies
+            - 'mean_abs': mean absolute value of the coefficients
+            - 'variance': variance of the coefficients
+
+        A callable must reduce an array along its last axis.  Default is
+        ``('energy', 'entropy')``.
+    mode : str, optional
+        Signal extension mode, see `Modes` (default: 'symmetric').
+    axis : int, optional
+        Axis over which to compute the transform (default: -1).
+    dtype : dtype, optional
+        Data type the transforms are computed in.  By default float32 and
+        complex data keep their precision and other data is converted to
+        float64.
+
+    Returns
+    -------
+    features : ndarray
+        Array of shape ``batch_shape + (n_nodes, len(stats))``, where
+        ``batch_shape`` is the shape of `data` without `axis`.  The nodes of
+        levels ``1`` to `maxlevel` are ordered by level and in natural order
+        within a level, as returned by `WaveletPacket.get_level`, giving
+        ``n_nodes = 2**(maxlevel + 1) - 2``.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pywt
+    >>> x = np.random.randn(8, 1024)
+    >>> pywt.wp_features(x, 'db2', 3, stats=['energy', 'variance']).shape
+    (8, 14, 2)
+    """
+    data = _as_packet_data(data, dtype)
+    if data.ndim == 0:
+        raise ValueError("data must be at least 1D.")
+    if not -data.ndim <= axis < data.ndim:
+        raise ValueError("Axis greater than data dimensions")
+    if not isinstance(wavelet, Wavelet):
+        wavelet = Wavelet(wavelet)
+    if maxlevel is None:
+        maxlevel = dwt_max_level(data.shape[axis], wavelet)
+    if maxlevel < 1:
+        raise ValueError("maxlevel must be at least 1.")
+    funcs = []
+    for stat in stats:
+        if callable(stat):
+            funcs.append(stat)
+        elif stat in _FEATURES:
+            funcs.append(_FEATURES[stat])
+        else:
+            raise ValueError("Invalid statistic: '%s'. Must be one of: %s" %
+                             (stat, ', '.join(sorted(_FEATURES))))
+
+    # (batch, nodes, coefficients) array of the current level
+    axis = axis % data.ndim
+    batch_shape = data.shape[:axis] + data.shape[axis + 1:]
+    level = np.rollaxis(data, axis, data.ndim).reshape(-1, 1,
+                                                       data.shape[axis])
+
+    features = np.empty((level.shape[0], 2**(maxlevel + 1) - 2, len(funcs)),
+                        dtype=level.real.dtype)
+    start = 0
+    for _ in range(maxlevel):
+        cA, cD = dwt(level, wavelet, mode, axis=-1)
+        level = np.concatenate([cA[:, :, np.newaxis], cD[:, :, np.newaxis]],
+                               axis=2).reshape(cA.shape[0], -1, cA.shape[-1])
+        stop = start + level.shape[1]
+        for i, func in enumerate(funcs):
+            features[:, start:stop, i] = func(level)
+        start = stop
+    return features.reshape(batch_shape + features.shape[1:])
@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 from __future__ import division, print_function, absolute_import
 
-from numpy.testing import run_module_suite, assert_allclose
+import tempfile
+
+from numpy.testing import (run_module_suite, assert_allclose, assert_,
+                           assert_array_equal, assert_raises)
 import numpy as np
 import pywt
 
@@ -310,5 +313,417 @@ def test_mexh():
     assert_allclose(X, x)
 
 
+def _ref_cwt(data, scales, wavelet):
+    # reference implementation using NumPy convolutions
+    int_psi, x = pywt.integrate_wavelet(wavelet, precision=10)
+    step = x[1] - x[0]
+    out = np.zeros((len(scales), data.size), dtype=int_psi.dtype)
+    for i, scale in enumerate(scales):
+        j = np.floor(np.arange(scale * (x[-1] - x[0]) + 1) / (scale * step))
+        j = j[j < int_psi.size].astype(int)
+        coef = -np.sqrt(scale) * np.diff(np.convolve(data, int_psi[j][::-1]))
+        d = (coef.size - data.size) / 2.
+        out[i, :] = coef[int(np.floor(d)):int(-np.ceil(d))]
+    return out
+
+
+def test_cwt_kernel():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(500)
+    scales = np.arange(1, 40, 3)
+    for name in ['morl', 'mexh', 'gaus3', 'cmor', 'shan', 'fbsp', 'cgau2']:
+        w = pywt.ContinuousWavelet(name)
+        coefs, _ = pywt.cwt(data, scales, w)
+        assert_allclose(coefs, _ref_cwt(data, scales, w), rtol=1e-10,
+                        atol=1e-12)
+
+
+def test_cwt_workers():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(300)
+    scales = np.arange(1, 33)
+    for name in ['morl', 'cmor']:
+        coefs, freqs = pywt.cwt(data, scales, name)
+        for workers in [2, -1]:
+            coefs_t, freqs_t = pywt.cwt(data, scales, name, workers=workers)
+            assert_array_equal(coefs_t, coefs)
+            assert_array_equal(freqs_t, freqs)
+    assert_raises(ValueError, pywt.cwt, data, scales, 'morl', workers=0)
+
+
+def test_cwt_dtype():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(200)
+    scales = np.arange(1, 17)
+    for name, dt_out in [('morl', np.float32), ('cmor', np.complex64)]:
+        w64 = pywt.ContinuousWavelet(name)
+        w32 = pywt.ContinuousWavelet(name, dtype=np.float32)
+        coefs64, _ = pywt.cwt(data, scales, w64)
+
+        # single precision data and wavelet give single precision output
+        coefs32, _ = pywt.cwt(data.astype(np.float32), scales, w32)
+        assert_(coefs32.dtype == dt_out)
+        assert_allclose(coefs32, coefs64, rtol=1e-4, atol=1e-4)
+
+        # either one in double precision gives double precision output
+        coefs, _ = pywt.cwt(data.astype(np.float32), scales, w64)
+        assert_(coefs.dtype == coefs64.dtype)
+        coefs, _ = pywt.cwt(data, scales, w32)
+        assert_(coefs.dtype == coefs64.dtype)
+
+        # explicit dtype overrides the default
+        for dtype in [np.float32, np.complex64]:
+            coefs, _ = pywt.cwt(data, scales, w64, dtype=dtype)
+            assert_(coefs.dtype == dt_out)
+            assert_allclose(coefs, coefs64, rtol=1e-4, atol=1e-4)
+        coefs, _ = pywt.cwt(data.astype(np.float32), scales, w32,
+                            dtype=np.float64)
+        assert_(coefs.dtype == coefs64.dtype)
+    assert_raises(ValueError, pywt.cwt, data, scales, 'morl', dtype=np.int32)
+
+
+def test_cwt_out():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(256)
+    scales = np.arange(1, 20)
+    for wavelet in ['mexh', 'cmor']:
+        coefs, freqs = pywt.cwt(data, scales, wavelet)
+        out = np.empty_like(coefs)
+        res, res_freqs = pywt.cwt(data, scales, wavelet, out=out)
+        assert_(res is out)
+        assert_allclose(out, coefs)
+        assert_allclose(res_freqs, freqs)
+
+    # the precision of out is used by default
+    coefs_mexh = pywt.cwt(data, scales, 'mexh')[0]
+    out = np.empty((scales.size, data.size), dtype=np.float32)
+    pywt.cwt(data, scales, 'mexh', out=out)
+    assert_allclose(out, coefs_mexh, rtol=1e-4, atol=1e-5)
+
+    # wrong shape or dtype
+    assert_raises(ValueError, pywt.cwt, data, scales, 'mexh',
+                  out=np.empty((scales.size, data.size + 1)))
+    assert_raises(ValueError, pywt.cwt, data, scales, 'morl',
+                  out=np.empty((scales.size, data.size), dtype=np.complex128))
+    assert_raises(ValueError, pywt.cwt, data, scales, 'cmor',
+                  out=np.empty((scales.size, data.size)))
+    assert_raises(ValueError, pywt.cwt, data, scales, 'mexh',
+                  dtype=np.float32, out=np.empty((scales.size, data.size)))
+
+
+def test_cwt_out_memmap():
+    data = np.sin(2 * np.pi * np.arange(512) / 32)
+    scales = np.arange(1, 33)
+    coefs, freqs = pywt.cwt(data, scales, 'morl')
+    with tempfile.NamedTemporaryFile() as f:
+        out = np.memmap(f, dtype=np.float64, mode='w+', shape=coefs.shape)
+        pywt.cwt(data, scales, 'morl', out=out)
+        out.flush()
+        assert_allclose(np.fromfile(f.name).reshape(coefs.shape), coefs)
+        del out
+
+
+def test_cwt_iter():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(300)
+    scales = np.arange(1, 42)
+    for wavelet in ['gaus2', 'cmor']:
+        coefs, freqs = pywt.cwt(data, scales, wavelet)
+        blocks = list(pywt.cwt_iter(data, scales, wavelet, chunk_size=8))
+        assert_(len(blocks) == 6)
+        for block_scales, block_coefs, block_freqs in blocks:
+            assert_(block_coefs.shape == (block_scales.size, data.size))
+            assert_(block_freqs.shape == block_scales.shape)
+        assert_array_equal(np.concatenate([b[0] for b in blocks]), scales)
+        assert_allclose(np.concatenate([b[1] for b in blocks]), coefs)
+        assert_allclose(np.concatenate([b[2] for b in blocks]), freqs)
+
+    assert_raises(ValueError, next,
+                  pywt.cwt_iter(data, scales, 'mexh', chunk_size=0))
+
+
+def test_cwt_plan():
+    rstate = np.random.RandomState(1234)
+    scales = np.arange(1, 50, 4)
+    for wavelet in ['mexh', 'cmor']:
+        for method in ['conv', 'fft']:
+            plan = pywt.CWTPlan(300, scales, wavelet, sampling_period=0.5,
+                                method=method)
+            assert_(plan.nbytes > 0)
+            for k in range(3):
+                data = rstate.randn(300)
+                coefs, freqs = pywt.cwt(data, scales, wavelet, 0.5,
+                                        method=method)
+                assert_allclose(plan(data), coefs, atol=1e-12)
+                assert_allclose(plan.frequencies, freqs)
+
+    plan = pywt.CWTPlan(300, scales, 'morl')
+    assert_raises(ValueError, plan, np.ones(301))
+    assert_raises(ValueError, plan, np.ones(300),
+                  out=np.empty((scales.size, 300), dtype=np.float32))
+    assert_raises(ValueError, pywt.CWTPlan, 300, scales, 'morl',
+                  method='dft')
+    assert_raises(ValueError, pywt.CWTPlan, 0, scales, 'morl')
+
+
+def test_cwt_fft():
+    # away from the edges, the analytic spectra agree with the resampled
+    # wavelets up to the resampling error of the latter, which is smallest
+    # when the scale is commensurate with the sampling of the wavelet
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(1000)
+    scales = np.array([8, 16, 32, 64])
+    inner = slice(200, 800)
+    for wavelet in ['morl', 'mexh']:
+        coefs, freqs = pywt.cwt(data, scales, wavelet)
+        coefs_fft, freqs_fft = pywt.cwt(data, scales, wavelet, method='fft')
+        assert_(coefs_fft.dtype == coefs.dtype)
+        assert_array_equal(freqs_fft, freqs)
+        for row, row_fft in zip(coefs, coefs_fft):
+            assert_allclose(row_fft[inner], row[inner],
+                            atol=0.05 * np.abs(row[inner]).max())
+
+    for wavelet in ['gaus3', 'cgau2', 'shan', 'fbsp']:
+        for n in [1, 17, 500]:
+            x = rstate.randn(n)
+            coefs = pywt.cwt(x, scales, wavelet, method='fft')[0]
+            assert_(coefs.shape == (scales.size, n))
+            wavelet32 = pywt.ContinuousWavelet(wavelet, np.float32)
+            coefs32 = pywt.cwt(x.astype(np.float32), scales, wavelet32,
+                               method='fft')[0]
+            assert_(coefs32.real.dtype == np.float32)
+            assert_allclose(coefs32, coefs, rtol=1e-4,
+                            atol=1e-4 * np.abs(coefs).max())
+
+
+def test_fourier():
+    # compare with the discrete Fourier transform of the sampled wavelets
+    for name in ['morl', 'mexh', 'gaus1', 'gaus4', 'gaus7', 'cgau1', 'cgau6',
+                 'cmor', 'fbsp', 'shan']:
+        wavelet = pywt.ContinuousWavelet(name)
+        if name in ['fbsp', 'shan']:
+            # slowly decaying wavelets
+            wavelet.lower_bound, wavelet.upper_bound = -1000, 1000
+        psi, x = wavelet.wavefun(length=2**17)
+        dx = x[1] - x[0]
+        f = np.fft.fftfreq(x.size, dx)
+        psi_hat = np.fft.fft(psi) * dx * np.exp(-2j * np.pi * f * x[0])
+        keep = np.abs(f) < 3
+        if name == 'shan':
+            # skip the discontinuities at the edges of the band
+            band_edge = wavelet.bandwidth_frequency / 2
+            keep &= np.abs(np.abs(f - wavelet.center_frequency) -
+                           band_edge) > 0.05
+        assert_allclose(wavelet.fourier(f[keep]), psi_hat[keep],
+                        atol=2e-3 * np.abs(psi_hat).max())
+
+    wavelet = pywt.ContinuousWavelet('cmor', np.float32)
+    freqs = np.linspace(-1, 1, 12).reshape(3, 4)
+    psi_hat = wavelet.fourier(freqs)
+    assert_(psi_hat.dtype == np.complex64)
+    assert_(psi_hat.shape == (3, 4))
+
+
+def test_cwt_decimate():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(4096)
+    scales = 2**np.arange(1, 6.5, 0.5)
+    inner = slice(600, -600)
+    for wavelet in ['mexh', 'cmor']:
+        coefs, freqs = pywt.cwt(data, scales, wavelet, 0.1, method='fft')
+        coefs_dec, freqs_dec = pywt.cwt(data, scales, wavelet, 0.1,
+                                        method='fft', decimate=True)
+        assert_(coefs_dec.dtype == coefs.dtype)
+        assert_allclose(freqs_dec, freqs)
+        for row, row_dec in zip(coefs, coefs_dec):
+            assert_allclose(row_dec[inner], row[inner],
+                            atol=1e-2 * np.abs(row[inner]).max())
+
+        # native rate output
+        n_blocks = 0
+        for block_scales, block_coefs, block_freqs in pywt.cwt_iter(
+                data, scales, wavelet, 0.1, method='fft', decimate=True):
+            factor = data.size // block_coefs.shape[1]
+            index = np.searchsorted(scales, block_scales)
+            assert_(block_coefs.shape == (block_scales.size,
+                                          data.size // factor))
+            assert_allclose(block_freqs, freqs[index])
+            assert_allclose(block_coefs, coefs_dec[index, ::factor],
+                            atol=1e-3 * np.abs(block_coefs).max())
+            n_blocks += 1
+        assert_(n_blocks == 4)
+
+    coefs = pywt.cwt(data.astype(np.float32), scales,
+                     pywt.ContinuousWavelet('morl', np.float32),
+                     decimate=True)[0]
+    assert_(coefs.dtype == np.float32)
+
+
+def test_cwt_positions():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(1000)
+    scales = np.arange(1, 40)
+    positions = [0, 5, 500, 999, -1]
+    for wavelet in ['mexh', 'cmor', 'gaus3']:
+        for method in ['conv', 'fft']:
+            for dtype in [np.float64, np.float32]:
+                coefs = pywt.cwt(data, scales, wavelet, method=method,
+                                 dtype=dtype)[0]
+                coefs_at = pywt.cwt(data, scales, wavelet, method=method,
+                                    dtype=dtype, positions=positions)[0]
+                assert_(coefs_at.dtype == coefs.dtype)
+                assert_array_equal(coefs_at, coefs[:, positions])
+
+    plan = pywt.CWTPlan(data.size, scales, 'morl')
+    out = np.empty((scales.size, 2))
+    assert_(plan(data, out=out, positions=[3, 4]) is out)
+    assert_array_equal(out, plan(data)[:, 3:5])
+    assert_(plan(data, positions=[]).shape == (scales.size, 0))
+
+    assert_raises(IndexError, plan, data, positions=[1000])
+    assert_raises(IndexError, plan, data, positions=[1.5])
+    assert_raises(ValueError, plan, data, out=out, positions=[1])
+    assert_raises(ValueError, pywt.cwt, data, scales, 'morl', decimate=True,
+                  positions=[1])
+
+
+def test_streaming_cwt():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(3000)
+    # small scales alias, so that the FFT method depends on the padded length
+    scales = np.arange(4, 40, 3)
+    # chunks of irregular sizes, including empty ones
+    chunks = np.split(data, [0, 1, 1, 250, 700, 710, 1500, 2999])
+    for wavelet in ['mexh', 'cmor']:
+        for method in ['conv', 'fft']:
+            coefs = pywt.cwt(data, scales, wavelet, method=method)[0]
+            stream = pywt.StreamingCWT(scales, wavelet, method=method,
+                                       block_size=200)
+            assert_(stream.delay == stream.latency.max())
+            blocks = []
+            n_pushed = 0
+            for chunk in chunks:
+                blocks.append(stream.push(chunk))
+                n_pushed += chunk.size
+                n_emitted = sum(b.shape[1] for b in blocks)
+                assert_(n_emitted <= n_pushed - stream.delay or
+                        n_emitted == 0)
+                if method == 'conv':
+                    assert_(n_emitted == max(n_pushed - stream.delay, 0))
+            blocks.append(stream.flush())
+            coefs_stream = np.concatenate(blocks, axis=1)
+            assert_(coefs_stream.dtype == coefs.dtype)
+            # the FFT method truncates the (band-limited) wavelets to their
+            # nominal support
+            atol = 1e-10 if method == 'conv' else 1e-6
+            assert_allclose(coefs_stream, coefs,
+                            atol=atol * np.abs(coefs).max())
+
+    # flush resets the stream
+    stream = pywt.StreamingCWT(scales, 'morl', dtype=np.float32)
+    first = np.concatenate([stream.push(data), stream.flush()], axis=1)
+    second = np.concatenate([stream.push(data), stream.flush()], axis=1)
+    assert_(first.dtype == np.float32)
+    assert_array_equal(first, second)
+
+
+def test_cross_wavelet():
+    rstate = np.random.RandomState(1234)
+    data = rstate.randn(3, 500)
+    scales = np.arange(1, 30, 2)
+    for wavelet in ['cmor', 'mexh']:
+        coefs = [pywt.cwt(x, scales, wavelet)[0] for x in data]
+        xwt, freqs = pywt.cross_wavelet(data, scales, wavelet, chunk_size=4)
+        assert_(xwt.shape == (3, scales.size, data.shape[1]))
+        assert_allclose(freqs, pywt.cwt(data[0], scales, wavelet)[1])
+        for xwt_pair, (i, j) in zip(xwt, [(0, 1), (0, 2), (1, 2)]):
+            assert_allclose(xwt_pair, coefs[i] * np.conj(coefs[j]))
+
+    coefs = [pywt.cwt(x, scales, 'cmor')[0] for x in data]
+    out = np.empty((1, scales.size, data.shape[1]), dtype=np.complex128)
+    xwt = pywt.cross_wavelet(data, scales, 'cmor', pairs=[(2, 0)], out=out)[0]
+    assert_(xwt is out)
+    assert_allclose(xwt[0], coefs[2] * np.conj(coefs[0]))
+    assert_raises(IndexError, pywt.cross_wavelet, data, scales, 'cmor',
+                  pairs=[(0, 3)])
+    assert_raises(ValueError, pywt.cross_wavelet, data[0], scales, 'cmor')
+
+
+def test_wavelet_coherence():
+    rstate = np.random.RandomState(1234)
+    t = np.arange(2000)
+    common = np.sin(2 * np.pi * t / 40)
+    data = np.stack([common + 0.5 * rstate.randn(t.size),
+                     np.roll(common, 5) + 0.5 * rstate.randn(t.size),
+                     rstate.randn(t.size)])
+    scales = np.arange(2, 60, 2)
+    coh, freqs = pywt.wavelet_coherence(data, scales, 'cmor')
+    assert_(coh.shape == (3, scales.size, t.size))
+    assert_(coh.dtype == np.float64)
+    assert_(np.all((coh >= 0) & (coh <= 1 + 1e-12)))
+    # the shared oscillation is coherent, the noise is not
+    row = np.argmin(np.abs(freqs - 1 / 40.))
+    assert_(np.mean(coh[0, row, 300:-300]) > 0.9)
+    assert_(np.mean(coh[2, row, 300:-300]) < 0.5)
+
+    # the result does not depend on the blocks of scales
+    coh_blocks = pywt.wavelet_coherence(data, scales, 'cmor',
+                                        chunk_size=5)[0]
+    assert_allclose(coh_blocks, coh, atol=1e-10)
+    # including at the small scales, where the time smoothing is narrow
+    small = np.arange(1, 20)
+    coh3 = pywt.wavelet_coherence(data, small, 'morl', chunk_size=3)[0]
+    coh8 = pywt.wavelet_coherence(data, small, 'morl', chunk_size=8)[0]
+    assert_allclose(coh8, coh3, rtol=1e-12, atol=1e-12)
+
+    coh32 = pywt.wavelet_coherence(data.astype(np.float32), scales,
+                                   pywt.ContinuousWavelet('cmor', np.float32),
+                                   pairs=[(0, 1)])[0]
+    assert_(coh32.dtype == np.float32)
+    assert_allclose(coh32[0], coh[0], atol=1e-4)
+    assert_raises(ValueError, pywt.wavelet_coherence, data, scales, 'cmor',
+                  scale_window=2)
+
+
+def test_cwt2():
+    # the response to an impulse is the (flipped) scaled wavelet
+    image = np.zeros((101, 121))
+    image[50, 60] = 1
+    y, x = np.mgrid[-50:51, -60:61]
+    scale, angle = 4, np.pi / 6
+    coefs, freqs = pywt.cwt2(image, [scale], 'morl', angles=[angle, 0])
+    assert_(coefs.shape == (1, 2) + image.shape)
+    assert_allclose(freqs, pywt.scale2frequency('morl', [scale]))
+    along = -(x * np.cos(angle) + y * np.sin(angle)) / scale
+    across = (x * np.sin(angle) - y * np.cos(angle)) / scale
+    psi = (np.cos(5 * along) * np.exp(-(along**2 + across**2) / 2) /
+           np.pi**0.25 / scale)
+    assert_allclose(coefs[0, 0], psi, atol=1e-12)
+
+    # the Mexican hat is isotropic and of unit norm
+    scale = 5
+    coefs = pywt.cwt2(image, [scale], 'mexh', angles=[0, 1, 2])[0]
+    r2 = (x**2 + y**2) / scale**2
+    psi = (2 - r2) * np.exp(-r2 / 2)
+    assert_allclose(coefs[0, 0], psi * np.sqrt(np.sum(coefs[0, 0]**2) /
+                                               np.sum(psi**2)), atol=1e-10)
+    assert_allclose(np.sum(coefs[0, 0]**2), 1)
+    assert_array_equal(coefs[0, 1], coefs[0, 0])
+    assert_array_equal(coefs[0, 2], coefs[0, 0])
+
+    rstate = np.random.RandomState(1234)
+    image = rstate.randn(64, 48)
+    coefs = pywt.cwt2(image, [2, 4], 'cmor', angles=[0, 1], workers=2)[0]
+    assert_(coefs.dtype == np.complex128)
+    out = np.empty((2, 2, 64, 48), dtype=np.complex64)
+    coefs32 = pywt.cwt2(image.astype(np.float32), [2, 4],
+                        pywt.ContinuousWavelet('cmor', np.float32),
+                        angles=[0, 1], out=out)[0]
+    assert_(coefs32 is out)
+    assert_allclose(coefs32, coefs, atol=1e-5 * np.abs(coefs).max())
+    assert_raises(ValueError, pywt.cwt2, image[0], [2], 'cmor')
+    assert_raises(ValueError, pywt.cwt2, image, [2], 'db2')
+
+
 if __name__ == '__main__':
     run_module_suite()
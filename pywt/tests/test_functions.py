@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 from __future__ import division, print_function, absolute_import
 
+import numpy as np
 from numpy.testing import (run_module_suite, assert_almost_equal,
-                           assert_allclose)
+                           assert_allclose, assert_)
 
 import pywt
 
@@ -28,6 +29,34 @@ def test_scal2frq_scale():
     assert_almost_equal(result, expected, decimal=3)
 
 
+def test_scal2frq_scale_array():
+    w = pywt.ContinuousWavelet('morl')
+    scales = [1, 2.5, 10]
+    result = pywt.scale2frequency(w, scales)
+    assert_(result.shape == (3, ))
+    assert_allclose(result, [pywt.scale2frequency(w, s) for s in scales])
+    assert_(np.isscalar(pywt.scale2frequency(w, 2)))
+
+
+def test_centrfreq_cache():
+    # cached results must follow changes of the wavelet parameters
+    w = pywt.ContinuousWavelet('cmor')
+    w.center_frequency = 1.
+    freq = pywt.central_frequency(w)
+    assert_(pywt.central_frequency(w) == freq)
+    w.center_frequency = 2.
+    assert_allclose(pywt.central_frequency(w), 2 * freq, rtol=0.05)
+
+    # custom wavelets with the same name but different filters
+    db2 = pywt.Wavelet('db2')
+    w = pywt.Wavelet('custom', filter_bank=pywt.Wavelet('db1').filter_bank)
+    w2 = pywt.Wavelet('custom', filter_bank=db2.filter_bank)
+    assert_almost_equal(pywt.central_frequency(w, precision=12), 1,
+                        decimal=3)
+    assert_almost_equal(pywt.central_frequency(w2, precision=12), 2 / 3.,
+                        decimal=3)
+
+
 def test_intwave_orthogonal():
     w = pywt.Wavelet('db1')
     int_psi, x = pywt.integrate_wavelet(w, precision=12)
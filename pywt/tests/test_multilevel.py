@@ -467,6 +467,61 @@ def test_waverecn_coeff_reshape_odd():
             assert_allclose(x1, x1r, rtol=1e-4, atol=1e-4)
 
 
+def test_wavedecn_output_array():
+    # the packed array matches coeffs_to_array applied to the coefficients
+    rng = np.random.RandomState(1234)
+    for dtype, tol in [(np.float32, tol_single), (np.float64, tol_double),
+                       (np.complex128, tol_double)]:
+        x = rng.randn(20, 16, 12).astype(dtype)
+        if np.iscomplexobj(x):
+            x += 1j * rng.randn(20, 16, 12)
+        for axes in [None, (0, 2), (-1, )]:
+            for mode in ['symmetric', 'periodization']:
+                coeffs = pywt.wavedecn(x, 'db2', mode, level=2, axes=axes)
+                arr, coeff_slices = pywt.coeffs_to_array(coeffs, axes=axes)
+                arr2, coeff_slices2 = pywt.wavedecn(x, 'db2', mode, level=2,
+                                                    axes=axes, output='array')
+                assert_(arr2.dtype == dtype)
+                assert_equal(coeff_slices2, coeff_slices)
+                assert_allclose(arr2, arr, rtol=tol, atol=tol)
+                xr = pywt.waverecn((arr2, coeff_slices2), 'db2', mode,
+                                   axes=axes)
+                assert_allclose(xr, x, rtol=tol, atol=tol)
+    assert_raises(ValueError, pywt.wavedecn, x, 'db2', output='dict')
+
+
+def test_wavedec_wavedec2_output_array():
+    rng = np.random.RandomState(1234)
+    x = rng.randn(4, 40)
+    coeffs = pywt.wavedec(x, 'db3', level=2)
+    arr, coeff_slices = pywt.wavedec(x, 'db3', level=2, output='array')
+    for c, c2 in zip(coeffs,
+                     pywt.array_to_coeffs(arr, coeff_slices, 'wavedec')):
+        assert_allclose(c2, c, rtol=tol_double, atol=tol_double)
+    assert_allclose(pywt.waverec((arr, coeff_slices), 'db3'), x,
+                    rtol=tol_double, atol=tol_double)
+
+    x = rng.randn(3, 32, 30)
+    coeffs = pywt.wavedec2(x, 'db3', level=2, axes=(1, 2))
+    arr, coeff_slices = pywt.coeffs_to_array(coeffs, axes=(1, 2))
+    arr2, coeff_slices2 = pywt.wavedec2(x, 'db3', level=2, axes=(1, 2),
+                                        output='array')
+    assert_equal(coeff_slices2, coeff_slices)
+    assert_allclose(arr2, arr, rtol=tol_double, atol=tol_double)
+    assert_allclose(pywt.waverec2((arr2, coeff_slices2), 'db3', axes=(1, 2)),
+                    x, rtol=tol_double, atol=tol_double)
+
+
+def test_waverec2_tuple_coeffs():
+    # a tuple of coefficients with the details in a list is not mistaken for
+    # a (coeff_arr, coeff_slices) pair
+    rng = np.random.RandomState(1234)
+    x = rng.randn(8, 8)
+    cA, (cH, cV, cD) = pywt.dwt2(x, 'db1')
+    assert_allclose(pywt.waverec2((cA, [cH, cV, cD]), 'db1'), x,
+                    rtol=tol_double, atol=tol_double)
+
+
 def test_array_to_coeffs_invalid_inputs():
     coeffs = pywt.wavedecn(np.ones(2), 'haar')
     arr, arr_slices = pywt.coeffs_to_array(coeffs)
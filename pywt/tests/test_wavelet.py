@@ -266,5 +266,24 @@ def test_wavefun_bior13():
     assert_allclose(psi_r, psi_r_expect, rtol=1e-10, atol=1e-12)
 
 
+def test_wavefun_cache():
+    # repeated calls return equal, independent arrays
+    w = pywt.Wavelet('db3')
+    phi, psi, x = w.wavefun(level=6)
+    psi[:] = 0
+    phi2, psi2, x2 = w.wavefun(level=6)
+    assert_allclose(phi2, phi)
+    assert_(np.abs(psi2).max() > 0)
+
+    w = pywt.ContinuousWavelet('gaus2')
+    psi, x = w.wavefun(level=6)
+    w.upper_bound, w.lower_bound = 2, -2
+    psi2, x2 = w.wavefun(level=6)
+    assert_allclose(x2, np.linspace(-2, 2, 64))
+    assert_allclose(x, np.linspace(-5, 5, 64))
+    psi3, x3 = pywt.ContinuousWavelet('gaus2', np.float32).wavefun(level=6)
+    assert_(psi3.dtype == np.float32)
+
+
 if __name__ == '__main__':
     run_module_suite()
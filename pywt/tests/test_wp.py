@@ -2,11 +2,15 @@
 
 from __future__ import division, print_function, absolute_import
 
+import shutil
+import tempfile
+
 import numpy as np
 from numpy.testing import (run_module_suite, assert_allclose, assert_,
                            assert_raises)
 
 import pywt
+from pywt import _wavelet_packets
 
 
 def test_wavelet_packet_structure():
@@ -143,5 +147,369 @@ def test_removing_nodes():
     assert_allclose(wp.reconstruct(), np.arange(1, 9), rtol=1e-12)
 
 
+def test_decompose_to():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(256)
+    wp = pywt.WaveletPacket(data=x, wavelet='db3', mode='periodization')
+    nodes = wp.decompose_to(4)
+    assert_([node.path for node in nodes] ==
+            [node.path for node in wp.get_level(4, decompose=False)])
+
+    # same coefficients as decomposing node by node
+    wp_ref = pywt.WaveletPacket(data=x, wavelet='db3', mode='periodization')
+    for node in nodes:
+        assert_allclose(node.data, wp_ref[node.path].data, rtol=1e-12)
+        assert_(node.parent is wp[node.path[:-1]])
+
+    # existing nodes are kept and missing ones are recreated
+    node_a = wp['a']
+    del wp['ad']
+    nodes = wp.decompose_to(2)
+    assert_(wp['a'] is node_a)
+    assert_([node.path for node in nodes] == ['aa', 'ad', 'da', 'dd'])
+    assert_allclose(wp['ad'].data, wp_ref['ad'].data, rtol=1e-12)
+
+    assert_(len(wp.get_level(wp.maxlevel)) == 2**wp.maxlevel)
+    assert_raises(ValueError, wp.decompose_to, wp.maxlevel + 1)
+
+
+def test_compact_storage():
+    # Note: internal implementation detail not to be relied on.
+    x = np.random.RandomState(1234).randn(256)
+    wp = pywt.WaveletPacket(data=x, wavelet='db2', mode='periodization')
+    wp.decompose_to(5)
+    level = wp._tree.levels[5].data
+    assert_(level.shape == (32, 8))
+    # nodes are views created on first access
+    assert_('adad' not in wp._tree.nodes)
+    assert_(wp['adad'].data.base is wp._tree.levels[4].data)
+    node = wp['adada']
+    assert_(wp['adada'] is node)
+    assert_(not hasattr(node, '__dict__'))
+    assert_(node.data.base is level)
+    assert_allclose(node.data, level[int('01010', 2)])
+    assert_(node.parent is wp['adad'])
+    assert_(wp.a.d.path == 'ad')
+
+    # modified and removed nodes keep their data
+    node.data = np.zeros(8)
+    assert_allclose(wp['adada'].data, 0)
+    node = wp['adadd']
+    del wp['adad']
+    assert_(node.parent is None)
+    assert_(node.data.base is not level)
+    wp['adad'].decompose()
+    assert_allclose(wp['adadd'].data, node.data, rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+
+
+def _best_basis_reference(node, cost, maxlevel):
+    # recursive Coifman-Wickerhauser search over node objects
+    own = cost(node.data[np.newaxis])[0]
+    if node.level == maxlevel:
+        return own, [node.path]
+    sub_cost, sub_paths = 0, []
+    for part in node.PARTS:
+        c, paths = _best_basis_reference(node[part], cost, maxlevel)
+        sub_cost += c
+        sub_paths += paths
+    if own <= sub_cost:
+        return own, [node.path]
+    return sub_cost, sub_paths
+
+
+def test_best_basis():
+    rstate = np.random.RandomState(1234)
+    x = np.sin(np.linspace(0, 60, 256)**1.5) + 0.1 * rstate.randn(256)
+    costs = {'shannon': pywt._wavelet_packets._shannon_cost,
+             'log_energy': pywt._wavelet_packets._log_energy_cost,
+             'norm': lambda c: np.sum(np.abs(c), axis=1)}
+    for name, cost in costs.items():
+        wp = pywt.WaveletPacket(x, 'db4', mode='periodization', maxlevel=5)
+        ref = pywt.WaveletPacket(x, 'db4', mode='periodization', maxlevel=5)
+        _, paths = _best_basis_reference(ref, cost, 5)
+        nodes = wp.best_basis(name)
+        assert_([node.path for node in nodes] == paths)
+        assert_(1 < len(nodes) < 32)
+        assert_([node.path for node in wp.best_basis(cost)] == paths)
+
+    # the basis can be limited to a level and the tree pruned to it
+    nodes = wp.best_basis('threshold', level=3, threshold=0.5, prune=True)
+    assert_([node.path for node in wp.get_leaf_nodes()] ==
+            [node.path for node in nodes])
+    assert_(all(node.level <= 3 for node in nodes))
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-10)
+
+    assert_raises(ValueError, wp.best_basis, 'threshold')
+    assert_raises(ValueError, wp.best_basis, 'entropy')
+    assert_raises(ValueError, wp.best_basis, level=6)
+
+
+def test_wavelet_packet_batch():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(4, 3, 64)
+    wp = pywt.WaveletPacket(x, 'db2', mode='symmetric')
+    assert_(wp.maxlevel == 4)
+    nodes = wp.get_level(3)
+    for i in range(4):
+        for j in range(3):
+            ref = pywt.WaveletPacket(x[i, j], 'db2', mode='symmetric')
+            for node in nodes:
+                assert_allclose(node.data[i, j], ref[node.path].data,
+                                rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+
+    # transform along another axis
+    wp = pywt.WaveletPacket(x.transpose(2, 0, 1), 'db2', mode='symmetric',
+                            axis=0)
+    assert_(wp.axis == 0 and wp['ad'].axis == 0)
+    assert_allclose(wp['dad'].data.transpose(1, 2, 0),
+                    pywt.WaveletPacket(x, 'db2', 'symmetric')['dad'].data,
+                    rtol=1e-12)
+    assert_allclose(wp.reconstruct(), x.transpose(2, 0, 1), rtol=1e-12)
+    assert_raises(ValueError, pywt.WaveletPacket, x, 'db2', axis=3)
+
+
+def test_reconstruct_leaves():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(101)
+    wp = pywt.WaveletPacket(x, 'db3', mode='symmetric', maxlevel=4)
+    nodes = wp.best_basis('shannon')
+    assert_(len(set(node.level for node in nodes)) > 1)
+    assert_allclose(wp.reconstruct(update=False, leaves=nodes), x,
+                    rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False, leaves=['a', 'da', 'dd']),
+                    x, rtol=1e-12)
+    assert_allclose(wp['a'].reconstruct(leaves=['aa', 'ada', 'add']),
+                    wp['a'].data, rtol=1e-12)
+    # the full tree is reconstructed level by level
+    wp.get_level(4)
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+    assert_raises(ValueError, wp.reconstruct, leaves=['a', 'aa'])
+    assert_raises(ValueError, wp['a'].reconstruct, leaves=['d'])
+
+
+def test_reconstruct_cache():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(256)
+    wp = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=4)
+    wp.get_level(4)
+    rec = wp.reconstruct(update=False, use_cache=True)
+    assert_allclose(rec, x, rtol=1e-12)
+    # cached results are returned as copies
+    rec[:] = 0
+    assert_allclose(wp.reconstruct(update=False, use_cache=True), x,
+                    rtol=1e-12)
+
+    # only the changed subtree is reconstructed again
+    new_data = rstate.randn(16)
+    wp['adad'] = new_data
+    ref = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=4)
+    ref.get_level(4)
+    ref['adad'] = new_data
+    assert_allclose(wp.reconstruct(update=False, use_cache=True),
+                    ref.reconstruct(update=False), rtol=1e-12)
+
+    del wp['dd']
+    del ref['dd']
+    assert_allclose(wp.reconstruct(update=False, use_cache=True),
+                    ref.reconstruct(update=False), rtol=1e-12)
+    wp['dd'] = np.ones(64)
+    ref['dd'] = np.ones(64)
+    assert_allclose(wp.reconstruct(update=False, use_cache=True),
+                    ref.reconstruct(update=False), rtol=1e-12)
+    assert_allclose(wp['a'].reconstruct(use_cache=True),
+                    ref['a'].reconstruct(), rtol=1e-12)
+
+    # coefficients modified in place are not seen by the cache, but are
+    # by the default reconstruction
+    wp.get_level(3)
+    ref.get_level(3)
+    rec = wp.reconstruct(update=False, use_cache=True)
+    wp['ddd'].data[:] = 0
+    ref['ddd'].data = np.zeros(32)
+    assert_allclose(wp.reconstruct(update=False, use_cache=True), rec,
+                    rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False),
+                    ref.reconstruct(update=False), rtol=1e-12)
+    wp.reconstruct()
+    wp['ddd'].data[:] = 1
+    ref['ddd'].data = np.ones(32)
+    assert_allclose(wp.reconstruct(), ref.reconstruct(), rtol=1e-12)
+
+
+def test_memory_limit():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(1024)
+    ref = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=6)
+    wp = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=6,
+                            memory_limit=2 * x.nbytes)
+    node = wp['ad']
+    wp.get_level(6)
+    levels = wp._tree.levels
+    assert_(sum(lvl.data.nbytes for lvl in levels if lvl.data is not None)
+            <= 2 * x.nbytes)
+    # intermediate levels are recomputed on access
+    assert_(levels[2].data is None)
+    assert_allclose(node.data, ref['ad'].data, rtol=1e-12)
+    for level in range(1, 7):
+        for a, b in zip(wp.get_level(level), ref.get_level(level)):
+            assert_allclose(a.data, b.data, rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+
+    # modified nodes are not recomputed from their parents
+    wp['dad'].data = np.ones(128)
+    ref['dad'].data = np.ones(128)
+    wp.get_level(6)
+    for level in range(1, 7):
+        for a, b in zip(wp.get_level(level), ref.get_level(level)):
+            assert_allclose(a.data, b.data, rtol=1e-12)
+    assert_allclose(wp.reconstruct(update=False),
+                    ref.reconstruct(update=False), rtol=1e-12)
+
+
+def test_mmap_storage():
+    x = np.random.RandomState(1234).randn(2, 1024)
+    ref = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=6)
+    mmap_dir = tempfile.mkdtemp()
+    block_size = _wavelet_packets._MMAP_BLOCK_SIZE
+    # transform a few nodes per dwt call
+    _wavelet_packets._MMAP_BLOCK_SIZE = 1024
+    try:
+        wp = pywt.WaveletPacket(x, 'db2', mode='periodization', maxlevel=6,
+                                mmap_dir=mmap_dir)
+        nodes = wp.get_level(6)
+        assert_(isinstance(wp._tree.levels[6].data, np.memmap))
+        assert_(isinstance(nodes[5].data, np.memmap))
+        for a, b in zip(nodes, ref.get_level(6)):
+            assert_allclose(a.data, b.data, rtol=1e-12)
+        assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+
+        new = pywt.WaveletPacket.from_level_array(
+            wp.to_level_array(6), 'db2', 'periodization', mmap_dir=mmap_dir)
+        assert_(isinstance(new._tree.levels[6].data, np.memmap))
+        assert_allclose(new.reconstruct(update=False), x, rtol=1e-12)
+    finally:
+        _wavelet_packets._MMAP_BLOCK_SIZE = block_size
+        shutil.rmtree(mmap_dir, ignore_errors=True)
+
+
+def test_wp_features():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(3, 256)
+    stats = ['energy', 'entropy', 'mean_abs', 'variance']
+    features = pywt.wp_features(x, 'db2', 3, stats=stats)
+    assert_(features.shape == (3, 14, 4))
+
+    wp = pywt.WaveletPacket(x, 'db2', mode='symmetric', maxlevel=3)
+    nodes = [node for level in range(1, 4) for node in wp.get_level(level)]
+    for i, node in enumerate(nodes):
+        energy = np.sum(node.data**2, axis=-1)
+        p = node.data**2 / energy[:, np.newaxis]
+        assert_allclose(features[:, i, 0], energy, rtol=1e-12)
+        assert_allclose(features[:, i, 1], -np.sum(p * np.log(p), axis=-1),
+                        rtol=1e-10)
+        assert_allclose(features[:, i, 2], np.mean(np.abs(node.data), -1),
+                        rtol=1e-12)
+        assert_allclose(features[:, i, 3], np.var(node.data, -1),
+                        rtol=1e-12)
+
+    # batch along another axis, single signals and custom statistics
+    assert_allclose(pywt.wp_features(x.T, 'db2', 3, stats=stats, axis=0),
+                    features, rtol=1e-12)
+    assert_allclose(pywt.wp_features(x[1], 'db2', 3,
+                                     stats=[lambda c: np.max(c, axis=-1)]),
+                    [[np.max(node.data[1])] for node in nodes], rtol=1e-12)
+    assert_(pywt.wp_features(x, 'db2').shape ==
+            (3, 2**(pywt.dwt_max_level(256, 'db2') + 1) - 2, 2))
+    assert_raises(ValueError, pywt.wp_features, x, 'db2', 3, ['median'])
+    assert_raises(ValueError, pywt.wp_features, x, 'db2', 0)
+
+
+def test_wavelet_packet_dtypes():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(256)
+    for dtype, rtol in [(np.float32, 1e-5), (np.complex64, 1e-5),
+                        (np.complex128, 1e-12)]:
+        data = x.astype(dtype)
+        if np.iscomplexobj(data):
+            data += 1j * rstate.randn(256).astype(dtype)
+        wp = pywt.WaveletPacket(data, 'db2', mode='symmetric', maxlevel=4)
+        assert_(all(node.data.dtype == dtype for node in wp.get_level(4)))
+        rec = wp.reconstruct(update=False)
+        assert_(rec.dtype == dtype)
+        assert_allclose(rec, data, rtol=rtol, atol=rtol)
+        assert_(pywt.wp_features(data, 'db2', 2).dtype == data.real.dtype)
+
+    # explicit dtype, also applied to assigned nodes
+    wp = pywt.WaveletPacket(np.arange(64), 'db1', dtype=np.float32)
+    assert_(wp.data.dtype == np.float32)
+    assert_(wp['ad'].data.dtype == np.float32)
+    wp['da'] = np.ones(16)
+    assert_(wp['da'].data.dtype == np.float32)
+    # integer input is converted to float64
+    wp = pywt.WaveletPacket(np.arange(64), 'db1')
+    assert_(wp['ad'].data.dtype == np.float64)
+
+
+def test_level_array():
+    x = np.random.RandomState(1234).randn(256)
+    wp = pywt.WaveletPacket(x, 'db2', mode='periodization')
+    arr = wp.to_level_array(4)
+    assert_(arr.shape == (16, 16))
+    assert_(arr.base is wp._tree.levels[4].data)
+    assert_allclose(arr, [node.data for node in wp.get_level(4)])
+    assert_allclose(wp['ad'].to_level_array(4), arr[4:8])
+
+    # the level array is used as the storage of the new tree
+    new = pywt.WaveletPacket.from_level_array(arr, 'db2', 'periodization')
+    assert_(new._tree.levels[4].data is arr)
+    assert_(new.maxlevel == wp.maxlevel)
+    assert_(new['ad'].data is None)
+    assert_allclose(new['adda'].data, wp['adda'].data)
+    assert_allclose(new.reconstruct(update=False), x, rtol=1e-12)
+    assert_allclose(new['addaa'].data, wp['addaa'].data, rtol=1e-12)
+    assert_(pywt.WaveletPacket.from_level_array(
+        arr.astype(np.float32), 'db2', level=4)['dddd'].data.dtype ==
+        np.float32)
+
+    # nodes with data set by the user are stacked
+    wp['ad'] = np.ones(64)
+    arr = wp.to_level_array(2)
+    assert_allclose(arr[1], 1)
+    assert_allclose(arr[2], wp['da'].data)
+
+    assert_raises(ValueError, pywt.WaveletPacket.from_level_array, arr[:3],
+                  'db2')
+    assert_raises(ValueError, pywt.WaveletPacket.from_level_array, arr,
+                  'db2', level=1)
+    assert_raises(ValueError, new.to_level_array, 2)
+    assert_raises(ValueError, new['ad'].to_level_array, 1)
+
+
+def test_data_not_overwritten():
+    # data of removed or replaced nodes keeps its values when their rows of
+    # the level array are needed again
+    x = np.random.RandomState(1234).randn(64)
+    wp = pywt.WaveletPacket(x, 'db1', mode='symmetric')
+    held = wp['aaa'].data
+    expected = held.copy()
+    wp['aa'].data = np.ones(16)
+    del wp['aaa']
+    del wp['aad']
+    wp.get_level(3)
+    assert_allclose(held, expected)
+    assert_allclose(wp['aaa'].data, np.sqrt(2) * np.ones(8))
+
+    held = wp['a'].data
+    expected = held.copy()
+    wp.data = np.zeros(64)
+    del wp['a']
+    del wp['d']
+    wp.get_level(1)
+    assert_allclose(held, expected)
+    assert_allclose(wp['a'].data, 0)
+
+
 if __name__ == '__main__':
     run_module_suite()
@@ -2,6 +2,9 @@
 
 from __future__ import division, print_function, absolute_import
 
+import shutil
+import tempfile
+
 import numpy as np
 from numpy.testing import (run_module_suite, assert_allclose, assert_,
                            assert_raises)
@@ -82,6 +85,66 @@ def test_collecting_nodes_2d():
     assert_(paths == expected_paths)
 
 
+def test_collecting_nodes_freq_2d():
+    x = np.ones((16, 16), dtype=np.float64)
+    wp = pywt.WaveletPacket2D(data=x, wavelet='db1', mode='symmetric')
+    parts = {('l', 'l'): 'a', ('h', 'l'): 'h', ('l', 'h'): 'v',
+             ('h', 'h'): 'd'}
+    graycode_order = ['ll', 'lh', 'hh', 'hl']
+    expected = [[''.join(parts[r, c] for r, c in zip(row, col))
+                 for col in graycode_order] for row in graycode_order]
+    paths = [[node.path for node in row] for row in wp.get_level(2, 'freq')]
+    assert_(paths == expected)
+    assert_(paths[1] == ['ah', 'ad', 'vd', 'vh'])
+    assert_([[node.path for node in row] for row in
+             wp.get_level(0, 'freq')] == [['']])
+
+    # missing nodes are skipped
+    del wp['h']
+    del wp['ad']
+    paths = [[node.path for node in row] for row in
+             wp.get_level(2, 'freq', decompose=False)]
+    expected = [[path for path in row if path[0] != 'h' and path != 'ad']
+                for row in expected]
+    assert_(paths == [row for row in expected if row])
+
+
+def test_wavelet_packet_dtypes_2d():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(32, 32)
+    for dtype in [np.float32, np.complex128]:
+        data = x.astype(dtype)
+        wp = pywt.WaveletPacket2D(data, 'db1', mode='periodization')
+        assert_(all(node.data.dtype == dtype for node in wp.get_level(3)))
+        rec = wp.reconstruct(update=False)
+        assert_(rec.dtype == dtype)
+        assert_allclose(rec, data, rtol=1e-5, atol=1e-5)
+
+
+def test_level_array_2d():
+    x = np.random.RandomState(1234).randn(32, 32)
+    wp = pywt.WaveletPacket2D(x, 'db1', mode='periodization')
+    arr = wp.to_level_array(2)
+    assert_(arr.shape == (16, 8, 8))
+    new = pywt.WaveletPacket2D.from_level_array(arr, 'db1', 'periodization')
+    assert_allclose(new['hv'].data, wp['hv'].data)
+    assert_allclose(new.reconstruct(update=False), x, rtol=1e-12)
+    assert_raises(ValueError, pywt.WaveletPacket2D.from_level_array,
+                  arr[0], 'db1')
+
+
+def test_mmap_storage_2d():
+    x = np.random.RandomState(1234).randn(32, 32)
+    mmap_dir = tempfile.mkdtemp()
+    try:
+        wp = pywt.WaveletPacket2D(x, 'db1', mode='periodization',
+                                  mmap_dir=mmap_dir)
+        assert_(isinstance(wp['hv'].data, np.memmap))
+        assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+    finally:
+        shutil.rmtree(mmap_dir, ignore_errors=True)
+
+
 def test_data_reconstruction_2d():
     x = np.array([[1, 2, 3, 4, 5, 6, 7, 8]] * 8, dtype=np.float64)
     wp = pywt.WaveletPacket2D(data=x, wavelet='db1', mode='symmetric')
@@ -145,5 +208,47 @@ def test_lazy_evaluation_2D():
     assert_allclose(wp.d.data, np.zeros((4, 4)), rtol=1e-12, atol=1e-12)
 
 
+def test_decompose_to_2d():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(32, 48)
+    wp = pywt.WaveletPacket2D(data=x, wavelet='db2', mode='symmetric',
+                              maxlevel=3)
+    nodes = wp.decompose_to(3)
+    assert_(len(nodes) == 64)
+    wp_ref = pywt.WaveletPacket2D(data=x, wavelet='db2', mode='symmetric',
+                                  maxlevel=3)
+    for node in nodes:
+        assert_allclose(node.data, wp_ref[node.path].data, rtol=1e-12)
+    assert_allclose(wp.reconstruct(), x, atol=1e-12)
+    # the coefficients of a level are stored in a single array
+    assert_(nodes[17].data.base is wp._tree.levels[3].data)
+    leaves = ['a', 'h', 'v'] + [node.path for node in nodes[48:]]
+    assert_allclose(wp.reconstruct(update=False, leaves=leaves), x,
+                    atol=1e-12)
+
+
+def test_best_basis_2d():
+    rstate = np.random.RandomState(1234)
+    x = np.outer(np.hanning(32), np.cos(np.linspace(0, 20, 32)))
+    x += 0.1 * rstate.randn(32, 32)
+    wp = pywt.WaveletPacket2D(data=x, wavelet='db2', mode='periodization',
+                              maxlevel=3)
+    nodes = wp.best_basis('shannon', prune=True)
+    assert_([node.path for node in nodes] ==
+            [node.path for node in wp.get_leaf_nodes()])
+    assert_(min(node.level for node in nodes) == 1)
+    # the selected nodes cover the whole frequency plane
+    assert_(sum(4.0**-node.level for node in nodes) == 1)
+    # and none of them can be replaced by its subnodes at a lower cost
+    cost = pywt._wavelet_packets._shannon_cost
+    for node in nodes:
+        if node.level < 3:
+            node_cost = cost(node.data.reshape(1, -1))[0]
+            subnodes = wp[node.path].decompose()
+            assert_(node_cost <= sum(cost(subnode.data.reshape(1, -1))[0]
+                                     for subnode in subnodes))
+    assert_allclose(wp.reconstruct(update=False), x, atol=1e-12)
+
+
 if __name__ == '__main__':
     run_module_suite()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+from __future__ import division, print_function, absolute_import
+
+import numpy as np
+from numpy.testing import (run_module_suite, assert_allclose, assert_,
+                           assert_raises, assert_equal)
+
+import pywt
+
+
+def test_wavelet_packet_structure_nd():
+    x = np.ones((16, 16, 16), dtype=np.float64)
+    wp = pywt.WaveletPacketND(data=x, wavelet='db1', mode='symmetric')
+
+    assert_(wp.path == '')
+    assert_(wp.level == 0)
+    assert_(wp.maxlevel == 4)
+    assert_equal(wp.axes, (0, 1, 2))
+    assert_(len(wp.PARTS) == 8)
+    assert_(wp['ada'].path == 'ada')
+    assert_(wp['adaddd'].level == 2)
+    assert_(wp['adaddd'].parent is wp['ada'])
+    assert_(wp['ada'].ddd is wp['adaddd'])
+
+    # Wrong path
+    assert_raises(ValueError, lambda: wp['adc'])
+    # Maximum level reached
+    assert_raises(IndexError, lambda: wp['a' * 15])
+
+
+def test_traversing_tree_nd():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(16, 20, 12)
+    wp = pywt.WaveletPacketND(data=x, wavelet='db2', mode='symmetric')
+
+    coeffs = pywt.dwtn(pywt.dwtn(x, 'db2')['ada'], 'db2')['dda']
+    assert_allclose(wp['adadda'].data, coeffs, rtol=1e-12)
+
+    nodes = wp.get_level(2)
+    assert_(len(nodes) == 64)
+    assert_([node.path for node in nodes] ==
+            [a + b for a in wp.PARTS for b in wp.PARTS])
+    assert_allclose(wp.reconstruct(update=False), x, rtol=1e-12)
+
+
+def test_axes_nd():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(16, 5, 12)
+    wp = pywt.WaveletPacketND(data=x, wavelet='haar', mode='periodization',
+                              axes=(0, -1))
+    assert_equal(wp.axes, (0, 2))
+    assert_(wp.PARTS == ('aa', 'ad', 'da', 'dd'))
+    assert_(wp.maxlevel == 3)
+    assert_allclose(wp['ad'].data,
+                    pywt.dwtn(x, 'haar', 'periodization', axes=(0, 2))['ad'],
+                    rtol=1e-12)
+    assert_(wp['ad'].data.shape == (8, 5, 6))
+
+    # same coefficients as the 2D wavelet packet transform
+    wp2d = pywt.WaveletPacket2D(data=x[:, 0, :], wavelet='haar',
+                                mode='periodization')
+    assert_allclose(wp['daad'].data[:, 0, :], wp2d['hv'].data, rtol=1e-12)
+
+    assert_raises(ValueError, pywt.WaveletPacketND, x, 'haar', axes=(0, 3))
+    assert_raises(ValueError, pywt.WaveletPacketND, x, 'haar', axes=(0, 0))
+    assert_raises(ValueError, pywt.WaveletPacketND, None, 'haar')
+
+
+def test_reconstructing_data_nd():
+    rstate = np.random.RandomState(1234)
+    x = rstate.randn(12, 16, 12)
+    wp = pywt.WaveletPacketND(data=x, wavelet='db1', mode='symmetric',
+                              axes=(1, 2))
+
+    new_wp = pywt.WaveletPacketND(data=None, wavelet='db1', mode='symmetric',
+                                  axes=(1, 2))
+    for node in wp.get_level(2):
+        if node.path[:2] != 'dd':
+            new_wp[node.path] = node.data
+    new_wp['dd'] = wp['dd']
+    assert_(new_wp.maxlevel == 3)
+
+    assert_allclose(new_wp.reconstruct(update=False), x, rtol=1e-12)
+    assert_(new_wp.data is None)
+    assert_allclose(new_wp.reconstruct(update=True), x, rtol=1e-12)
+    assert_allclose(new_wp.data, x, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    run_module_suite()